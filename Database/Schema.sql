@@ -7,7 +7,8 @@ CREATE TABLE users (
     "Profile Picture" TEXT,  -- Optional: Google profile image URL
     "Created At" TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     "Last Login" TIMESTAMP,
-    "Email Verified" BOOLEAN DEFAULT FALSE
+    "Email Verified" BOOLEAN DEFAULT FALSE,
+    "Data Hash" VARCHAR(64)  -- Content hash of the uploaded data, keys cached optimization results
 );
 
 -- Students table: stores uploaded student data per user
@@ -53,4 +54,40 @@ CREATE TABLE unassigned_courses (
     "Student Name" VARCHAR(255) NOT NULL,
     "Unassigned Course Name" VARCHAR(255) NOT NULL,
     "Reason" TEXT NOT NULL
-);
\ No newline at end of file
+);
+
+-- Previous Assigned Courses: the last assignments before a new upload, the warm start for incremental /optimize runs
+CREATE TABLE previous_assigned_courses (
+    "ID" SERIAL PRIMARY KEY,
+    "User ID" INTEGER REFERENCES users("ID") ON DELETE CASCADE,
+    "Student Name" VARCHAR(255) NOT NULL,
+    "Course Name" VARCHAR(255) NOT NULL,
+    "Section" INTEGER NOT NULL
+);
+
+-- Optimization Jobs: background /optimize runs and their progress
+CREATE TABLE optimization_jobs (
+    "ID" VARCHAR(36) PRIMARY KEY,  -- UUID returned to the client
+    "User ID" INTEGER REFERENCES users("ID") ON DELETE CASCADE,
+    "Status" VARCHAR(32) NOT NULL,  -- Queued, Running, Complete or Failed
+    "Progress" TEXT,
+    "Error" TEXT,
+    "Assigned Count" INTEGER,
+    "Unassigned Count" INTEGER,
+    "Created At" TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    "Finished At" TIMESTAMP,
+    "Metrics" TEXT  -- JSON phase timings, model size and solver stats of the job
+);
+
+-- Indexes: every endpoint filters on "User ID"; rosters and schedules also look up a
+-- course/section or a student, case-insensitively
+CREATE INDEX ix_students_user_student ON students ("User ID", "Student Name");
+CREATE INDEX ix_students_user_lower_student ON students ("User ID", LOWER("Student Name"));
+CREATE INDEX ix_schedules_user_course_section ON schedules ("User ID", "Course Name", "Section");
+CREATE INDEX ix_schedules_user_lower_course_section ON schedules ("User ID", LOWER("Course Name"), "Section");
+CREATE INDEX ix_periods_user_course_section ON periods ("User ID", "Course Name", "Section");
+CREATE INDEX ix_assigned_courses_user_course_section ON assigned_courses ("User ID", "Course Name", "Section");
+CREATE INDEX ix_assigned_courses_user_student ON assigned_courses ("User ID", "Student Name");
+CREATE INDEX ix_unassigned_courses_user_student ON unassigned_courses ("User ID", "Student Name");
+CREATE INDEX ix_previous_assigned_courses_user ON previous_assigned_courses ("User ID");
+CREATE INDEX ix_optimization_jobs_user ON optimization_jobs ("User ID");
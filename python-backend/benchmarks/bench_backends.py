@@ -0,0 +1,53 @@
+# Compare model build and solve time of the Pyomo/CBC and scipy/HiGHS optimizer backends.
+# The Pyomo solve time includes writing the LP file handed to CBC.
+# Usage: python benchmarks/bench_backends.py [--students N] [--courses N] [--time-limit S] ...
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from instrumentation import Metrics
+from optimization.schedule_optimizer import ScheduleOptimizer
+from synthetic import generate_school
+
+
+# Solve with one backend as /optimize does (without a heuristic start, so only the backends differ)
+# and time its phases as recorded by run_solver
+def run_backend(backend, students_df, schedules_df, periods_df, time_limit):
+    metrics = Metrics()
+    optimizer = ScheduleOptimizer(backend=backend, heuristic_start=False, time_limit=time_limit, metrics=metrics)
+    optimizer.run_solver(students_df, schedules_df, periods_df)
+    phases = metrics.phases
+    objective = optimizer.solution_objective(optimizer.solution)
+    assigned = len(optimizer.get_assigned_courses())
+    return phases["build_lookups"], phases["initialize_model"], phases["solve_model"], objective, assigned
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Pyomo/CBC and scipy/HiGHS optimizer backends")
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--courses", type=int, default=40)
+    parser.add_argument("--sections", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time-limit", type=float, default=10)
+    parser.add_argument("--backends", nargs="+", default=["pyomo", "scipy"])
+    args = parser.parse_args()
+
+    data = generate_school(
+        n_students=args.students,
+        n_courses=args.courses,
+        sections_per_course=args.sections,
+        requests_per_student=args.requests,
+        seed=args.seed,
+    )
+    print(f"{len(data[0])} requests, {len(data[1])} sections")
+    print(f"{'backend':<8} {'lookups':>9} {'build':>9} {'solve':>9} {'objective':>11} {'assigned':>9}")
+    for backend in args.backends:
+        lookups, build, solve, objective, assigned = run_backend(backend, *data, args.time_limit)
+        print(f"{backend:<8} {lookups:>8.3f}s {build:>8.3f}s {solve:>8.3f}s {objective:>11.2f} {assigned:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# Compare the greedy/local-search HeuristicScheduleOptimizer with the CBC path of ScheduleOptimizer:
+# objective value (as the MILP defines it), assigned courses and runtime on each dataset.
+# Usage: python benchmarks/bench_heuristic.py [--datasets BasicData TwelfthGrade] [--synthetic]
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from optimization.heuristic_optimizer import HeuristicScheduleOptimizer
+from optimization.schedule_optimizer import ScheduleOptimizer
+from synthetic import generate_school
+
+
+def load_dataset(name):
+    data_dir = os.path.join(os.path.dirname(__file__), "..", "tests", "data", name)
+    return tuple(
+        pd.read_csv(os.path.join(data_dir, f"{table}.csv"))
+        for table in ("Students", "Schedules", "Periods")
+    )
+
+
+def run(optimizer, data):
+    start = time.perf_counter()
+    optimizer.run_solver(*data)
+    elapsed = time.perf_counter() - start
+    return optimizer.solution_objective(optimizer.solution), len(optimizer.solution), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the heuristic optimizer with CBC")
+    parser.add_argument("--datasets", nargs="*", default=["BasicData", "TwelfthGrade"], help="datasets in tests/data")
+    parser.add_argument("--synthetic", action="store_true", help="also run generated schools of increasing size")
+    args = parser.parse_args()
+
+    datasets = [(name, load_dataset(name)) for name in args.datasets]
+    if args.synthetic:
+        for n_students, n_courses in ((100, 20), (300, 40), (1000, 60)):
+            datasets.append((
+                f"synthetic {n_students}x{n_courses}",
+                generate_school(n_students=n_students, n_courses=n_courses, seed=n_students)
+            ))
+
+    print(f"{'dataset':<22} {'engine':<10} {'objective':>10} {'assigned':>9} {'time':>9}")
+    for name, data in datasets:
+        for engine, optimizer in (("heuristic", HeuristicScheduleOptimizer()), ("cbc", ScheduleOptimizer())):
+            objective, assigned, elapsed = run(optimizer, data)
+            print(f"{name:<22} {engine:<10} {objective:>10.2f} {assigned:>9} {elapsed:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# Compare row-by-row ORM inserts with the bulk path used by /optimize to store results.
+# Needs DATABASE_URL (and the schema from Database/Schema.sql); a temporary user is created and removed.
+# Usage: python benchmarks/bench_persistence.py [--dataset TwelfthGrade] [--scale 20] [--synthetic]
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from app import app, store_optimization_results
+from models import db, Users, AssignedCourses, UnassignedCourses
+from optimization.schedule_optimizer import ScheduleOptimizer
+from synthetic import generate_school
+
+
+def load_dataset(name):
+    data_dir = os.path.join(os.path.dirname(__file__), "..", "tests", "data", name)
+    return tuple(
+        pd.read_csv(os.path.join(data_dir, f"{table}.csv"))
+        for table in ("Students", "Schedules", "Periods")
+    )
+
+
+# Repeat the results `scale` times with distinct student names
+def scale_results(df, scale):
+    copies = [df.assign(**{"Student Name": df["Student Name"].astype(str) + f" #{i}"}) for i in range(scale)]
+    return pd.concat(copies, ignore_index=True)
+
+
+# The per-row ORM path /optimize used before bulk persistence (which didn't check the data hash)
+def store_row_by_row(user_id, assigned, unassigned, data_hash):
+    AssignedCourses.query.filter_by(user_id=user_id).delete()
+    UnassignedCourses.query.filter_by(user_id=user_id).delete()
+    db.session.commit()
+    for _, row in assigned.iterrows():
+        db.session.add(AssignedCourses(
+            user_id=user_id,
+            student_name=row['Student Name'],
+            course_name=row['Course Name'],
+            section=int(row['Section'])
+        ))
+    for _, row in unassigned.iterrows():
+        db.session.add(UnassignedCourses(
+            user_id=user_id,
+            student_name=row['Student Name'],
+            unassigned_course_name=row['Unassigned Course Name'],
+            reason=row['Reason']
+        ))
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark optimizer result persistence")
+    parser.add_argument("--dataset", default="TwelfthGrade")
+    parser.add_argument("--synthetic", action="store_true", help="use a generated school instead of tests/data")
+    parser.add_argument("--scale", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    data = generate_school(n_students=100, n_courses=12) if args.synthetic else load_dataset(args.dataset)
+    optimizer = ScheduleOptimizer()
+    optimizer.run_solver(*data)
+    assigned = scale_results(optimizer.get_assigned_courses(), args.scale)
+    unassigned = scale_results(optimizer.get_unassigned_courses(), args.scale)
+    print(f"{len(assigned)} assigned rows, {len(unassigned)} unassigned rows")
+
+    with app.app_context():
+        user = Users(google_id="bench-persistence", email="bench-persistence@bench", name="Benchmark")
+        db.session.add(user)
+        db.session.commit()
+        try:
+            for name, store in (("row by row", store_row_by_row), ("bulk", store_optimization_results)):
+                timings = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    store(user.id, assigned, unassigned, user.data_hash)
+                    timings.append(time.perf_counter() - start)
+                print(f"{name:<11} best {min(timings):.3f}s  mean {sum(timings) / len(timings):.3f}s")
+        finally:
+            db.session.delete(user)
+            db.session.commit()
+
+
+if __name__ == "__main__":
+    main()
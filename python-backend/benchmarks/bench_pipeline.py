@@ -0,0 +1,268 @@
+# Time each phase of the upload and optimize pipeline on a generated school, the way /upload and
+# /optimize run them: reading and normalizing the CSVs, validating them, encoding the tables,
+# build_lookups, the heuristic start (with --heuristic-start), model construction, the solve, result extraction and
+# (with --persist) storing the results. Each phase reports its best time over --repeat runs.
+# With --output the timings, school parameters, problem size, result and commit are written as
+# JSON; --compare prints the change per phase against such a file, e.g. one from another commit.
+# --persist needs DATABASE_URL (and the schema from Database/Schema.sql); a temporary user is created and removed.
+# Usage: python benchmarks/bench_pipeline.py [--students 500] [--courses 40] ... [--output run.json] [--compare base.json]
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from data_validation.streaming_validator import StreamingScheduleDataValidator
+from encoding import encode_tables
+from optimization.heuristic_search import HeuristicSearch
+from optimization.matrix_backend import MatrixModel
+from optimization.schedule_optimizer import ScheduleOptimizer
+from optimization.schedule_solution import ScheduleSolution
+from synthetic import generate_school
+from utils import normalize_dataframe
+
+# Tables in upload order: name, columns to normalize (as UPLOAD_TABLES in app.py)
+TABLES = [
+    ("Students", ["Student Name", "Course Name"]),
+    ("Schedules", ["Course Name"]),
+    ("Periods", ["Course Name", "Day of Week"]),
+]
+
+PHASES = [
+    "read", "normalize", "validate", "encode", "build_lookups", "heuristic",
+    "initialize_model", "solve_model", "results", "persist",
+]
+
+
+# Seconds spent per phase, summed over every time the phase is entered (e.g. once per chunk)
+class PhaseTimer:
+
+    def __init__(self):
+        self.seconds = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - start
+
+
+# Read, normalize and validate the CSVs chunk by chunk, as /upload does; returns the normalized tables
+def upload(csvs, chunk_rows, timer):
+    validator = StreamingScheduleDataValidator()
+    tables = []
+    for (name, value_columns), csv in zip(TABLES, csvs):
+        chunks = []
+        reader = pd.read_csv(io.BytesIO(csv), chunksize=chunk_rows)
+        while True:
+            with timer.phase("read"):
+                chunk = next(reader, None)
+            if chunk is None:
+                break
+            with timer.phase("normalize"):
+                chunk = normalize_dataframe(chunk, value_columns=value_columns)
+            with timer.phase("validate"):
+                validator.add_chunk(name, chunk)
+            chunks.append(chunk)
+        tables.append(pd.concat(chunks, ignore_index=True))
+    with timer.phase("validate"):
+        valid, errors = validator.finish()
+    if not valid:
+        raise ValueError(f"Generated school failed validation: {errors}")
+    return tables
+
+
+# The steps of ScheduleOptimizer.run_solver (without decomposition), each timed as its own phase
+def optimize(tables, args, timer):
+    with timer.phase("encode"):
+        students_df, schedules_df, periods_df = encode_tables(*tables)
+    optimizer = ScheduleOptimizer(backend=args.backend, solver=args.solver, time_limit=args.time_limit)
+    optimizer.students_df = students_df
+    optimizer.schedules_df = schedules_df
+    optimizer.periods_df = periods_df
+    with timer.phase("build_lookups"):
+        optimizer.build_lookups(periods_df, schedules_df)
+    start = None
+    elapsed = 0
+    if args.heuristic_start:
+        with timer.phase("heuristic"):
+            started = time.perf_counter()
+            start = HeuristicSearch(time_limit=args.time_limit * optimizer.HEURISTIC_TIME_SHARE).solve(optimizer)
+            elapsed = time.perf_counter() - started
+    if args.backend == "scipy":
+        with timer.phase("initialize_model"):
+            optimizer.matrix_model = MatrixModel(optimizer)
+        with timer.phase("solve_model"):
+            optimizer.matrix_result = optimizer.matrix_model.solve(time_limit=optimizer.remaining_time(elapsed))
+            if optimizer.matrix_result.x is not None:
+                optimizer.solution = ScheduleSolution(optimizer, optimizer.matrix_result.x[:optimizer.matrix_model.n_pairs])
+            elif start is not None:
+                optimizer.set_assignments(start)
+            else:
+                raise RuntimeError(f"MILP solver found no feasible solution: {optimizer.matrix_result.message}")
+    else:
+        with timer.phase("initialize_model"):
+            optimizer.model = optimizer.initialize_model()
+            if start is not None:
+                optimizer.set_assignments(start)
+        with timer.phase("solve_model"):
+            optimizer.solve_model(warmstart=start is not None, elapsed=elapsed)
+    # As run_solver, never keep a worse schedule than the start
+    if start is not None:
+        with timer.phase("solve_model"):
+            warm_solution = ScheduleSolution(optimizer, optimizer._pair_vector(start))
+            if optimizer.solution_objective(warm_solution) > optimizer.solution_objective(optimizer.solution):
+                optimizer.set_assignments(start)
+    with timer.phase("results"):
+        assigned = optimizer.get_assigned_courses()
+        unassigned = optimizer.get_unassigned_courses()
+    return optimizer, assigned, unassigned
+
+
+# Store the results as /optimize does, for a temporary user
+def persist(assigned, unassigned, timer):
+    from app import app, store_optimization_results
+    from models import db, Users
+
+    with app.app_context():
+        user = Users(google_id="bench-pipeline", email="bench-pipeline@bench", name="Benchmark")
+        db.session.add(user)
+        db.session.commit()
+        try:
+            with timer.phase("persist"):
+                store_optimization_results(user.id, assigned, unassigned, user.data_hash)
+        finally:
+            db.session.delete(user)
+            db.session.commit()
+
+
+# Current commit and whether the tree has uncommitted changes (None if git isn't available)
+def git_state():
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=cwd, capture_output=True, text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain"], cwd=cwd, capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, bool(status.strip())
+
+
+# Print the change per phase against an earlier run; returns the phases more than max_slowdown times slower.
+# Phases under 10ms in the baseline are too noisy to fail on.
+def compare(report, baseline, max_slowdown):
+    slower = []
+    print(f"\ncompared with {baseline.get('commit') or 'baseline'}")
+    print(f"{'phase':<17} {'baseline':>9} {'now':>9} {'change':>8}")
+    for name, seconds in report["phases"].items():
+        before = baseline.get("phases", {}).get(name)
+        if before is None:
+            print(f"{name:<17} {'-':>9} {seconds:>8.3f}s")
+            continue
+        ratio = seconds / before if before > 0 else float("inf")
+        print(f"{name:<17} {before:>8.3f}s {seconds:>8.3f}s {ratio:>7.2f}x")
+        if max_slowdown is not None and before >= 0.01 and ratio > max_slowdown:
+            slower.append(name)
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time each phase of the upload and optimize pipeline on a generated school")
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--courses", type=int, default=40)
+    parser.add_argument("--sections", type=int, default=3, help="sections per course")
+    parser.add_argument("--requests", type=int, default=6, help="requests per student")
+    parser.add_argument("--days", type=int, default=5)
+    parser.add_argument("--periods", type=int, default=8, help="periods per day")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", choices=sorted(ScheduleOptimizer.BACKENDS), default="pyomo")
+    parser.add_argument("--solver", choices=sorted(ScheduleOptimizer.SOLVERS), default="cbc")
+    parser.add_argument("--time-limit", type=float, default=10)
+    parser.add_argument("--heuristic-start", action="store_true", help="start the solver from the heuristic schedule")
+    parser.add_argument("--chunk-rows", type=int, default=50000, help="rows per uploaded CSV chunk")
+    parser.add_argument("--persist", action="store_true", help="also time storing the results (needs DATABASE_URL)")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--output", help="write the report as JSON to this file")
+    parser.add_argument("--compare", help="JSON report of an earlier run to compare with")
+    parser.add_argument("--max-slowdown", type=float, help="with --compare, fail if a phase is this many times slower")
+    args = parser.parse_args()
+
+    school = {
+        "students": args.students, "courses": args.courses, "sections_per_course": args.sections,
+        "requests_per_student": args.requests, "days": args.days, "periods_per_day": args.periods, "seed": args.seed,
+    }
+    data = generate_school(
+        n_students=args.students, n_courses=args.courses, sections_per_course=args.sections,
+        requests_per_student=args.requests, n_days=args.days, periods_per_day=args.periods, seed=args.seed
+    )
+    csvs = [df.to_csv(index=False).encode() for df in data]
+
+    best = {}
+    for _ in range(args.repeat):
+        timer = PhaseTimer()
+        tables = upload(csvs, args.chunk_rows, timer)
+        optimizer, assigned, unassigned = optimize(tables, args, timer)
+        if args.persist:
+            persist(assigned, unassigned, timer)
+        for name, seconds in timer.seconds.items():
+            best[name] = min(best.get(name, seconds), seconds)
+
+    commit, dirty = git_state()
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "school": school,
+        "settings": {
+            "backend": args.backend, "solver": args.solver, "time_limit": args.time_limit,
+            "heuristic_start": args.heuristic_start,
+            "chunk_rows": args.chunk_rows, "repeat": args.repeat,
+        },
+        "size": {
+            "requests": len(data[0]), "sections": len(data[1]), "meetings": len(data[2]), "pairs": len(optimizer.pairs),
+        },
+        "result": {
+            "objective": float(optimizer.solution_objective(optimizer.solution)),
+            "assigned": len(assigned),
+            "unassigned": len(unassigned),
+        },
+        "phases": {name: round(best[name], 6) for name in PHASES if name in best},
+    }
+    report["total"] = round(sum(report["phases"].values()), 6)
+
+    size = report["size"]
+    print(f"{size['requests']} requests, {size['sections']} sections, {size['pairs']} candidate pairs")
+    for name, seconds in report["phases"].items():
+        print(f"{name:<17} {seconds:>8.3f}s")
+    print(f"{'total':<17} {report['total']:>8.3f}s")
+    result = report["result"]
+    print(f"objective {result['objective']:.2f}, {result['assigned']} assigned, {result['unassigned']} unassigned")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("school") != school or baseline.get("settings", {}).get("backend") != args.backend:
+            print("note: the baseline was run on a different school or backend")
+        slower = compare(report, baseline, args.max_slowdown)
+        if slower:
+            print(f"More than {args.max_slowdown}x slower than the baseline: {', '.join(slower)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# Show how each endpoint's query plan changes from sequential scans to index lookups.
+# Loads synthetic data for many tenants into a scratch "bench_queries" schema (dropped afterwards),
+# then runs EXPLAIN ANALYZE for every endpoint query with and without the indexes from models.py.
+# Needs a PostgreSQL DATABASE_URL.
+# Usage: python benchmarks/bench_queries.py [--tenants 200] [--students 100]
+import argparse
+import os
+import sys
+
+import pandas as pd
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from models import db
+from synthetic import generate_school
+
+SCHEMA = "bench_queries"
+
+# (endpoint, query) pairs matching the access pattern of each endpoint
+QUERIES = [
+    ("is_data_optimized", 'SELECT EXISTS (SELECT 1 FROM assigned_courses WHERE "User ID" = :user_id)'),
+    ("/optimize (load data)", 'SELECT * FROM students WHERE "User ID" = :user_id'),
+    ("/assigned_courses", 'SELECT * FROM assigned_courses WHERE "User ID" = :user_id'),
+    ("/unassigned_courses", 'SELECT * FROM unassigned_courses WHERE "User ID" = :user_id'),
+    ("/all_class_rosters", 'SELECT * FROM schedules WHERE "User ID" = :user_id'),
+    ("/class_roster", '''
+        SELECT a."Student Name" FROM schedules s
+        JOIN assigned_courses a
+          ON a."User ID" = s."User ID" AND a."Course Name" = s."Course Name" AND a."Section" = s."Section"
+        WHERE s."User ID" = :user_id AND lower(s."Course Name") = lower(:course) AND s."Section" = :section
+    '''),
+    ("/student_schedule", '''
+        SELECT a."Course Name", a."Section" FROM assigned_courses a
+        WHERE a."User ID" = :user_id AND a."Student Name" IN (
+          SELECT s."Student Name" FROM students s
+          WHERE s."User ID" = :user_id AND lower(s."Student Name") = lower(:student)
+        )
+    '''),
+]
+
+
+def load_tenants(connection, n_tenants, n_students):
+    frames = {"students": [], "schedules": [], "periods": [], "assigned_courses": [], "unassigned_courses": []}
+    for user_id in range(1, n_tenants + 1):
+        students, schedules, periods = generate_school(n_students=n_students, n_courses=20, seed=user_id)
+        # Stand-in results: every request gets section 1
+        assigned = students.assign(Section=1)
+        unassigned = students.head(n_students // 10).rename(columns={"Course Name": "Unassigned Course Name"})
+        unassigned = unassigned.assign(Reason="Capacity")
+        for name, df in (("students", students), ("schedules", schedules), ("periods", periods),
+                         ("assigned_courses", assigned), ("unassigned_courses", unassigned)):
+            frames[name].append(df.assign(**{"User ID": user_id}))
+
+    connection.execute(text(
+        'INSERT INTO users ("ID", "Google ID", "Email") '
+        "SELECT i, 'bench-' || i, 'bench-' || i || '@bench' FROM generate_series(1, :n) AS i"
+    ), {"n": n_tenants})
+    for name, dfs in frames.items():
+        pd.concat(dfs, ignore_index=True).to_sql(name, connection, if_exists="append", index=False, chunksize=10000)
+    connection.execute(text("ANALYZE"))
+
+
+# Summarize the scans in an EXPLAIN (FORMAT JSON) plan, e.g. "Index Scan using ix_... on students"
+def describe_scans(plan):
+    scans = []
+    if "Scan" in plan["Node Type"]:
+        scan = plan["Node Type"]
+        if "Index Name" in plan:
+            scan += f" using {plan['Index Name']}"
+        if "Relation Name" in plan:
+            scan += f" on {plan['Relation Name']}"
+        scans.append(scan)
+    for child in plan.get("Plans", []):
+        scans.extend(describe_scans(child))
+    return scans
+
+
+def explain(connection, query, params):
+    result = connection.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {query}"), params).scalar()
+    return result[0]["Execution Time"], describe_scans(result[0]["Plan"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark endpoint queries with and without indexes")
+    parser.add_argument("--tenants", type=int, default=200)
+    parser.add_argument("--students", type=int, default=100)
+    args = parser.parse_args()
+
+    load_dotenv()
+    engine = create_engine(os.getenv("DATABASE_URL"), connect_args={"options": f"-csearch_path={SCHEMA}"})
+    indexes = [index for table in db.metadata.sorted_tables for index in table.indexes]
+    tenant = args.tenants // 2
+    students, schedules, _ = generate_school(n_students=args.students, n_courses=20, seed=tenant)
+    params = {
+        "user_id": tenant,
+        "course": schedules["Course Name"].iloc[0].upper(),
+        "section": 1,
+        "student": students["Student Name"].iloc[0].lower(),
+    }
+
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    try:
+        with engine.begin() as connection:
+            db.metadata.create_all(connection)
+            for index in indexes:
+                index.drop(connection)
+            load_tenants(connection, args.tenants, args.students)
+
+        results = {}
+        with engine.begin() as connection:
+            for endpoint, query in QUERIES:
+                results[endpoint] = [explain(connection, query, params)]
+            for index in indexes:
+                index.create(connection)
+            connection.execute(text("ANALYZE"))
+            for endpoint, query in QUERIES:
+                results[endpoint].append(explain(connection, query, params))
+
+        for endpoint, ((before_ms, before_scans), (after_ms, after_scans)) in results.items():
+            print(f"{endpoint}: {before_ms:.2f} ms -> {after_ms:.2f} ms")
+            print(f"    before: {'; '.join(before_scans)}")
+            print(f"    after:  {'; '.join(after_scans)}")
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# Time ScheduleDataValidator on generated uploads of about --rows rows per table (students and
+# periods; schedules get a fifth of that). Each case is timed for validate(), for validate() in
+# parallel mode with --workers threads, and for each check on its own, best of --repeat runs.
+# Besides valid data, cases with duplicate rows and with unknown course-sections exercise the
+# paths that report errors, which validate() stops at.
+# With --max-seconds, exits with status 1 if validate() takes longer than that on any case,
+# so the benchmark can guard against regressions.
+# Usage: python benchmarks/bench_validator.py [--rows 100000] [--repeat 3] [--workers 4] [--max-seconds 2]
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from data_validation.schedule_data_validator import ScheduleDataValidator
+from synthetic import generate_school
+
+REQUESTS_PER_STUDENT = 6
+SECTIONS_PER_COURSE = 5
+DAYS = 5
+
+
+def generate(rows):
+    return generate_school(
+        n_students=rows // REQUESTS_PER_STUDENT, n_courses=max(1, rows // (SECTIONS_PER_COURSE * DAYS)),
+        sections_per_course=SECTIONS_PER_COURSE, requests_per_student=REQUESTS_PER_STUDENT, n_days=DAYS, seed=0
+    )
+
+
+# One student in a hundred requests a course twice, differing only in case
+def with_duplicates(students_df, schedules_df, periods_df):
+    dup = students_df.iloc[::100].copy()
+    dup["Student Name"] = dup["Student Name"].str.upper()
+    return pd.concat([students_df, dup], ignore_index=True), schedules_df, periods_df
+
+
+# One period row in a hundred points at a section that doesn't exist
+def with_unknown_sections(students_df, schedules_df, periods_df):
+    periods_df = periods_df.copy()
+    periods_df.loc[::100, "Section"] = SECTIONS_PER_COURSE + 1
+    return students_df, schedules_df, periods_df
+
+
+CASES = [
+    ("valid", lambda *data: data),
+    ("duplicates", with_duplicates),
+    ("unknown sections", with_unknown_sections),
+]
+
+CHECKS = [
+    ("students", lambda v, st, sc, pr: v._validate_students(st)),
+    ("schedules", lambda v, st, sc, pr: v._validate_schedules(sc)),
+    ("periods", lambda v, st, sc, pr: [v._validate_periods(pr), v._check_days(pr, "Day of Week", "Periods")]),
+    ("duplicates", lambda v, st, sc, pr: v._check_duplicates(st, sc, pr)),
+    ("referential", lambda v, st, sc, pr: v._check_referential_integrity(st, sc, pr)),
+    ("ranges", lambda v, st, sc, pr: [v._check_capacity(sc), v._check_period_number(pr)]),
+]
+
+
+def best_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ScheduleDataValidator on large generated uploads")
+    parser.add_argument("--rows", type=int, default=100000, help="rows in the students and periods tables")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=4, help="threads for parallel validate()")
+    parser.add_argument("--max-seconds", type=float, help="fail if validate() takes longer on any case")
+    args = parser.parse_args()
+
+    data = generate(args.rows)
+    print(f"{'case':<18} {'rows':>8} {'validate':>9} {'parallel':>9} " + " ".join(f"{name:>11}" for name, _ in CHECKS) + "  errors")
+    too_slow = []
+    for case, mutate in CASES:
+        students_df, schedules_df, periods_df = mutate(*data)
+        rows = len(students_df) + len(schedules_df) + len(periods_df)
+        errors = ScheduleDataValidator().validate(students_df, schedules_df, periods_df)[1]
+        total = best_time(lambda: ScheduleDataValidator().validate(students_df, schedules_df, periods_df), args.repeat)
+        parallel = best_time(
+            lambda: ScheduleDataValidator(parallel=True, max_workers=args.workers).validate(students_df, schedules_df, periods_df),
+            args.repeat
+        )
+        check_times = [
+            best_time(lambda: check(ScheduleDataValidator(), students_df, schedules_df, periods_df), args.repeat)
+            for _, check in CHECKS
+        ]
+        print(f"{case:<18} {rows:>8} {total:>8.3f}s {parallel:>8.3f}s " + " ".join(f"{t:>10.3f}s" for t in check_times) + f"  {len(errors)}")
+        if args.max_seconds is not None and total > args.max_seconds:
+            too_slow.append(case)
+
+    if too_slow:
+        print(f"validate() took longer than {args.max_seconds}s on: {', '.join(too_slow)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
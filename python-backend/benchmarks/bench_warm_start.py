@@ -0,0 +1,106 @@
+# Compare CBC started cold with CBC started from the HeuristicSearch schedule (a MIP start).
+# For each dataset and time limit, reports the time to the first incumbent, the time to a
+# solution within 1% of the run's final objective, and the final objective. Times come from
+# the CBC log (seconds since CBC started); the MIP start is an incumbent at time 0, after the
+# heuristic time shown separately. If CBC stops before even reading the MIP start, the heuristic
+# schedule is still the result, as in ScheduleOptimizer.run_solver.
+# Usage: python benchmarks/bench_warm_start.py [--datasets BasicData TwelfthGrade] [--synthetic] [--time-limits 2 5 10]
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+
+import pandas as pd
+from pyomo.environ import SolverFactory, value
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from optimization.heuristic_search import HeuristicSearch
+from optimization.schedule_optimizer import ScheduleOptimizer
+from synthetic import generate_school
+
+# CBC reports new incumbents as e.g. "Integer solution of -560.76667 found ... (0.72 seconds)"
+# or "Mini branch and bound improved solution from -558.2 to -560.767 (0.85 seconds)"
+INCUMBENT = re.compile(r"(?:Integer solution of|improved solution from \S+ to) (-?[\d.e+]+).*?\(([\d.]+) seconds\)")
+
+
+def load_dataset(name):
+    data_dir = os.path.join(os.path.dirname(__file__), "..", "tests", "data", name)
+    return tuple(
+        pd.read_csv(os.path.join(data_dir, f"{table}.csv"))
+        for table in ("Students", "Schedules", "Periods")
+    )
+
+
+# (time, objective) for every incumbent in a CBC log; objectives are made positive since
+# CBC minimizes the negated objective
+def parse_incumbents(log):
+    return [(float(m.group(2)), abs(float(m.group(1)))) for m in INCUMBENT.finditer(log)]
+
+
+def run(data, time_limit, heuristic_start):
+    optimizer = ScheduleOptimizer()
+    optimizer.students_df, optimizer.schedules_df, optimizer.periods_df = data
+    optimizer.build_lookups(optimizer.periods_df, optimizer.schedules_df)
+    optimizer.model = optimizer.initialize_model()
+
+    heuristic_time = 0.0
+    incumbents = []
+    if heuristic_start:
+        start = time.perf_counter()
+        optimizer.set_assignments(HeuristicSearch().solve(optimizer))
+        heuristic_time = time.perf_counter() - start
+        incumbents.append((0.0, optimizer.solution_objective(optimizer.solution)))
+
+    solver = SolverFactory("cbc")
+    solver.options["seconds"] = time_limit
+    with tempfile.NamedTemporaryFile(suffix=".log") as logfile:
+        start = time.perf_counter()
+        solver.solve(optimizer.model, tee=False, warmstart=heuristic_start, logfile=logfile.name)
+        wall = time.perf_counter() - start
+        incumbents += parse_incumbents(open(logfile.name).read())
+
+    # Without a CBC solution the variables hold the LP relaxation: fall back to the MIP start (or none)
+    x = optimizer.model.x.extract_values()
+    if optimizer.is_feasible([x[pair] for pair in optimizer.pairs]):
+        final = value(optimizer.model.obj)
+    else:
+        final = incumbents[0][1] if heuristic_start else None
+    first = incumbents[0][0] if incumbents else None
+    good = next((t for t, objective in incumbents if final and objective >= 0.99 * final), None)
+    return heuristic_time, first, good, final, wall
+
+
+def fmt(seconds):
+    return "-" if seconds is None else f"{seconds:.2f}s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CBC with and without a heuristic MIP start")
+    parser.add_argument("--datasets", nargs="*", default=["BasicData", "TwelfthGrade"], help="datasets in tests/data")
+    parser.add_argument("--synthetic", action="store_true", help="also run generated schools of increasing size")
+    parser.add_argument("--time-limits", nargs="+", type=float, default=[2, 5, 10])
+    args = parser.parse_args()
+
+    datasets = [(name, load_dataset(name)) for name in args.datasets]
+    if args.synthetic:
+        for n_students, n_courses in ((100, 20), (300, 40), (1000, 60)):
+            datasets.append((
+                f"synthetic {n_students}x{n_courses}",
+                generate_school(n_students=n_students, n_courses=n_courses, seed=n_students)
+            ))
+
+    print(f"{'dataset':<22} {'limit':>6} {'start':<10} {'heuristic':>9} {'first':>7} {'within 1%':>9} {'objective':>10} {'wall':>7}")
+    for name, data in datasets:
+        for time_limit in args.time_limits:
+            for label, heuristic_start in (("cold", False), ("heuristic", True)):
+                heuristic_time, first, good, final, wall = run(data, time_limit, heuristic_start)
+                objective = "none" if final is None else f"{final:.2f}"
+                print(f"{name:<22} {time_limit:>5g}s {label:<10} {fmt(heuristic_time):>9} {fmt(first):>7} "
+                      f"{fmt(good):>9} {objective:>10} {wall:>6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import random
+
+import pandas as pd
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# Generate a synthetic school as (students_df, schedules_df, periods_df) in the upload CSV layout.
+# Every section meets at one random period on each day; capacities are drawn so total seats
+# roughly match demand for each course.
+def generate_school(n_students=500, n_courses=40, sections_per_course=3, requests_per_student=6,
+                    n_days=5, periods_per_day=8, seed=0):
+    rng = random.Random(seed)
+    days = DAYS[:n_days]
+    courses = [f"Course {i}" for i in range(n_courses)]
+
+    students = []
+    demand = dict.fromkeys(courses, 0)
+    for i in range(n_students):
+        for course in rng.sample(courses, min(requests_per_student, n_courses)):
+            students.append((f"Student {i}", course))
+            demand[course] += 1
+
+    schedules = []
+    periods = []
+    for course in courses:
+        seats = max(1, round(demand[course] / sections_per_course * rng.uniform(0.8, 1.2)))
+        for section in range(1, sections_per_course + 1):
+            schedules.append((course, section, seats))
+            period = rng.randint(1, periods_per_day)
+            for day in days:
+                periods.append((course, section, day, period))
+
+    return (
+        pd.DataFrame(students, columns=["Student Name", "Course Name"]),
+        pd.DataFrame(schedules, columns=["Course Name", "Section", "Capacity"]),
+        pd.DataFrame(periods, columns=["Course Name", "Section", "Day of Week", "Period Number"]),
+    )
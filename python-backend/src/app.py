@@ -2,7 +2,8 @@ from flask import (
     Flask,
     request,
     jsonify,
-    g
+    g,
+    Response
 )
 
 from models import (
@@ -12,19 +13,35 @@ from models import (
     Schedules,
     Periods,
     AssignedCourses,
-    UnassignedCourses
+    UnassignedCourses,
+    PreviousAssignedCourses,
+    OptimizationJobs
 )
 
-from data_validation.schedule_data_validator import ScheduleDataValidator
+from data_validation.streaming_validator import StreamingScheduleDataValidator
 from optimization.schedule_optimizer import ScheduleOptimizer
 from utils import normalize_dataframe
+from encoding import encode_tables
+from instrumentation import Metrics, add_db_seconds, metrics_enabled, take_db_seconds
+from metrics_registry import SOLVE_BUCKETS, Registry
+from bulk_insert import bulk_insert_dataframe
+from result_cache import DatasetHash, ResultCache, result_key
 
 import os
+import json
+import logging
+import math
+import time
+import uuid
+import multiprocessing
 import pandas as pd
 
+from concurrent.futures import ProcessPoolExecutor
 from functools import wraps
 
 from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
 import jwt
 from datetime import datetime, timedelta, timezone
@@ -32,11 +49,136 @@ from google.auth import jwt as google_jwt
 
 load_dotenv()
 
+# Metrics (see instrumentation.Metrics) are logged as one JSON line per upload, /optimize request and job
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'))
+
 app = Flask(__name__)
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
 
+# Optimization jobs run on a process pool so solves don't hold web workers and use all cores.
+# Workers are spawned (not forked) and re-import this module to get their own app and DB engine.
+OPTIMIZER_WORKERS = int(os.getenv('OPTIMIZER_WORKERS', os.cpu_count() or 1))
+optimizer_pool = None
+
+def get_optimizer_pool():
+    global optimizer_pool
+    if optimizer_pool is None:
+        optimizer_pool = ProcessPoolExecutor(
+            max_workers=OPTIMIZER_WORKERS,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    return optimizer_pool
+
+# Drop the pool once it can't take jobs (a worker died and broke it), so the next job starts a new one
+def reset_optimizer_pool():
+    global optimizer_pool
+    if optimizer_pool is not None:
+        optimizer_pool.shutdown(wait=False)
+    optimizer_pool = None
+
+# Uploaded CSVs are read, normalized, validated and inserted this many rows at a time
+UPLOAD_CHUNK_ROWS = int(os.getenv('UPLOAD_CHUNK_ROWS', 50000))
+# Threads for the independent checks at the end of upload validation (1: on the request thread)
+VALIDATION_WORKERS = int(os.getenv('VALIDATION_WORKERS', 3))
+# Uploaded files in insert order: form field, table name in validation errors, model, columns to normalize
+UPLOAD_TABLES = [
+    ('students', 'Students', Students, ['Student Name', 'Course Name']),
+    ('schedules', 'Schedules', Schedules, ['Course Name']),
+    ('periods', 'Periods', Periods, ['Course Name', 'Day of Week']),
+]
+
+# Results of recent solves for all users, keyed by uploaded data hash and solver settings
+result_cache = ResultCache(max_entries=int(os.getenv('RESULT_CACHE_SIZE', 32)))
+
+# Process-wide metrics served at /metrics in the Prometheus text format (see metrics_registry).
+# Each web process has its own values, so scrape every process or run one per host.
+metrics_registry = Registry()
+request_seconds = metrics_registry.histogram(
+    'http_request_duration_seconds', 'Time to handle a request, by route', ('method', 'route', 'status')
+)
+request_db_seconds = metrics_registry.histogram(
+    'http_request_db_seconds', 'Time a request spent in database calls, by route', ('route',)
+)
+solves = metrics_registry.counter(
+    'optimizer_solves_total',
+    'Finished /optimize requests by outcome: optimal, time_limit, infeasible, other, failed, stale or cached',
+    ('outcome',)
+)
+solve_seconds = metrics_registry.histogram(
+    'optimizer_solve_duration_seconds', 'Time the optimizer took per job, without loading and storing data',
+    buckets=SOLVE_BUCKETS
+)
+jobs_in_flight = metrics_registry.gauge(
+    'optimizer_jobs_in_flight', 'Optimization jobs submitted to the process pool and not finished'
+)
+metrics_registry.gauge(
+    'optimizer_jobs_queued', 'Optimization jobs waiting for a free pool worker',
+    function=lambda: max(0, jobs_in_flight.totals().get((), 0) - OPTIMIZER_WORKERS)
+)
+
+# Time every statement of this process's DB engines, added to the running request's DB time
+@event.listens_for(Engine, 'before_cursor_execute')
+def start_db_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def stop_db_timer(conn, cursor, statement, parameters, context, executemany):
+    add_db_seconds(time.perf_counter() - conn.info['query_start'].pop())
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    take_db_seconds()
+
+# Requests are labelled by route pattern (e.g. /optimize/<job_id>), so labels stay few
+@app.after_request
+def observe_request(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        request_seconds.observe(
+            time.perf_counter() - start, method=request.method, route=route, status=response.status_code
+        )
+        request_db_seconds.observe(take_db_seconds(), route=route)
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    return Response(metrics_registry.render(), content_type=Registry.CONTENT_TYPE)
+
+# Server-side caps on the solver settings an /optimize request may ask for
+MAX_SOLVER_TIME_LIMIT = float(os.getenv('OPTIMIZER_MAX_TIME_LIMIT', 60))
+MAX_SOLVER_THREADS = int(os.getenv('OPTIMIZER_MAX_THREADS', os.cpu_count() or 1))
+
+# Solver settings from an /optimize request body: solver, fallback, time_limit (seconds),
+# threads, mip_gap and heuristic_start (see ScheduleOptimizer). Time limit and threads are capped; invalid values raise ValueError.
+# Every setting is filled in, so equal settings give equal result cache keys.
+def parse_solver_settings(options):
+    settings = {'solver': options.get('solver') or 'cbc', 'fallback': options.get('fallback')}
+    for name in settings.values():
+        if name is not None and name not in ScheduleOptimizer.SOLVERS:
+            raise ValueError(f"Unknown solver '{name}', expected one of: {', '.join(sorted(ScheduleOptimizer.SOLVERS))}")
+    try:
+        time_limit = float(options.get('time_limit', 10))
+        threads = int(options['threads']) if options.get('threads') is not None else None
+        mip_gap = float(options['mip_gap']) if options.get('mip_gap') is not None else None
+    except (TypeError, ValueError):
+        raise ValueError("time_limit, threads and mip_gap must be numbers")
+    # NaN passes the comparisons below and min() keeps it, and CBC takes it as no limit
+    if not math.isfinite(time_limit):
+        raise ValueError("time_limit must be a finite number")
+    if time_limit <= 0 or (threads is not None and threads <= 0):
+        raise ValueError("time_limit and threads must be positive")
+    if mip_gap is not None and not 0 <= mip_gap <= 1:
+        raise ValueError("mip_gap must be between 0 and 1")
+    settings['time_limit'] = min(time_limit, MAX_SOLVER_TIME_LIMIT)
+    settings['threads'] = min(threads, MAX_SOLVER_THREADS) if threads is not None else None
+    settings['mip_gap'] = mip_gap
+    settings['heuristic_start'] = bool(options.get('heuristic_start', False))
+    return settings
+
     
 @app.route('/api/auth/google', methods=['POST'])
 def api_auth_google():
@@ -137,23 +279,16 @@ def upload_data():
             "message": f"Missing required CSV file(s): {', '.join(sorted(missing_files))}"
         }), 400
 
+    metrics = Metrics(enabled=metrics_enabled(), user_id=user_id)
     try:
+        # Open every file first, so empty CSVs are reported before any work is done
         empty_csvs = []
-        def read_csv_file(file_key):
+        readers = {}
+        for file_key, _, _, _ in UPLOAD_TABLES:
             try:
-                return pd.read_csv(request.files[file_key])
+                readers[file_key] = pd.read_csv(request.files[file_key], chunksize=UPLOAD_CHUNK_ROWS)
             except pd.errors.EmptyDataError:
                 empty_csvs.append(file_key)
-                return None
-
-        students = read_csv_file('students')
-        schedules = read_csv_file('schedules')
-        periods = read_csv_file('periods')
-
-        # Normalize dataframes
-        students = normalize_dataframe(students, value_columns=['Student Name', 'Course Name'])
-        schedules = normalize_dataframe(schedules, value_columns=['Course Name'])
-        periods = normalize_dataframe(periods, value_columns=['Course Name', 'Day of Week'])
 
         if empty_csvs:
             return jsonify({
@@ -161,51 +296,59 @@ def upload_data():
                 "message": f"The following CSVs are empty: {', '.join(empty_csvs)}"
             }), 400
 
-        # Validate data before inserting
-        validator = ScheduleDataValidator()
-        valid, errors = validator.validate(students, schedules, periods)
-        if not valid:
-            return jsonify({
-                "status": "Error",
-                "message": "Validation failed",
-                "errors": errors if errors else []
-            }), 400
-
-        # Remove old data for this user
+        # Replace this user's data in a single transaction. Each file is streamed through
+        # normalization, validation and the bulk insert one chunk at a time, so memory stays
+        # bounded by the chunk size; cross-file checks run at the end on integer-coded keys.
+        lock_user(user_id)
+        save_previous_assignments(user_id)
         Students.query.filter_by(user_id=user_id).delete()
         Schedules.query.filter_by(user_id=user_id).delete()
         Periods.query.filter_by(user_id=user_id).delete()
         AssignedCourses.query.filter_by(user_id=user_id).delete()
         UnassignedCourses.query.filter_by(user_id=user_id).delete()
-        db.session.commit()
 
-        # Insert new data
-        for _, row in students.iterrows():
-            db.session.add(Students(
-                user_id=user_id,
-                student_name=row['Student Name'],
-                course_name=row['Course Name']
-            ))
-        for _, row in schedules.iterrows():
-            db.session.add(Schedules(
-                user_id=user_id,
-                course_name=row['Course Name'],
-                section=row['Section'],
-                capacity=row['Capacity']
-            ))
-        for _, row in periods.iterrows():
-            db.session.add(Periods(
-                user_id=user_id,
-                course_name=row['Course Name'],
-                section=row['Section'],
-                day_of_week=row['Day of Week'],
-                period_number=row['Period Number']
-            ))
+        validator = StreamingScheduleDataValidator(parallel=VALIDATION_WORKERS > 1, max_workers=VALIDATION_WORKERS)
+        data_hash = DatasetHash()
+        for file_key, name, model, value_columns in UPLOAD_TABLES:
+            chunks = iter(readers[file_key])
+            while True:
+                with metrics.phase('read'):
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                with metrics.phase('normalize'):
+                    chunk = normalize_dataframe(chunk, value_columns=value_columns)
+                with metrics.phase('validate'):
+                    validator.add_chunk(name, chunk)
+                # Stop inserting once the upload is known to be invalid, but keep validating to report every error
+                if not validator.has_errors():
+                    with metrics.phase('insert'):
+                        bulk_insert_dataframe(model, chunk, user_id)
+                    with metrics.phase('hash'):
+                        data_hash.update(chunk)
+
+        with metrics.phase('validate'):
+            valid, errors = validator.finish()
+        metrics.record('rows', **{name: table.rows for name, table in validator.tables.items()})
+        if not valid:
+            db.session.rollback()
+            metrics.record('result', valid=False, errors=len(errors))
+            metrics.log('upload')
+            return jsonify({
+                "status": "Error",
+                "message": "Validation failed",
+                "errors": errors if errors else []
+            }), 400
 
-        db.session.commit()
+        g.user.data_hash = data_hash.hexdigest()
+        with metrics.phase('commit'):
+            db.session.commit()
+        metrics.record('result', valid=True)
+        metrics.log('upload')
 
         return jsonify({"status": "Success", "message": "Files uploaded and validated"})
     except Exception as e:
+        db.session.rollback()
         return jsonify({"status": "Error", "message": str(e)}), 400
 
 @app.route('/optimize', methods=['POST'])
@@ -214,46 +357,192 @@ def optimize_schedule():
     user_id = g.user.id  # Set after SSO
 
     # Check if data is uploaded
-    students, schedules, periods = get_user_uploaded_data(user_id)
-    if students is None or schedules is None or periods is None:
-        return jsonify({"status": "Error", "message": "Data not uploaded"}), 400
-    if students.empty or schedules.empty or periods.empty:
+    if not is_data_uploaded(user_id):
         return jsonify({"status": "Error", "message": "Data not uploaded"}), 400
-    
-    # Run the optimizer
-    optimizer = ScheduleOptimizer()
-    optimizer.run_solver(students, schedules, periods)
-    
-    # Get assignments and unassigned courses
-    assigned = optimizer.get_assigned_courses()  # DataFrame: Student Name, Course Name, Section
-    unassigned = optimizer.get_unassigned_courses()  # DataFrame: Student Name, Course Name
 
-    # Remove old results for this user
-    AssignedCourses.query.filter_by(user_id=user_id).delete()
-    UnassignedCourses.query.filter_by(user_id=user_id).delete()
-    db.session.commit()
+    # {"incremental": true} warm starts the solver from the previous assignments;
+    # solver, fallback, time_limit, threads, mip_gap and heuristic_start configure the solver (see parse_solver_settings)
+    options = request.get_json(silent=True) or {}
+    incremental = bool(options.get('incremental', False))
+    try:
+        solver_settings = parse_solver_settings(options)
+    except ValueError as e:
+        return jsonify({"status": "Error", "message": str(e)}), 400
 
-    # Insert assigned courses
-    for _, row in assigned.iterrows():
-        db.session.add(AssignedCourses(
-            user_id=user_id,
-            student_name=row['Student Name'],
-            course_name=row['Course Name'],
-            section=int(row['Section'])
-        ))
-
-    # Insert unassigned courses
-    for _, row in unassigned.iterrows():
-        db.session.add(UnassignedCourses(
-            user_id=user_id,
-            student_name=row['Student Name'],
-            unassigned_course_name=row['Unassigned Course Name'],
-            reason=row['Reason'] if 'Reason' in row else 'No reason provided'
-        ))
+    metrics = Metrics(enabled=metrics_enabled(), user_id=user_id, job_id=str(uuid.uuid4()))
+
+    # The same data solved with the same settings (by any user) is served from the result cache.
+    # Incremental runs depend on the previous assignments too, so they always solve.
+    if g.user.data_hash is not None and not incremental:
+        with metrics.phase('cache_lookup'):
+            cached = result_cache.get(result_key(g.user.data_hash, solver_settings))
+        if cached is not None:
+            assigned, unassigned = cached
+            with metrics.phase('store_results'):
+                stored = store_optimization_results(user_id, assigned, unassigned, g.user.data_hash)
+            # If the data was uploaded again since this request started, the new data is solved below
+            if stored:
+                metrics.record('result', cached=True, assigned=len(assigned), unassigned=len(unassigned))
+                solves.inc(outcome='cached')
+                job = OptimizationJobs(
+                    id=metrics.context['job_id'],
+                    user_id=user_id,
+                    status='Complete',
+                    progress='Done (cached result)',
+                    assigned_count=len(assigned),
+                    unassigned_count=len(unassigned),
+                    finished_at=db.func.now(),
+                    metrics=metrics_json(metrics)
+                )
+                db.session.add(job)
+                db.session.commit()
+                metrics.log('optimize_request')
+                return jsonify({"status": "Accepted", "message": "Optimization served from cache", "job_id": job.id}), 202
+
+    # Queue the optimizer run and return immediately
+    with metrics.phase('queue'):
+        job = OptimizationJobs(id=metrics.context['job_id'], user_id=user_id, status='Queued', progress='Waiting for a worker')
+        db.session.add(job)
+        db.session.commit()
 
-    db.session.commit()
+        try:
+            future = get_optimizer_pool().submit(run_optimization_job, job.id, user_id, incremental, solver_settings)
+        except Exception as e:
+            reset_optimizer_pool()
+            update_job(job.id, status='Failed', progress='Done', error=str(e), finished_at=db.func.now())
+            solves.inc(outcome='failed')
+            metrics.log('optimize_request')
+            return jsonify({"status": "Error", "message": "Optimizer unavailable, try again", "job_id": job.id}), 503
+        # Counted once submitted (a failed submit leaves nothing to decrement it) and before
+        # handle_job_done can run, which it does right away if the job is already done
+        jobs_in_flight.inc()
+        future.add_done_callback(lambda f, job_id=job.id: handle_job_done(f, job_id))
+    metrics.log('optimize_request')
+
+    return jsonify({"status": "Accepted", "message": "Optimization queued", "job_id": job.id}), 202
+
+@app.route('/optimize/<job_id>', methods=['GET'])
+@login_required
+def get_optimization_job(job_id):
+    job = OptimizationJobs.query.filter_by(id=job_id, user_id=g.user.id).first()
+    if not job:
+        return jsonify({"status": "Error", "message": "Optimization job not found"}), 404
+    data = {
+        "job_id": job.id,
+        "status": job.status,
+        "progress": job.progress
+    }
+    if job.status == 'Complete':
+        data["message"] = "Optimization complete, assignments stored"
+        data["result"] = {
+            "assigned_courses": job.assigned_count,
+            "unassigned_courses": job.unassigned_count
+        }
+    elif job.status == 'Failed':
+        data["message"] = job.error
+    return jsonify(data)
 
-    return jsonify({"status": "Success", "message": "Optimization complete, assignments stored"})
+# Phase timings, model size and solver stats of a job, recorded as it runs. Metrics are null
+# while the job is queued or running, or if metrics are disabled (METRICS_ENABLED=0).
+@app.route('/optimize/<job_id>/metrics', methods=['GET'])
+@login_required
+def get_optimization_job_metrics(job_id):
+    job = OptimizationJobs.query.filter_by(id=job_id, user_id=g.user.id).first()
+    if not job:
+        return jsonify({"status": "Error", "message": "Optimization job not found"}), 404
+    return jsonify({
+        "job_id": job.id,
+        "status": job.status,
+        "metrics": json.loads(job.metrics) if job.metrics else None
+    })
+
+# Runs in an optimizer pool worker process
+def run_optimization_job(job_id, user_id, incremental=False, solver_settings=None):
+    with app.app_context():
+        # Phases of the job, and of the optimizer (build_lookups, initialize_model, solve_model, ...)
+        metrics = Metrics(enabled=metrics_enabled(), job_id=job_id, user_id=user_id)
+        try:
+            update_job(job_id, status='Running', progress='Loading uploaded data')
+            with metrics.phase('load_data'):
+                # The hash and the data are read from one snapshot, so a concurrent upload can't get
+                # this job's results cached under the hash of data it didn't solve
+                connection = snapshot_connection()
+                data_hash = db.session.get(Users, user_id).data_hash
+                students, schedules, periods = get_user_uploaded_data(user_id, connection)
+                previous = get_previous_assignments(user_id, connection) if incremental else None
+                db.session.commit()
+                if students is None or schedules is None or periods is None:
+                    raise ValueError("Data not uploaded")
+
+            # Run the optimizer
+            update_job(job_id, progress='Solving')
+            with metrics.phase('solve'):
+                start = time.perf_counter()
+                optimizer = ScheduleOptimizer(**(solver_settings or {}), metrics=metrics)
+                optimizer.run_solver(students, schedules, periods, previous_assignments=previous)
+                seconds = time.perf_counter() - start
+
+            # Get assignments and unassigned courses
+            with metrics.phase('results'):
+                assigned = optimizer.get_assigned_courses()  # DataFrame: Student Name, Course Name, Section
+                unassigned = optimizer.get_unassigned_courses()  # DataFrame: Student Name, Course Name
+            metrics.record('result', cached=False, assigned=len(assigned), unassigned=len(unassigned))
+
+            update_job(job_id, progress='Saving results')
+            with metrics.phase('store_results'):
+                stored = store_optimization_results(user_id, assigned, unassigned, data_hash)
+            # Returned to the web process, which adds the results to its cache and counts the solve
+            cache_key = result_key(data_hash, solver_settings) if data_hash is not None and not incremental else None
+            if not stored:
+                # The results still belong to the data they were solved from, so they are cached
+                metrics.record('result', stale=True)
+                update_job(
+                    job_id, status='Failed', progress='Done', finished_at=db.func.now(),
+                    error='Data was uploaded again while optimizing, results discarded',
+                    metrics=metrics_json(metrics)
+                )
+                metrics.log('optimize_job')
+                return cache_key, assigned, unassigned, 'stale', seconds
+
+            update_job(
+                job_id,
+                status='Complete',
+                progress='Done',
+                assigned_count=len(assigned),
+                unassigned_count=len(unassigned),
+                finished_at=db.func.now(),
+                metrics=metrics_json(metrics)
+            )
+            metrics.log('optimize_job')
+            return cache_key, assigned, unassigned, optimizer.outcome or 'other', seconds
+        except Exception as e:
+            db.session.rollback()
+            metrics.record('result', error=str(e))
+            update_job(
+                job_id, status='Failed', progress='Done', error=str(e), finished_at=db.func.now(),
+                metrics=metrics_json(metrics)
+            )
+            metrics.log('optimize_job')
+
+# Caches the results of a finished job and counts its outcome, or marks the job as failed if its
+# worker process died before it could report back
+def handle_job_done(future, job_id):
+    jobs_in_flight.dec()
+    if future.cancelled():
+        return
+    if future.exception() is None:
+        if future.result() is None:
+            solves.inc(outcome='failed')
+        else:
+            cache_key, assigned, unassigned, outcome, seconds = future.result()
+            solves.inc(outcome=outcome)
+            solve_seconds.observe(seconds)
+            if cache_key is not None:
+                result_cache.put(cache_key, (assigned, unassigned))
+        return
+    solves.inc(outcome='failed')
+    with app.app_context():
+        update_job(job_id, status='Failed', progress='Done', error=str(future.exception()), finished_at=db.func.now())
 
 @app.route('/assigned_courses', methods=['GET'])
 @login_required
@@ -306,25 +595,22 @@ def get_class_roster():
         return jsonify({"status": "Error", "message": "Section must be an integer"}), 400
 
     try:
-        # Get schedules DataFrame for this user
-        schedules_df = pd.read_sql(
-            Schedules.query.filter_by(user_id=user_id).statement, db.engine
-        )
-        match = schedules_df['Course Name'].str.lower() == course.strip().lower()
-        if not match.any():
-            return jsonify({"status": "Error", "message": "The given course/section does not exist"}), 404
-        course_name = schedules_df.loc[match, 'Course Name'].iloc[0]
-
-        # Get assigned courses DataFrame for this user
-        assigned_df = pd.read_sql(
-            AssignedCourses.query.filter_by(user_id=user_id).statement, db.engine
-        )
-        roster = assigned_df[
-            (assigned_df['Course Name'] == course_name) & (assigned_df['Section'] == section)
-        ]
-        if roster.empty:
+        # Case-insensitive course lookup joined to the roster in one indexed query
+        roster = db.session.query(AssignedCourses.student_name).join(
+            Schedules,
+            db.and_(
+                Schedules.user_id == AssignedCourses.user_id,
+                Schedules.course_name == AssignedCourses.course_name,
+                Schedules.section == AssignedCourses.section
+            )
+        ).filter(
+            Schedules.user_id == user_id,
+            db.func.lower(Schedules.course_name) == db.func.lower(course.strip()),
+            Schedules.section == section
+        ).order_by(AssignedCourses.id).all()
+        if not roster:
             return jsonify({"status": "Error", "message": "The given course/section does not exist"}), 404
-        return roster['Student Name'].to_json(orient='values')
+        return jsonify([r.student_name for r in roster])
     except Exception:
         return jsonify({"status": "Error", "message": "The given course/section does not exist"}), 404
 
@@ -339,21 +625,20 @@ def get_student_schedule():
         return jsonify({"status": "Error", "message": "Missing student parameter"}), 400
 
     try:
-        # Get students DataFrame for this user
-        students_df = pd.read_sql(
-            Students.query.filter_by(user_id=user_id).statement, db.engine
+        # The student's stored names (looked up case-insensitively, one row per requested course).
+        # Assignments are filtered on them with IN, so each is read once however many rows match.
+        student_rows = Students.query.filter(
+            Students.user_id == user_id,
+            db.func.lower(Students.student_name) == db.func.lower(student.strip())
         )
-        match = students_df['Student Name'].str.lower() == student.strip().lower()
-        if not match.any():
+        schedule = db.session.query(AssignedCourses.course_name, AssignedCourses.section).filter(
+            AssignedCourses.user_id == user_id,
+            AssignedCourses.student_name.in_(student_rows.with_entities(Students.student_name))
+        ).order_by(AssignedCourses.course_name, AssignedCourses.section).all()
+        # A known student without assignments has an empty schedule
+        if not schedule and not db.session.query(student_rows.exists()).scalar():
             return jsonify({"status": "Error", "message": f"Student '{student}' not found for this user"}), 404
-        student_name = students_df.loc[match, 'Student Name'].iloc[0]
-
-        # Get assigned courses DataFrame for this user
-        assigned_df = pd.read_sql(
-            AssignedCourses.query.filter_by(user_id=user_id).statement, db.engine
-        )
-        schedule = assigned_df[assigned_df['Student Name'] == student_name]
-        data = schedule[['Course Name', 'Section']].to_dict(orient='records')
+        data = [{"Course Name": r.course_name, "Section": r.section} for r in schedule]
         return jsonify(data)
     except Exception:
         return jsonify({"status": "Error", "message": f"Student '{student}' not found for this user"}), 404
@@ -398,14 +683,92 @@ def get_all_student_schedules():
         })
     return jsonify(schedules)
 
-# Get the uploaded data for a user
-def get_user_uploaded_data(user_id):
-    students = pd.read_sql(Students.query.filter_by(user_id=user_id).statement, db.engine)
-    schedules = pd.read_sql(Schedules.query.filter_by(user_id=user_id).statement, db.engine)
-    periods = pd.read_sql(Periods.query.filter_by(user_id=user_id).statement, db.engine)
+# Get the uploaded data for a user, with names as Categoricals (see encoding.encode_tables)
+def get_user_uploaded_data(user_id, connection=None):
+    connection = connection if connection is not None else db.engine
+    students = pd.read_sql(Students.query.filter_by(user_id=user_id).statement, connection)
+    schedules = pd.read_sql(Schedules.query.filter_by(user_id=user_id).statement, connection)
+    periods = pd.read_sql(Periods.query.filter_by(user_id=user_id).statement, connection)
     if students.empty or schedules.empty or periods.empty:
         return None, None, None
-    return students, schedules, periods
+    return encode_tables(students, schedules, periods)
+
+# Assignments to warm start an incremental run from: the current results, or if the data was
+# re-uploaded since, the results from before that upload. None if the user never optimized.
+def get_previous_assignments(user_id, connection=None):
+    connection = connection if connection is not None else db.engine
+    for model in (AssignedCourses, PreviousAssignedCourses):
+        previous = pd.read_sql(model.query.filter_by(user_id=user_id).statement, connection)
+        if not previous.empty:
+            return previous
+    return None
+
+# Keep the current assignments (if any) as the warm start for the data about to be uploaded.
+# Runs inside the upload transaction.
+def save_previous_assignments(user_id):
+    if not db.session.query(AssignedCourses.query.filter_by(user_id=user_id).exists()).scalar():
+        return
+    PreviousAssignedCourses.query.filter_by(user_id=user_id).delete()
+    columns = ['user_id', 'student_name', 'course_name', 'section']
+    db.session.execute(
+        db.insert(PreviousAssignedCourses).from_select(
+            [getattr(PreviousAssignedCourses, c) for c in columns],
+            db.select(*[getattr(AssignedCourses, c) for c in columns]).filter_by(user_id=user_id)
+        )
+    )
+
+# Lock the user's row until the current transaction ends and return their data hash as of the lock.
+# Everything that replaces a user's rows (uploads, stored results) takes it first: under READ COMMITTED
+# two overlapping delete-and-insert transactions would otherwise both keep their inserts. SQLite has
+# no row locks (FOR UPDATE is left out) but only runs one write transaction at a time anyway.
+def lock_user(user_id):
+    return db.session.execute(db.select(Users.data_hash).filter_by(id=user_id).with_for_update()).scalar_one()
+
+# Begin a session transaction whose reads all see one snapshot of the database (REPEATABLE READ on
+# Postgres) and return its connection. The session must not be in a transaction yet.
+def snapshot_connection():
+    options = {'isolation_level': 'REPEATABLE READ'} if db.engine.dialect.name == 'postgresql' else {}
+    return db.session.connection(execution_options=options)
+
+# Replace the stored optimization results for a user, if they were solved from the user's current
+# data (data_hash is the hash of the data they were solved from). Returns False, storing nothing,
+# if the data was uploaded again since.
+# Delete and insert share one transaction, so readers see either the old or the new result set,
+# and the user's lock makes overlapping jobs replace the results one after the other.
+def store_optimization_results(user_id, assigned, unassigned, data_hash):
+    if 'Reason' not in unassigned.columns:
+        unassigned = unassigned.assign(Reason='No reason provided')
+    try:
+        if lock_user(user_id) != data_hash:
+            db.session.rollback()
+            return False
+        AssignedCourses.query.filter_by(user_id=user_id).delete()
+        UnassignedCourses.query.filter_by(user_id=user_id).delete()
+        bulk_insert_dataframe(AssignedCourses, assigned, user_id)
+        bulk_insert_dataframe(UnassignedCourses, unassigned, user_id)
+        db.session.commit()
+        return True
+    except Exception:
+        db.session.rollback()
+        raise
+
+# Metrics as stored on an optimization job: JSON, or None if metrics are disabled
+def metrics_json(metrics):
+    return json.dumps(metrics.as_dict(), default=str) if metrics.enabled else None
+
+# Update the columns of an optimization job and commit
+def update_job(job_id, **columns):
+    OptimizationJobs.query.filter_by(id=job_id).update(
+        {getattr(OptimizationJobs, name): value for name, value in columns.items()}
+    )
+    db.session.commit()
+
+# Checks if a user has uploaded students, schedules and periods
+def is_data_uploaded(user_id):
+    return all(
+        db.session.query(model.query.filter_by(user_id=user_id).exists()).scalar()
+        for model in (Students, Schedules, Periods)
+    )
 
 # Checks if the data for a user has been optimized
 def is_data_optimized(user_id):
@@ -0,0 +1,49 @@
+import io
+import time
+
+import pandas as pd
+
+from instrumentation import add_db_seconds
+from models import db
+
+# Insert every row of df into the model's table for a user, inside the current session transaction.
+# DataFrame columns are matched to table columns by name ("Student Name", "Section", ...), so
+# df must contain every table column except "ID" and "User ID".
+# PostgreSQL (psycopg2) gets a single COPY FROM STDIN; other engines get one executemany INSERT.
+def bulk_insert_dataframe(model, df, user_id):
+    table = model.__table__
+    columns = [c for c in table.columns if not c.primary_key and c.name != 'User ID']
+    data = pd.DataFrame({'User ID': user_id}, index=df.index)
+    for column in columns:
+        values = df[column.name]
+        # Integer columns may arrive as int-like floats or strings (e.g. "1.0") that passed validation
+        if column.type.python_type is int:
+            values = pd.to_numeric(values).astype('int64')
+        data[column.name] = values
+    if data.empty:
+        return
+
+    connection = db.session.connection()
+    if connection.dialect.name == 'postgresql':
+        cursor = connection.connection.cursor()
+        try:
+            if hasattr(cursor, 'copy_expert'):
+                copy_dataframe(cursor, connection.dialect.identifier_preparer, table, data)
+                return
+        finally:
+            cursor.close()
+
+    db.session.execute(table.insert(), data.to_dict(orient='records'))
+
+# Stream a DataFrame into a table with psycopg2's COPY FROM STDIN (CSV format)
+def copy_dataframe(cursor, preparer, table, data):
+    column_list = ', '.join(preparer.quote(name) for name in data.columns)
+    buffer = io.StringIO()
+    data.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    start = time.perf_counter()
+    cursor.copy_expert(
+        f"COPY {preparer.format_table(table)} ({column_list}) FROM STDIN WITH (FORMAT csv)",
+        buffer
+    )
+    add_db_seconds(time.perf_counter() - start)
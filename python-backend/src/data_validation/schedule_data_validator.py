@@ -1,92 +1,139 @@
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+import numpy as np
 import pandas as pd
 
 class ScheduleDataValidator:
     VALID_DAYS = {"Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"}
+    REQUIRED_COLUMNS = {
+        "Students": {"Student Name", "Course Name"},
+        "Schedules": {"Course Name", "Section", "Capacity"},
+        "Periods": {"Course Name", "Section", "Day of Week", "Period Number"},
+    }
+    INT_COLUMNS = {
+        "Students": [],
+        "Schedules": ["Section", "Capacity"],
+        "Periods": ["Section", "Period Number"],
+    }
+
+    # Key columns that must be unique in each table, and which of them compare case-insensitively
+    DUPLICATE_KEYS = {
+        "Students": (["Student Name", "Course Name"], {"Student Name", "Course Name"}),
+        "Schedules": (["Course Name", "Section"], {"Course Name"}),
+        "Periods": (["Course Name", "Section", "Day of Week", "Period Number"], {"Course Name", "Day of Week"}),
+    }
 
-    def __init__(self):
+    # parallel runs the independent checks of each stage concurrently on a thread pool of max_workers
+    # threads (pandas releases the GIL in most of the work); errors and their order are the same either way
+    def __init__(self, parallel=False, max_workers=None):
         self.errors = []
+        self.parallel = parallel
+        self.max_workers = max_workers
 
     def validate(self, students_df, schedules_df, periods_df):
-        self.errors.clear()  
-        # List of validation steps in order
-        # Group validation steps that can be done in parallel
+        self.errors.clear()
+        # Validation stages in order, stopping at the first one that finds errors. Each stage is
+        # a list of checks that don't depend on each other; a check takes the validator to report to.
         validation_steps = [
-            lambda: [self._validate_students(students_df),
-                 self._validate_schedules(schedules_df),
-                 self._validate_periods(periods_df)],
-            lambda: self._check_empty(students_df, schedules_df, periods_df),
-            lambda: self._check_duplicates(students_df, schedules_df, periods_df),
-            lambda: self._check_referential_integrity(students_df, schedules_df, periods_df),
-            lambda: [self._check_capacity(schedules_df),
-                 self._check_period_number(periods_df)],
+            [lambda v: v._validate_students(students_df),
+             lambda v: v._validate_schedules(schedules_df),
+             lambda v: v._validate_periods(periods_df)],
+            # Only check days if columns and nulls returned no errors
+            [lambda v: v._check_days(periods_df, "Day of Week", "Periods")],
+            [lambda v: v._check_empty(students_df, schedules_df, periods_df)],
+            [lambda v: v._check_table_duplicates(students_df, "Students"),
+             lambda v: v._check_table_duplicates(schedules_df, "Schedules"),
+             lambda v: v._check_table_duplicates(periods_df, "Periods")],
+            [lambda v: v._check_unknown_courses(students_df, schedules_df),
+             lambda v: v._check_section_periods(schedules_df, periods_df)],
+            [lambda v: v._check_capacity(schedules_df),
+             lambda v: v._check_period_number(periods_df)],
         ]
-        for step in validation_steps:
-            if self.errors:
-                return False, self.errors
-            step()
+        with ThreadPoolExecutor(max_workers=self.max_workers) if self.parallel else nullcontext() as executor:
+            for step in validation_steps:
+                if self.errors:
+                    return False, self.errors
+                self._run_checks(step, executor)
         if self.errors:
             return False, self.errors
         return True, self.errors
 
+    # Run the checks of a stage, concurrently if there is an executor. Concurrent checks each report
+    # to their own copy of the validator, and the errors are merged in the order the checks are listed.
+    def _run_checks(self, checks, executor):
+        if executor is None or len(checks) == 1:
+            for check in checks:
+                check(self)
+            return
+        for errors in executor.map(self._run_check, checks):
+            self.errors.extend(errors)
+
+    def _run_check(self, check):
+        validator = copy.copy(self)
+        validator.errors = []
+        check(validator)
+        return validator.errors
+
     def _validate_students(self, df):
-        required_columns = {"Student Name", "Course Name"}
+        required_columns = self.REQUIRED_COLUMNS["Students"]
         self._check_columns(df, required_columns, "Students")
         self._check_nulls(df, required_columns, "Students")
 
     def _validate_schedules(self, df):
-        required_columns = {"Course Name", "Section", "Capacity"}
+        required_columns = self.REQUIRED_COLUMNS["Schedules"]
         self._check_columns(df, required_columns, "Schedules")
         self._check_nulls(df, required_columns, "Schedules")
         # Only check int if there are no nulls in the columns
-        for col in ["Section", "Capacity"]:
+        for col in self.INT_COLUMNS["Schedules"]:
             if col in df.columns and not df[col].isnull().any():
                 self._check_int(df, [col], "Schedules")
 
     def _validate_periods(self, df):
-        required_columns = {"Course Name", "Section", "Day of Week", "Period Number"}
+        required_columns = self.REQUIRED_COLUMNS["Periods"]
         self._check_columns(df, required_columns, "Periods")
         self._check_nulls(df, required_columns, "Periods")
         # Only check int if there are no nulls in the columns
-        for col in ["Section", "Period Number"]:
+        for col in self.INT_COLUMNS["Periods"]:
             if col in df.columns and not df[col].isnull().any():
                 self._check_int(df, [col], "Periods")
-        # Only check days if columns and nulls returned no errors
-        if not self.errors:
-            self._check_days(df, "Day of Week", "Periods")
 
     # Check if any required columns are missing
     def _check_columns(self, df, required, name):
-        missing = required - set(df.columns)
-        if missing:
-            self.errors.append(f"{name} data missing columns: {', '.join(missing)}")
+        self._report_missing_columns(name, required - set(df.columns))
 
     # Check if any columns have null values and report the rows
     def _check_nulls(self, df, columns, name):
         for col in columns:
-            if col in df.columns and df[col].isnull().any():
-                null_rows = df[df[col].isnull()]
-                row_indices = self._display_rows(null_rows.index.tolist())
-                self.errors.append(
-                    f"{name} data has null values in column: {col} (rows: {row_indices})"
-                )
+            if col in df.columns:
+                self._report_nulls(name, col, df.index[df[col].isnull().to_numpy()].tolist())
 
     # Check if the required columns have only integers
     def _check_int(self, df, columns, name):
         for col in columns:
             if col in df.columns:
-                def is_int_like(x):
-                    try:
-                        return float(x).is_integer()
-                    except:
-                        return False
+                invalid_mask = self._non_int_mask(df[col])
+                self._report_non_int(name, col, df.index[invalid_mask].tolist())
 
-                invalid_mask = df[col].apply(lambda x: not is_int_like(x))
-                invalid_rows = df.index[invalid_mask].tolist()
-                if invalid_rows:
-                    self.errors.append(
-                        f"{name} data column '{col}' must contain integer-like values. Invalid rows: {self._display_rows(invalid_rows)}"
-                    )
 
+    # Mask of the values in a column that aren't integer-like (float(x).is_integer() fails or is False).
+    # Numbers and numeric strings are checked on the whole column at once; only values pd.to_numeric
+    # can't parse (e.g. "1_000", or text) fall back to float(x) one at a time.
+    def _non_int_mask(self, series):
+        def is_int_like(x):
+            try:
+                return float(x).is_integer()
+            except:
+                return False
+
+        values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        with np.errstate(invalid="ignore"):
+            int_like = np.isfinite(values) & (np.floor(values) == values)
+        unparsed = np.isnan(values) & series.notna().to_numpy()
+        if unparsed.any():
+            int_like[unparsed] = [is_int_like(x) for x in series[unparsed]]
+        return pd.Series(~int_like, index=series.index)
 
     # Check if the 'Day of Week' column contains valid days
     def _check_days(self, df, col, name):
@@ -94,122 +141,151 @@ class ScheduleDataValidator:
             invalid_mask = ~df[col].isin(self.VALID_DAYS)
             if invalid_mask.any():
                 invalid_days = set(df[col][invalid_mask].unique())
-                invalid_rows = df.index[invalid_mask].tolist()
-                self.errors.append(
-                    f"{name} data has invalid days: {', '.join(map(str, invalid_days))} (rows: {self._display_rows(invalid_rows)})"
-                )
+                self._report_invalid_days(name, invalid_days, df.index[invalid_mask].tolist())
 
     # Check referential integrity between students, schedules, and periods
     def _check_referential_integrity(self, students_df, schedules_df, periods_df):
+        self._check_unknown_courses(students_df, schedules_df)
+        self._check_section_periods(schedules_df, periods_df)
+
+    # Check that students only request courses in the schedules
+    def _check_unknown_courses(self, students_df, schedules_df):
         if "Course Name" in students_df.columns and "Course Name" in schedules_df.columns:
-            valid_courses = set(schedules_df["Course Name"])
-            invalid_courses = set(students_df["Course Name"]) - valid_courses
-            if invalid_courses:
-                invalid_rows = students_df[students_df["Course Name"].isin(invalid_courses)].index.tolist()
-                self.errors.append(
-                    f"Students data references unknown courses: {', '.join(map(str, invalid_courses))} (rows: {self._display_rows(invalid_rows)})"
-                )
-        if {"Course Name", "Section"}.issubset(schedules_df.columns) and {"Course Name", "Section"}.issubset(periods_df.columns):
-            schedule_keys = set(zip(schedules_df["Course Name"], schedules_df["Section"]))
-            period_keys = set(zip(periods_df["Course Name"], periods_df["Section"]))
-            invalid_periods = period_keys - schedule_keys
-            if invalid_periods:
-                invalid_rows = periods_df[
-                    periods_df.apply(
-                        lambda row: (row["Course Name"], row["Section"]) in invalid_periods, axis=1
-                    )
-                ].index.tolist()
-                self.errors.append(
-                    f"Periods data references unknown course-section pairs: {invalid_periods} (rows: {self._display_rows(invalid_rows)})"
-                )
-        # Check if any course-section in schedules does not have a corresponding period (i.e., does not meet at all)
+            invalid_mask = ~students_df["Course Name"].isin(schedules_df["Course Name"])
+            if invalid_mask.any():
+                invalid_courses = set(students_df["Course Name"][invalid_mask].unique())
+                self._report_unknown_courses(invalid_courses, students_df.index[invalid_mask].tolist())
+
+    # Check that periods and schedules have the same course-sections
+    def _check_section_periods(self, schedules_df, periods_df):
         if {"Course Name", "Section"}.issubset(schedules_df.columns) and {"Course Name", "Section"}.issubset(periods_df.columns):
-            schedule_keys = set(zip(schedules_df["Course Name"], schedules_df["Section"]))
-            period_keys = set(zip(periods_df["Course Name"], periods_df["Section"]))
-            missing_periods = schedule_keys - period_keys
-            if missing_periods:
-                invalid_rows = schedules_df[
-                    schedules_df.apply(
-                        lambda row: (row["Course Name"], row["Section"]) in missing_periods, axis=1
-                    )
-                ].index.tolist()
-                self.errors.append(
-                    f"Schedules data has course-section(s) that do not meet at all: {missing_periods} (rows: {self._display_rows(invalid_rows)})"
-                )
+            schedule_keys = pd.MultiIndex.from_frame(schedules_df[["Course Name", "Section"]])
+            period_keys = pd.MultiIndex.from_frame(periods_df[["Course Name", "Section"]])
+            invalid_mask = ~period_keys.isin(schedule_keys)
+            if invalid_mask.any():
+                invalid_periods = self._key_set(periods_df[invalid_mask], ["Course Name", "Section"])
+                self._report_unknown_sections(invalid_periods, periods_df.index[invalid_mask].tolist())
+            # Check if any course-section in schedules does not have a corresponding period (i.e., does not meet at all)
+            missing_mask = ~schedule_keys.isin(period_keys)
+            if missing_mask.any():
+                missing_periods = self._key_set(schedules_df[missing_mask], ["Course Name", "Section"])
+                self._report_sections_without_periods(missing_periods, schedules_df.index[missing_mask].tolist())
+
+    # Set of the (column, ...) tuples in a DataFrame, as Python scalars
+    def _key_set(self, df, columns):
+        return set(zip(*(df[col] for col in columns)))
 
     # Check for duplicates in students, schedules, and periods data (case-insensitive)
     def _check_duplicates(self, students_df, schedules_df, periods_df):
-        # Students: no duplicate (Student Name, Course Name), case-insensitive
-        if {"Student Name", "Course Name"}.issubset(students_df.columns):
-            temp = students_df.copy()
-            temp["Student Name_lower"] = temp["Student Name"].astype(str).str.lower()
-            temp["Course Name_lower"] = temp["Course Name"].astype(str).str.lower()
-            dup_mask = temp.duplicated(subset=["Student Name_lower", "Course Name_lower"], keep=False)
-            if dup_mask.any():
-                dup_groups = temp[dup_mask].groupby(["Student Name_lower", "Course Name_lower"]).groups
-                for key, indices in dup_groups.items():
-                    orig_keys = students_df.loc[list(indices)][["Student Name", "Course Name"]].iloc[0].tolist()
-                    self.errors.append(
-                        f"Students data has duplicate entry for {tuple(orig_keys)} at rows: {self._display_rows(list(indices))}"
-                    )
-        # Schedules: unique (Course Name, Section), case-insensitive for Course Name
-        if {"Course Name", "Section"}.issubset(schedules_df.columns):
-            temp = schedules_df.copy()
-            temp["Course Name_lower"] = temp["Course Name"].astype(str).str.lower()
-            temp["Section_str"] = temp["Section"].astype(str)
-            dup_mask = temp.duplicated(subset=["Course Name_lower", "Section_str"], keep=False)
-            if dup_mask.any():
-                dup_groups = temp[dup_mask].groupby(["Course Name_lower", "Section_str"]).groups
-                for key, indices in dup_groups.items():
-                    orig_keys = schedules_df.loc[list(indices)][["Course Name", "Section"]].iloc[0].tolist()
-                    self.errors.append(
-                        f"Schedules data has duplicate entry for {tuple(orig_keys)} at rows: {self._display_rows(list(indices))}"
-                    )
-        # Periods: unique (Course Name, Section, Day of Week, Period Number), case-insensitive for string columns
-        if {"Course Name", "Section", "Day of Week", "Period Number"}.issubset(periods_df.columns):
-            temp = periods_df.copy()
-            temp["Course Name_lower"] = temp["Course Name"].astype(str).str.lower()
-            temp["Section_str"] = temp["Section"].astype(str)
-            temp["Day of Week_lower"] = temp["Day of Week"].astype(str).str.lower()
-            temp["Period Number_str"] = temp["Period Number"].astype(str)
-            dup_mask = temp.duplicated(
-                subset=["Course Name_lower", "Section_str", "Day of Week_lower", "Period Number_str"], keep=False
-            )
-            if dup_mask.any():
-                dup_groups = temp[dup_mask].groupby(
-                    ["Course Name_lower", "Section_str", "Day of Week_lower", "Period Number_str"]
-                ).groups
-                for key, indices in dup_groups.items():
-                    orig_keys = periods_df.loc[list(indices)][["Course Name", "Section", "Day of Week", "Period Number"]].iloc[0].tolist()
-                    self.errors.append(
-                        f"Periods data has duplicate entry for {tuple(orig_keys)} at rows: {self._display_rows(list(indices))}"
-                    )
+        for name, df in (("Students", students_df), ("Schedules", schedules_df), ("Periods", periods_df)):
+            self._check_table_duplicates(df, name)
+
+    # Check that a table's DUPLICATE_KEYS are unique
+    def _check_table_duplicates(self, df, name):
+        key_columns, lowered = self.DUPLICATE_KEYS[name]
+        if set(key_columns).issubset(df.columns):
+            self._check_duplicate_keys(df, name, key_columns, lowered)
+
+    # Report rows whose key columns are equal as strings (lowercased for the lowered columns), one
+    # error per key in sorted key order. Keys are compared as integer codes of their distinct values,
+    # so each distinct value is converted to a string once instead of once per row.
+    def _check_duplicate_keys(self, df, name, key_columns, lowered):
+        codes = {}
+        forms = {}
+        for col in key_columns:
+            value_codes, values = pd.factorize(df[col], use_na_sentinel=False)
+            values = pd.Index(values).astype(str)
+            if col in lowered:
+                values = values.str.lower()
+            form_codes, forms[col] = pd.factorize(values, use_na_sentinel=False)
+            codes[col] = form_codes[value_codes]
+        dup_mask = pd.DataFrame(codes).duplicated(keep=False).to_numpy()
+        if not dup_mask.any():
+            return
+        dup_keys = pd.DataFrame(
+            {col: forms[col][codes[col][dup_mask]] for col in key_columns}, index=df.index[dup_mask]
+        )
+        dup_groups = dup_keys.groupby(key_columns).groups
+        # itertuples gives Python scalars, so keys print as ('Math', 1)
+        first_rows = [indices[0] for indices in dup_groups.values()]
+        orig_keys = df.loc[first_rows, key_columns].itertuples(index=False, name=None)
+        for indices, orig_key in zip(dup_groups.values(), orig_keys):
+            self._report_duplicate(name, tuple(orig_key), list(indices))
 
     # Check for non-positive capacity values in schedules
     def _check_capacity(self, schedules_df):
         if "Capacity" in schedules_df.columns:
-            if (schedules_df["Capacity"] <= 0).any():
-                invalid_rows = schedules_df[schedules_df["Capacity"] <= 0].index.tolist()
-                self.errors.append(f"Schedules data has non-positive values in 'Capacity' (rows: {self._display_rows(invalid_rows)}).")
+            self._report_capacity(schedules_df.index[(schedules_df["Capacity"] <= 0).to_numpy()].tolist())
 
     # Check if 'Period Number' is within a valid range
     def _check_period_number(self, periods_df, min_period=1, max_period=20):
         if "Period Number" in periods_df.columns:
-            invalid = periods_df[(periods_df["Period Number"] < min_period) | (periods_df["Period Number"] > max_period)]
-            if not invalid.empty:
-                invalid_rows = invalid.index.tolist()
-                self.errors.append(
-                    f"Periods data has 'Period Number' outside valid range ({min_period}-{max_period}) (rows: {self._display_rows(invalid_rows)})."
-                )
+            period_numbers = periods_df["Period Number"]
+            invalid_mask = ((period_numbers < min_period) | (period_numbers > max_period)).to_numpy()
+            self._report_period_number(periods_df.index[invalid_mask].tolist(), min_period, max_period)
     
     # Check if any of the dataframes are empty
     def _check_empty(self, students_df, schedules_df, periods_df):
-        if students_df.empty:
-            self.errors.append("Students data is empty.")
-        if schedules_df.empty:
-            self.errors.append("Schedules data is empty.")
-        if periods_df.empty:
-            self.errors.append("Periods data is empty.")
+        for name, df in (("Students", students_df), ("Schedules", schedules_df), ("Periods", periods_df)):
+            if df.empty:
+                self._report_empty(name)
+
+    # -- Error messages, each taking the offending DataFrame indices (rows) and reporting only if there are any.
+    # Shared with StreamingScheduleDataValidator so both report the same errors.
+    def _report_missing_columns(self, name, missing):
+        if missing:
+            self.errors.append(f"{name} data missing columns: {', '.join(missing)}")
+
+    def _report_nulls(self, name, col, rows):
+        if rows:
+            self.errors.append(f"{name} data has null values in column: {col} (rows: {self._display_rows(rows)})")
+
+    def _report_non_int(self, name, col, rows):
+        if rows:
+            self.errors.append(
+                f"{name} data column '{col}' must contain integer-like values. Invalid rows: {self._display_rows(rows)}"
+            )
+
+    def _report_invalid_days(self, name, days, rows):
+        if rows:
+            self.errors.append(
+                f"{name} data has invalid days: {', '.join(map(str, days))} (rows: {self._display_rows(rows)})"
+            )
+
+    def _report_unknown_courses(self, courses, rows):
+        if rows:
+            self.errors.append(
+                f"Students data references unknown courses: {', '.join(map(str, courses))} (rows: {self._display_rows(rows)})"
+            )
+
+    def _report_unknown_sections(self, pairs, rows):
+        if rows:
+            self.errors.append(
+                f"Periods data references unknown course-section pairs: {pairs} (rows: {self._display_rows(rows)})"
+            )
+
+    def _report_sections_without_periods(self, pairs, rows):
+        if rows:
+            self.errors.append(
+                f"Schedules data has course-section(s) that do not meet at all: {pairs} (rows: {self._display_rows(rows)})"
+            )
+
+    def _report_duplicate(self, name, key, rows):
+        if rows:
+            self.errors.append(f"{name} data has duplicate entry for {key} at rows: {self._display_rows(rows)}")
+
+    def _report_capacity(self, rows):
+        if rows:
+            self.errors.append(f"Schedules data has non-positive values in 'Capacity' (rows: {self._display_rows(rows)}).")
+
+    def _report_period_number(self, rows, min_period, max_period):
+        if rows:
+            self.errors.append(
+                f"Periods data has 'Period Number' outside valid range ({min_period}-{max_period}) (rows: {self._display_rows(rows)})."
+            )
+
+    def _report_empty(self, name):
+        self.errors.append(f"{name} data is empty.")
 
     # Convert DataFrame index list to user-facing row numbers (header is row 1)
     def _display_rows(self, indices):
@@ -0,0 +1,257 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+
+from data_validation.schedule_data_validator import ScheduleDataValidator
+
+# Integer codes for the distinct values of a column, shared across chunks (and tables),
+# so a row costs one integer per key column and only distinct values are kept
+class ValueCodes:
+
+    def __init__(self):
+        self.index = None
+
+    def encode(self, series):
+        if self.index is None:
+            self.index = pd.Index(pd.unique(series))
+        codes = self.index.get_indexer(series)
+        new = codes < 0
+        if new.any():
+            self.index = self.index.append(pd.Index(pd.unique(series[new])))
+            codes[new] = self.index.get_indexer(series[new])
+        return codes.astype(np.int32)
+
+    # Values for an array of codes, as Python scalars
+    def decode(self, codes):
+        return self.index[codes].tolist()
+
+    # Code of each value's case-insensitive form (str, lowercased), and those forms
+    def lowered(self):
+        return pd.factorize(self.index.astype(str).str.lower())
+
+
+# What has been seen of one uploaded table so far
+class TableState:
+
+    def __init__(self):
+        self.columns = None
+        self.rows = 0
+        self.null_rows = {}
+        self.non_int_rows = {}
+        self.invalid_day_rows = []
+        self.invalid_days = set()
+        self.out_of_range_rows = []
+        self.key_codes = {}
+
+    # Concatenated row numbers or key codes collected per chunk
+    @staticmethod
+    def collect(chunks):
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int32)
+
+
+# ScheduleDataValidator for uploads read in chunks: add_chunk() records what each chunk needs for
+# the checks (offending rows and integer-coded keys, not the data), finish() reports the same
+# errors, in the same fail-fast order, as ScheduleDataValidator.validate on the whole files.
+# Chunks must keep their row numbers (pd.read_csv(chunksize=...) numbers rows across chunks).
+# parallel runs the independent checks of each finish() stage on a thread pool, as in ScheduleDataValidator.
+class StreamingScheduleDataValidator(ScheduleDataValidator):
+    # Key columns per table: used for duplicates (case-insensitive) and referential integrity
+    KEY_COLUMNS = {
+        "Students": ["Student Name", "Course Name"],
+        "Schedules": ["Course Name", "Section"],
+        "Periods": ["Course Name", "Section", "Day of Week", "Period Number"],
+    }
+
+    def __init__(self, min_period=1, max_period=20, parallel=False, max_workers=None):
+        super().__init__(parallel=parallel, max_workers=max_workers)
+        self.min_period = min_period
+        self.max_period = max_period
+        self.tables = {name: TableState() for name in self.REQUIRED_COLUMNS}
+        # Course names and sections are coded the same way in every table so keys can be compared
+        self.codes = {
+            "Student Name": ValueCodes(),
+            "Course Name": ValueCodes(),
+            "Section": ValueCodes(),
+            "Day of Week": ValueCodes(),
+            "Period Number": ValueCodes(),
+        }
+
+    # Record a normalized chunk of the named table ("Students", "Schedules" or "Periods")
+    def add_chunk(self, name, df):
+        table = self.tables[name]
+        if table.columns is None:
+            table.columns = set(df.columns)
+        table.rows += len(df)
+
+        for col in self.REQUIRED_COLUMNS[name] & table.columns:
+            null_mask = df[col].isnull()
+            if null_mask.any():
+                table.null_rows.setdefault(col, []).append(df.index[null_mask].to_numpy())
+        for col in self.INT_COLUMNS[name]:
+            if col in table.columns:
+                invalid_mask = self._non_int_mask(df[col])
+                if invalid_mask.any():
+                    table.non_int_rows.setdefault(col, []).append(df.index[invalid_mask].to_numpy())
+        if name == "Periods" and "Day of Week" in table.columns:
+            invalid_mask = ~df["Day of Week"].isin(self.VALID_DAYS)
+            if invalid_mask.any():
+                table.invalid_day_rows.append(df.index[invalid_mask].to_numpy())
+                table.invalid_days.update(df["Day of Week"][invalid_mask].unique())
+
+        range_column = {"Schedules": "Capacity", "Periods": "Period Number"}.get(name)
+        if range_column in table.columns:
+            values = pd.to_numeric(df[range_column], errors="coerce")
+            if name == "Schedules":
+                invalid_mask = values <= 0
+            else:
+                invalid_mask = (values < self.min_period) | (values > self.max_period)
+            table.out_of_range_rows.append(df.index[invalid_mask].to_numpy())
+
+        for col in self.KEY_COLUMNS[name]:
+            if col in table.columns:
+                values = df[col]
+                if col in ("Section", "Period Number"):
+                    # Integer-like values (checked above) compare and print as integers
+                    values = pd.to_numeric(values, errors="coerce")
+                    if values.notna().all():
+                        values = values.astype("int64")
+                table.key_codes.setdefault(col, []).append(self.codes[col].encode(values))
+
+    # Whether the chunks so far already fail the per-table checks (so the upload will be rejected)
+    def has_errors(self):
+        return any(
+            table.null_rows or table.non_int_rows or table.invalid_day_rows
+            or (table.columns is not None and self.REQUIRED_COLUMNS[name] - table.columns)
+            for name, table in self.tables.items()
+        )
+
+    def finish(self):
+        self.errors.clear()
+        # Stages and their independent checks, as in ScheduleDataValidator.validate. The checks only
+        # read the recorded tables and codes, so concurrent checks can share them.
+        validation_steps = [
+            [lambda v, name=name: v._finish_table(name) for name in self.tables],
+            [lambda v: v._finish_days()],
+            [lambda v: v._finish_empty()],
+            [lambda v, name=name: v._finish_duplicates(name) for name in self.KEY_COLUMNS],
+            [lambda v: v._finish_unknown_courses(), lambda v: v._finish_unknown_sections()],
+            [lambda v: v._finish_capacity(), lambda v: v._finish_period_numbers()],
+        ]
+        with ThreadPoolExecutor(max_workers=self.max_workers) if self.parallel else nullcontext() as executor:
+            for step in validation_steps:
+                self._run_checks(step, executor)
+                if self.errors:
+                    return False, self.errors
+        return True, self.errors
+
+    def _columns(self, name):
+        return self.tables[name].columns or set()
+
+    def _key_codes(self, name, col):
+        return TableState.collect(self.tables[name].key_codes.get(col, []))
+
+    # Same checks as _validate_students, _validate_schedules and _validate_periods
+    def _finish_table(self, name):
+        table = self.tables[name]
+        columns = self._columns(name)
+        self._report_missing_columns(name, self.REQUIRED_COLUMNS[name] - columns)
+        for col in self.REQUIRED_COLUMNS[name]:
+            self._report_nulls(name, col, TableState.collect(table.null_rows.get(col, [])).tolist())
+        for col in self.INT_COLUMNS[name]:
+            if col in columns and col not in table.null_rows:
+                self._report_non_int(name, col, TableState.collect(table.non_int_rows.get(col, [])).tolist())
+
+    def _finish_days(self):
+        table = self.tables["Periods"]
+        self._report_invalid_days("Periods", table.invalid_days, TableState.collect(table.invalid_day_rows).tolist())
+
+    def _finish_empty(self):
+        for name, table in self.tables.items():
+            if table.rows == 0 or not table.columns:
+                self._report_empty(name)
+
+    # Rows of a table whose key columns are equal case-insensitively, grouped and ordered like _check_duplicates
+    def _finish_duplicates(self, name):
+        key_columns = self.KEY_COLUMNS[name]
+        if not set(key_columns).issubset(self._columns(name)):
+            return
+        codes = {col: self._key_codes(name, col) for col in key_columns}
+        lowered = {}
+        # One int64 per row for the whole key (mixed radix over the columns' lowered codes)
+        key = np.zeros(self.tables[name].rows, dtype=np.int64)
+        key_size = 1
+        for col in key_columns:
+            lower_codes, lower_values = self.codes[col].lowered()
+            lowered[col] = (lower_codes, lower_values)
+            if key_size * len(lower_values) >= 2 ** 63:
+                key, uniques = pd.factorize(key)
+                key_size = len(uniques)
+            key *= len(lower_values)
+            key += lower_codes[codes[col]]
+            key_size *= len(lower_values)
+        dup_rows = self._duplicated_rows(key)
+        del key
+        if not len(dup_rows):
+            return
+        keys = pd.DataFrame(
+            {col: lower_values[lower_codes[codes[col][dup_rows]]] for col, (lower_codes, lower_values) in lowered.items()},
+            index=dup_rows
+        )
+        for key, indices in keys.groupby(key_columns).groups.items():
+            first = indices[0]
+            orig_keys = [self.codes[col].decode([codes[col][first]])[0] for col in key_columns]
+            self._report_duplicate(name, tuple(orig_keys), list(indices))
+
+    # Rows whose key occurs more than once, found by sorting (less memory than hashing every row)
+    @staticmethod
+    def _duplicated_rows(key):
+        order = np.argsort(key, kind="stable")
+        sorted_key = key[order]
+        same = sorted_key[1:] == sorted_key[:-1]
+        del sorted_key
+        duplicated = np.zeros(len(key), dtype=bool)
+        duplicated[1:] |= same
+        duplicated[:-1] |= same
+        return np.sort(order[duplicated])
+
+    def _finish_unknown_courses(self):
+        if "Course Name" in self._columns("Students") and "Course Name" in self._columns("Schedules"):
+            student_courses = self._key_codes("Students", "Course Name")
+            invalid = np.setdiff1d(student_courses, self._key_codes("Schedules", "Course Name"))
+            if len(invalid):
+                invalid_rows = np.flatnonzero(np.isin(student_courses, invalid)).tolist()
+                self._report_unknown_courses(set(self.codes["Course Name"].decode(invalid)), invalid_rows)
+
+    def _finish_unknown_sections(self):
+        if {"Course Name", "Section"}.issubset(self._columns("Schedules")) and {"Course Name", "Section"}.issubset(self._columns("Periods")):
+            schedule_keys = self._section_keys("Schedules")
+            period_keys = self._section_keys("Periods")
+            invalid = np.setdiff1d(period_keys, schedule_keys)
+            if len(invalid):
+                invalid_rows = np.flatnonzero(np.isin(period_keys, invalid)).tolist()
+                self._report_unknown_sections(self._decode_section_keys(invalid), invalid_rows)
+            missing = np.setdiff1d(schedule_keys, period_keys)
+            if len(missing):
+                invalid_rows = np.flatnonzero(np.isin(schedule_keys, missing)).tolist()
+                self._report_sections_without_periods(self._decode_section_keys(missing), invalid_rows)
+
+    # One int64 per row for its (course, section) pair
+    def _section_keys(self, name):
+        return (self._key_codes(name, "Course Name").astype(np.int64) << 32) | self._key_codes(name, "Section")
+
+    def _decode_section_keys(self, keys):
+        courses = self.codes["Course Name"].decode(keys >> 32)
+        sections = self.codes["Section"].decode(keys & 0xFFFFFFFF)
+        return set(zip(courses, sections))
+
+    def _finish_capacity(self):
+        if "Capacity" in self._columns("Schedules"):
+            self._report_capacity(TableState.collect(self.tables["Schedules"].out_of_range_rows).tolist())
+
+    def _finish_period_numbers(self):
+        if "Period Number" in self._columns("Periods"):
+            self._report_period_number(
+                TableState.collect(self.tables["Periods"].out_of_range_rows).tolist(), self.min_period, self.max_period
+            )
@@ -0,0 +1,36 @@
+import pandas as pd
+
+# Name columns of the uploaded tables. Each is coded with one set of categories across the tables,
+# so e.g. a course has the same code in students, schedules and periods.
+NAME_COLUMNS = ["Student Name", "Course Name", "Day of Week"]
+INT_COLUMNS = ["Section", "Capacity", "Period Number"]
+
+# Compact copies of the uploaded students, schedules and periods DataFrames, made once when they're
+# loaded: name columns become Categoricals (an integer code per row, each distinct name stored once)
+# and integer columns int32. Values and row order are unchanged.
+def encode_tables(students_df, schedules_df, periods_df):
+    tables = [students_df.copy(), schedules_df.copy(), periods_df.copy()]
+    for col in NAME_COLUMNS:
+        present = [df for df in tables if col in df.columns]
+        if not present:
+            continue
+        categories = pd.Index(pd.concat([pd.Series(df[col].unique()) for df in present], ignore_index=True)).unique().dropna()
+        for df in present:
+            df[col] = pd.Categorical(df[col], categories=categories)
+    for col in INT_COLUMNS:
+        for df in tables:
+            if col in df.columns and pd.api.types.is_integer_dtype(df[col]) and df[col].between(-2**31, 2**31 - 1).all():
+                df[col] = df[col].astype("int32")
+    return tuple(tables)
+
+# df without the categories none of its rows use, e.g. for a slice sent to another process
+def drop_unused_categories(df):
+    categorical = [col for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)]
+    if not categorical:
+        return df
+    return df.assign(**{col: df[col].cat.remove_unused_categories() for col in categorical})
+
+# Categorical of names for an array of codes into a list of distinct names, e.g. to turn solver
+# output back into names at the API boundary
+def decode(codes, names):
+    return pd.Categorical.from_codes(codes, categories=pd.Index(names, dtype=object))
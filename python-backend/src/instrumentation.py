@@ -0,0 +1,77 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+logger = logging.getLogger("schedulemaker.metrics")
+
+# Instrumentation is on unless METRICS_ENABLED=0
+def metrics_enabled():
+    return os.getenv("METRICS_ENABLED", "1") != "0"
+
+# Adds the time spent inside a `with` block to a phase of a Metrics
+class PhaseTimer:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        phases = self.metrics.phases
+        phases[self.name] = phases.get(self.name, 0.0) + time.perf_counter() - self.start
+        return False
+
+# Timings and counters of one job or request: seconds per phase (summed if a phase runs more than
+# once, e.g. per upload chunk) and groups of values such as model size and solver stats.
+# A disabled Metrics records nothing and its phases are a shared no-op context, so instrumented
+# code costs a method call per phase when metrics are off. Check `enabled` before computing values
+# that are expensive to get.
+class Metrics:
+    _NO_PHASE = nullcontext()
+
+    # context: identifies the job or request in the logs, e.g. job_id
+    def __init__(self, enabled=True, **context):
+        self.enabled = enabled
+        self.context = context
+        self.phases = {}
+        self.values = {}
+
+    def phase(self, name):
+        if not self.enabled:
+            return self._NO_PHASE
+        return PhaseTimer(self, name)
+
+    # Add values to a group, e.g. record("model", variables=10, constraints=4)
+    def record(self, group, **values):
+        if self.enabled:
+            self.values.setdefault(group, {}).update(values)
+
+    def as_dict(self):
+        return {"phases": {name: round(seconds, 6) for name, seconds in self.phases.items()}, **self.values}
+
+    # Log everything recorded as one JSON line
+    def log(self, event):
+        if self.enabled:
+            logger.info(json.dumps({"event": event, **self.context, **self.as_dict()}, default=str))
+
+# Shared Metrics for code that isn't given one
+DISABLED = Metrics(enabled=False)
+
+# Seconds the current thread has spent in database calls since the last take_db_seconds(), e.g. per
+# request. Statements run through SQLAlchemy are added by listeners in app.py, COPY by bulk_insert.
+_db_time = threading.local()
+
+def add_db_seconds(seconds):
+    _db_time.seconds = getattr(_db_time, "seconds", 0.0) + seconds
+
+def take_db_seconds():
+    seconds = getattr(_db_time, "seconds", 0.0)
+    _db_time.seconds = 0.0
+    return seconds
@@ -0,0 +1,188 @@
+import bisect
+import itertools
+import math
+import threading
+
+# In-process metrics in the Prometheus text exposition format: counters, gauges and histograms with
+# labels, rendered by Registry.render() for a /metrics endpoint. Values are per process.
+#
+# Updates are spread over STRIPES shards, each with its own lock, and each thread always updates the
+# same shard (threads take shards in turn), so concurrent requests rarely wait for each other;
+# render() adds the shards up.
+
+STRIPES = 16
+
+_thread = threading.local()
+_next_stripe = itertools.count()
+
+# This thread's shard number
+def stripe_index():
+    try:
+        return _thread.stripe
+    except AttributeError:
+        _thread.stripe = next(_next_stripe) % STRIPES
+        return _thread.stripe
+
+# Default histogram buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SOLVE_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def format_labels(names, values, extra=()):
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in (*zip(names, values), *extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def format_value(value):
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+# Values of one metric by label values, split over lock-striped shards. Subclasses define samples():
+# the (name suffix, formatted labels, value) of each line render() writes.
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._labelset = set(self.labelnames)
+        self._stripes = [(threading.Lock(), {}) for _ in range(STRIPES)]
+
+    def _key(self, labels):
+        if labels.keys() != self._labelset:
+            raise ValueError(f"{self.name} takes labels {', '.join(self.labelnames) or '(none)'}, got {', '.join(labels) or '(none)'}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _stripe(self):
+        return self._stripes[stripe_index()]
+
+    # Copy of every shard's values
+    def _shards(self):
+        shards = []
+        for lock, values in self._stripes:
+            with lock:
+                shards.append({key: list(value) if isinstance(value, list) else value for key, value in values.items()})
+        return shards
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {format_value(value)}")
+        return "\n".join(lines)
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        lock, values = self._stripe()
+        with lock:
+            values[key] = values.get(key, 0) + amount
+
+    # Totals by label values
+    def totals(self):
+        totals = {}
+        for shard in self._shards():
+            for key, value in shard.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def samples(self):
+        return [("", format_labels(self.labelnames, key), value) for key, value in sorted(self.totals().items())]
+
+# A gauge moved up and down with inc/dec (e.g. solves in progress), or read from function() when
+# rendered (e.g. a queue length); a function gauge has no labels.
+class Gauge(Counter):
+    type = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), function=None):
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        lock, values = self._stripe()
+        with lock:
+            values[key] = values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def samples(self):
+        if self.function is not None:
+            return [("", "", self.function())]
+        return super().samples()
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        # Index of the first bucket whose upper bound is >= value (len(buckets) for +Inf)
+        index = bisect.bisect_left(self.buckets, value)
+        lock, values = self._stripe()
+        with lock:
+            counts = values.get(key)
+            if counts is None:
+                # Count per bucket, then the sum of observed values
+                counts = values[key] = [0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    def samples(self):
+        merged = {}
+        for shard in self._shards():
+            for key, counts in shard.items():
+                total = merged.setdefault(key, [0] * (len(self.buckets) + 2))
+                for i, count in enumerate(counts):
+                    total[i] += count
+        samples = []
+        for key, counts in sorted(merged.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                le = "+Inf" if math.isinf(bound) else format_value(bound)
+                samples.append(("_bucket", format_labels(self.labelnames, key, [("le", le)]), cumulative))
+            samples.append(("_sum", format_labels(self.labelnames, key), counts[-1]))
+            samples.append(("_count", format_labels(self.labelnames, key), cumulative))
+        return samples
+
+# The metrics of a process, rendered in registration order
+class Registry:
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=(), function=None):
+        return self._register(Gauge(name, documentation, labelnames, function))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
@@ -12,6 +12,8 @@ class Users(db.Model):
     created_at = db.Column('Created At', db.DateTime, server_default=db.func.now())
     last_login = db.Column('Last Login', db.DateTime)
     email_verified = db.Column('Email Verified', db.Boolean, default=False)
+    # Content hash of the uploaded data, the key for cached optimization results
+    data_hash = db.Column('Data Hash', db.String(64))
 
 class Students(db.Model):
     __tablename__ = 'students'
@@ -20,6 +22,11 @@ class Students(db.Model):
     student_name = db.Column('Student Name', db.String(255), nullable=False)
     course_name = db.Column('Course Name', db.String(255), nullable=False)
 
+    __table_args__ = (
+        db.Index('ix_students_user_student', user_id, student_name),
+        db.Index('ix_students_user_lower_student', user_id, db.func.lower(student_name)),
+    )
+
 class Schedules(db.Model):
     __tablename__ = 'schedules'
     id = db.Column('ID', db.Integer, primary_key=True)
@@ -28,6 +35,11 @@ class Schedules(db.Model):
     section = db.Column('Section', db.Integer, nullable=False)
     capacity = db.Column('Capacity', db.Integer, nullable=False)
 
+    __table_args__ = (
+        db.Index('ix_schedules_user_course_section', user_id, course_name, section),
+        db.Index('ix_schedules_user_lower_course_section', user_id, db.func.lower(course_name), section),
+    )
+
 class Periods(db.Model):
     __tablename__ = 'periods'
     id = db.Column('ID', db.Integer, primary_key=True)
@@ -37,6 +49,10 @@ class Periods(db.Model):
     day_of_week = db.Column('Day of Week', db.String(32), nullable=False)
     period_number = db.Column('Period Number', db.Integer, nullable=False)
 
+    __table_args__ = (
+        db.Index('ix_periods_user_course_section', user_id, course_name, section),
+    )
+
 class AssignedCourses(db.Model):
     __tablename__ = 'assigned_courses'
     id = db.Column('ID', db.Integer, primary_key=True)
@@ -45,10 +61,50 @@ class AssignedCourses(db.Model):
     course_name = db.Column('Course Name', db.String(255), nullable=False)
     section = db.Column('Section', db.Integer, nullable=False)
 
+    __table_args__ = (
+        db.Index('ix_assigned_courses_user_course_section', user_id, course_name, section),
+        db.Index('ix_assigned_courses_user_student', user_id, student_name),
+    )
+
 class UnassignedCourses(db.Model):
     __tablename__ = 'unassigned_courses'
     id = db.Column('ID', db.Integer, primary_key=True)
     user_id = db.Column('User ID', db.Integer, db.ForeignKey('users.ID', ondelete='CASCADE'), nullable=False)
     student_name = db.Column('Student Name', db.String(255), nullable=False)
     unassigned_course_name = db.Column('Unassigned Course Name', db.String(255), nullable=False)
-    reason = db.Column('Reason', db.Text, nullable=False)
\ No newline at end of file
+    reason = db.Column('Reason', db.Text, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_unassigned_courses_user_student', user_id, student_name),
+    )
+
+# Assignments from before the latest upload, used to warm start incremental optimization
+class PreviousAssignedCourses(db.Model):
+    __tablename__ = 'previous_assigned_courses'
+    id = db.Column('ID', db.Integer, primary_key=True)
+    user_id = db.Column('User ID', db.Integer, db.ForeignKey('users.ID', ondelete='CASCADE'), nullable=False)
+    student_name = db.Column('Student Name', db.String(255), nullable=False)
+    course_name = db.Column('Course Name', db.String(255), nullable=False)
+    section = db.Column('Section', db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_previous_assigned_courses_user', user_id),
+    )
+
+class OptimizationJobs(db.Model):
+    __tablename__ = 'optimization_jobs'
+    id = db.Column('ID', db.String(36), primary_key=True)
+    user_id = db.Column('User ID', db.Integer, db.ForeignKey('users.ID', ondelete='CASCADE'), nullable=False)
+    status = db.Column('Status', db.String(32), nullable=False)
+    progress = db.Column('Progress', db.Text)
+    error = db.Column('Error', db.Text)
+    assigned_count = db.Column('Assigned Count', db.Integer)
+    unassigned_count = db.Column('Unassigned Count', db.Integer)
+    created_at = db.Column('Created At', db.DateTime, server_default=db.func.now())
+    finished_at = db.Column('Finished At', db.DateTime)
+    # Phase timings, model size and solver stats as JSON (see instrumentation.Metrics), None if metrics are off
+    metrics = db.Column('Metrics', db.Text)
+
+    __table_args__ = (
+        db.Index('ix_optimization_jobs_user', user_id),
+    )
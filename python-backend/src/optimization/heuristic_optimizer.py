@@ -0,0 +1,20 @@
+from optimization.heuristic_search import HeuristicSearch
+from optimization.schedule_optimizer import ScheduleOptimizer
+
+# Greedy + local search alternative to the MILP, for answers well under a second.
+# Same interface and objective as ScheduleOptimizer; the result is feasible but not proven optimal.
+class HeuristicScheduleOptimizer(ScheduleOptimizer):
+
+    # max_passes and max_depth bound the search, see HeuristicSearch
+    def __init__(self, max_passes=20, max_depth=3):
+        super().__init__()
+        self.search = HeuristicSearch(max_passes=max_passes, max_depth=max_depth)
+
+    def run_solver(self, students_df, schedules_df, periods_df, previous_assignments=None):
+        self.students_df = students_df
+        self.schedules_df = schedules_df
+        self.periods_df = periods_df
+        self.build_lookups(periods_df, schedules_df)
+
+        start = self.build_warm_start(previous_assignments) if previous_assignments is not None else ()
+        self.set_assignments(self.search.solve(self, start))
@@ -0,0 +1,263 @@
+import time
+
+# Mutable assignment state for the heuristic, on integer codes (students, courses and sections
+# coded as in ScheduleOptimizer.build_lookups)
+class AssignmentState:
+
+    def __init__(self, optimizer):
+        n_students = len(optimizer.students)
+        n_sections = len(optimizer.sections)
+        self.capacity = optimizer.section_capacity.tolist()
+        self.section_course = optimizer.section_courses.tolist()
+        self.course_sections = [[] for _ in optimizer.courses]
+        for sec, c in enumerate(self.section_course):
+            self.course_sections[c].append(sec)
+        slots = [set() for _ in range(n_sections)]
+        for sec, t in zip(optimizer.meeting_sections.tolist(), optimizer.meeting_slots.tolist()):
+            slots[sec].add(t)
+        self.section_slots = [frozenset(t) for t in slots]
+
+        # Requested courses with at least one section, per student
+        self.requests = [[] for _ in range(n_students)]
+        for s, sec in zip(optimizer.pair_students.tolist(), optimizer.pair_sections.tolist()):
+            c = self.section_course[sec]
+            if c not in self.requests[s]:
+                self.requests[s].append(c)
+
+        self.sizes = [0] * n_sections
+        self.rosters = [set() for _ in range(n_sections)]
+        # (student, course) -> assigned section
+        self.assigned = {}
+        # Per student: occupied slot -> section meeting in it
+        self.busy = [{} for _ in range(n_students)]
+        # Unassigned courses per student, counting requests for courses without sections
+        self.unassigned = optimizer.request_counts.tolist()
+        # Moves since the last checkpoint, so a failed ejection chain can be undone
+        self.journal = []
+
+    def assign(self, s, sec):
+        self.journal.append((self.unassign, s, sec))
+        self.sizes[sec] += 1
+        self.rosters[sec].add(s)
+        self.assigned[(s, self.section_course[sec])] = sec
+        for t in self.section_slots[sec]:
+            self.busy[s][t] = sec
+        self.unassigned[s] -= 1
+
+    def unassign(self, s, sec):
+        self.journal.append((self.assign, s, sec))
+        self.sizes[sec] -= 1
+        self.rosters[sec].discard(s)
+        del self.assigned[(s, self.section_course[sec])]
+        for t in self.section_slots[sec]:
+            del self.busy[s][t]
+        self.unassigned[s] += 1
+
+    def checkpoint(self):
+        return len(self.journal)
+
+    # Undo every move made since the checkpoint
+    def rollback(self, checkpoint):
+        while len(self.journal) > checkpoint:
+            undo, s, sec = self.journal.pop()
+            undo(s, sec)
+            self.journal.pop()
+
+    # Sections of s's schedule meeting at the same time as sec, other than `ignore`
+    def clashes(self, s, sec, ignore=None):
+        busy = self.busy[s]
+        return {busy[t] for t in self.section_slots[sec] if t in busy and busy[t] != ignore}
+
+    def fits(self, s, sec, ignore=None):
+        return self.sizes[sec] < self.capacity[sec] and not self.clashes(s, sec, ignore)
+
+    # The emptiest section of course c that s fits into, keeping section sizes even
+    def best_section(self, s, c, excluded=()):
+        best = None
+        for sec in self.course_sections[c]:
+            if sec not in excluded and self.fits(s, sec) and (best is None or self.sizes[sec] < self.sizes[best]):
+                best = sec
+        return best
+
+    def unassigned_requests(self):
+        return [(s, c) for s, courses in enumerate(self.requests) for c in courses if (s, c) not in self.assigned]
+
+
+# Greedy construction + local search over a ScheduleOptimizer's lookups. Used on its own by
+# HeuristicScheduleOptimizer and to build the MIP start for CBC.
+class HeuristicSearch:
+
+    # max_passes bounds the local search, it usually stops earlier when no move improves;
+    # max_depth bounds the ejection chains used to insert unassigned requests;
+    # time_limit: seconds after which the local search stops and keeps what it has (None: no limit)
+    def __init__(self, max_passes=20, max_depth=3, time_limit=None):
+        self.max_passes = max_passes
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.deadline = None
+
+    # Feasible (student, course, section) assignments for an optimizer whose lookups are built,
+    # extending `start` (feasible assignments, e.g. from build_warm_start)
+    def solve(self, optimizer, start=()):
+        self.deadline = None if self.time_limit is None else time.perf_counter() + self.time_limit
+        state = AssignmentState(optimizer)
+        for s, c, sec in start:
+            state.assign(optimizer.student_index[s], optimizer.section_index[(c, sec)])
+        self.greedy_assignment(state)
+        self.local_search(state)
+        return [(optimizer.students[s],) + optimizer.sections[sec] for (s, _), sec in sorted(state.assigned.items())]
+
+    # Assign the most constrained requests first: courses with the fewest sections, then the
+    # highest demand per seat. Each goes to its least constraining section.
+    def greedy_assignment(self, state):
+        demand = [0] * len(state.course_sections)
+        for courses in state.requests:
+            for c in courses:
+                demand[c] += 1
+        seats = [sum(state.capacity[sec] for sec in sections) for sections in state.course_sections]
+        requests = sorted(
+            state.unassigned_requests(),
+            key=lambda request: (len(state.course_sections[request[1]]), -demand[request[1]] / max(seats[request[1]], 1))
+        )
+        for s, c in requests:
+            sec = self._least_constraining_section(state, s, c)
+            if sec is not None:
+                state.assign(s, sec)
+
+    # The section of c for s that leaves the most of s's other unassigned requests still placeable,
+    # then the emptiest one
+    def _least_constraining_section(self, state, s, c):
+        pending = [other for other in state.requests[s] if other != c and (s, other) not in state.assigned]
+        best = None
+        best_key = None
+        for sec in state.course_sections[c]:
+            if not state.fits(s, sec):
+                continue
+            slots = state.section_slots[sec]
+            blocked = sum(
+                not any(state.fits(s, other_sec) and not slots & state.section_slots[other_sec]
+                        for other_sec in state.course_sections[other])
+                for other in pending
+            )
+            key = (blocked, state.sizes[sec])
+            if best_key is None or key < best_key:
+                best, best_key = sec, key
+        return best
+
+    # Improve the greedy result until no move helps. Every accepted move keeps the objective
+    # from getting worse: inserts add an assignment, balance moves reduce section deviation and
+    # seat swaps never widen the unassigned spread. Stops early once the time limit is up.
+    def local_search(self, state):
+        for _ in range(self.max_passes):
+            state.journal.clear()
+            improved = False
+            for s, c in state.unassigned_requests():
+                if self._out_of_time():
+                    return
+                if (s, c) not in state.assigned:
+                    improved |= self._insert(state, s, c, self.max_depth)
+            improved |= self._balance_sections(state)
+            improved |= self._swap_seats(state)
+            if not improved:
+                break
+
+    def _out_of_time(self):
+        return self.deadline is not None and time.perf_counter() > self.deadline
+
+    # Assign request (s, c), if needed by an ejection chain: place s in a section and re-insert the
+    # assignments in the way (s's own clashing sections, or one classmate in a full section)
+    # elsewhere, up to `depth` levels deep. Sections already touched by the chain are not reused.
+    def _insert(self, state, s, c, depth, tabu=frozenset()):
+        # An earlier chain may already have placed the request
+        if (s, c) in state.assigned:
+            return True
+        sec = state.best_section(s, c, tabu)
+        if sec is not None:
+            state.assign(s, sec)
+            return True
+        if depth == 0:
+            return False
+        for sec in state.course_sections[c]:
+            if sec in tabu:
+                continue
+            clashes = state.clashes(s, sec)
+            full = state.sizes[sec] >= state.capacity[sec]
+            if clashes and full:
+                continue
+            if clashes:
+                # s's own clashing sections may in turn start chains of their own
+                options = [([(s, old) for old in clashes], depth - 1)]
+            else:
+                # Ejected classmates are only placed directly, rosters make deeper chains too costly
+                options = [([(t, sec)], 0) for t in state.rosters[sec] if self._has_alternative(state, t, sec, tabu)]
+            for ejected, reinsert_depth in options:
+                if self._eject_and_insert(state, s, sec, ejected, reinsert_depth, tabu | {sec} | {old for _, old in ejected}):
+                    return True
+        return False
+
+    # Replace the ejected (student, section) assignments with s in sec, then re-insert each ejected
+    # request elsewhere with chains up to `depth`; undo everything if one of them doesn't fit
+    def _eject_and_insert(self, state, s, sec, ejected, depth, tabu):
+        checkpoint = state.checkpoint()
+        for t, old in ejected:
+            state.unassign(t, old)
+        state.assign(s, sec)
+        if all(self._reinsert(state, t, state.section_course[old], depth, tabu) for t, old in ejected):
+            return True
+        state.rollback(checkpoint)
+        return False
+
+    # Give an ejected student back course c elsewhere, or failing that, one of their other
+    # unassigned requests, which may fit now that c's section is free
+    def _reinsert(self, state, t, c, depth, tabu):
+        if self._insert(state, t, c, depth, tabu):
+            return True
+        return any(
+            state.best_section(t, other, tabu) is not None and self._insert(state, t, other, 0, tabu)
+            for other in state.requests[t] if other != c and (t, other) not in state.assigned
+        )
+
+    # Whether t, moved out of section old, could directly take another section of that course
+    # or one of their other unassigned requests
+    def _has_alternative(self, state, t, old, tabu):
+        courses = [state.section_course[old]]
+        courses += [c for c in state.requests[t] if (t, c) not in state.assigned]
+        return any(
+            sec != old and sec not in tabu and state.fits(t, sec, ignore=old)
+            for c in courses for sec in state.course_sections[c]
+        )
+
+    # Move students from the largest to the smallest section of a course while they differ by 2+
+    def _balance_sections(self, state):
+        improved = False
+        for sections in state.course_sections:
+            while len(sections) > 1:
+                largest = max(sections, key=state.sizes.__getitem__)
+                smallest = min(sections, key=state.sizes.__getitem__)
+                if state.sizes[largest] - state.sizes[smallest] < 2:
+                    break
+                mover = next((t for t in state.rosters[largest] if state.fits(t, smallest, ignore=largest)), None)
+                if mover is None:
+                    break
+                state.unassign(mover, largest)
+                state.assign(mover, smallest)
+                improved = True
+        return improved
+
+    # Give a seat from a student with at least two fewer unassigned courses to one who is missing
+    # the course. The number of assignments stays the same and the unassigned spread never widens.
+    def _swap_seats(self, state):
+        improved = False
+        for s, c in state.unassigned_requests():
+            if (s, c) in state.assigned:
+                continue
+            for sec in state.course_sections[c]:
+                if state.clashes(s, sec):
+                    continue
+                donor = next((t for t in state.rosters[sec] if state.unassigned[t] <= state.unassigned[s] - 2), None)
+                if donor is not None:
+                    state.unassign(donor, sec)
+                    state.assign(s, sec)
+                    improved = True
+                    break
+        return improved
@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+from scipy.optimize import Bounds, LinearConstraint, milp
+from scipy.sparse import coo_matrix
+
+# Sparse matrix form of the ScheduleOptimizer model, built straight from the encoded lookups.
+# Column layout: [x (one per candidate pair) | SectionSize | UnassignedCourses | SectionDeviation | MinUnassigned | MaxUnassigned]
+class MatrixModel:
+
+    def __init__(self, optimizer):
+        self.n_pairs = len(optimizer.pair_students)
+        self.n_sections = len(optimizer.sections)
+        self.n_students = len(optimizer.students)
+
+        self.size_offset = self.n_pairs
+        self.unassigned_offset = self.size_offset + self.n_sections
+        self.deviation_offset = self.unassigned_offset + self.n_students
+        self.min_index = self.deviation_offset + self.n_sections
+        self.max_index = self.min_index + 1
+        self.n_vars = self.max_index + 1
+
+        self._rows = []
+        self._cols = []
+        self._vals = []
+        self._lb = []
+        self._ub = []
+        self.n_rows = 0
+
+        self._build(optimizer)
+
+    # Append a block of constraint rows; block_rows are local row ids starting at 0
+    def _add_rows(self, block_rows, cols, vals, lb, ub):
+        lb = np.asarray(lb, dtype=float)
+        ub = np.asarray(ub, dtype=float)
+        self._rows.append(np.asarray(block_rows, dtype=np.int64) + self.n_rows)
+        self._cols.append(np.asarray(cols, dtype=np.int64))
+        self._vals.append(np.asarray(vals, dtype=float))
+        self._lb.append(lb)
+        self._ub.append(ub)
+        self.n_rows += len(lb)
+
+    # Add a "sum of x <= 1" row for every group key shared by more than one pair
+    def _add_at_most_one(self, group_keys, pairs):
+        rows, _ = pd.factorize(group_keys)
+        multi = np.bincount(rows, minlength=1)[rows] > 1
+        rows, _ = pd.factorize(rows[multi])
+        n_rows = rows.max() + 1 if len(rows) else 0
+        self._add_rows(rows, pairs[multi], np.ones(len(rows)), np.full(n_rows, -np.inf), np.ones(n_rows))
+
+    def _build(self, optimizer):
+        n_pairs = self.n_pairs
+        n_sections = self.n_sections
+        n_students = self.n_students
+        pair_ids = np.arange(n_pairs)
+        section_ids = np.arange(n_sections)
+        student_ids = np.arange(n_students)
+        pair_students = optimizer.pair_students
+        pair_sections = optimizer.pair_sections
+        section_courses = optimizer.section_courses
+
+        # --- Objective (minimized, so the maximization objective is negated) ---
+        self.c = np.zeros(self.n_vars)
+        self.c[:n_pairs] = -1
+        self.c[self.deviation_offset:self.deviation_offset + n_sections] = optimizer.ALPHA
+        self.c[self.min_index] = -optimizer.BETA
+        self.c[self.max_index] = optimizer.BETA
+
+        # --- Bounds and integrality ---
+        # The capacity constraint is expressed as the upper bound of SectionSize
+        self.lb = np.zeros(self.n_vars)
+        self.ub = np.full(self.n_vars, np.inf)
+        self.ub[:n_pairs] = 1
+        self.ub[self.size_offset:self.size_offset + n_sections] = optimizer.section_capacity
+        self.integrality = np.ones(self.n_vars)
+        self.integrality[self.deviation_offset:self.deviation_offset + n_sections] = 0
+
+        # --- Constraints ---
+        # Each student can be assigned to at most one section of each requested course
+        pair_courses = section_courses[pair_sections]
+        self._add_at_most_one(pair_students * len(optimizer.courses) + pair_courses, pair_ids)
+
+        # No time conflicts: at most one of a student's candidate sections per (day, period) slot
+        meetings = pd.DataFrame({"section": optimizer.meeting_sections, "slot": optimizer.meeting_slots})
+        pair_slots = pd.DataFrame({"pair": pair_ids, "student": pair_students, "section": pair_sections}).merge(meetings, on="section")
+        self._add_at_most_one(
+            pair_slots["student"].to_numpy() * len(optimizer.slots) + pair_slots["slot"].to_numpy(),
+            pair_slots["pair"].to_numpy()
+        )
+
+        # Section size: SectionSize[sec] - sum of x over the section's candidate pairs == 0
+        self._add_rows(
+            np.concatenate([section_ids, pair_sections]),
+            np.concatenate([self.size_offset + section_ids, pair_ids]),
+            np.concatenate([np.ones(n_sections), -np.ones(n_pairs)]),
+            np.zeros(n_sections),
+            np.zeros(n_sections)
+        )
+
+        # Link UnassignedCourses to assignments: UnassignedCourses[s] + sum of x over s's pairs == number of requests
+        requested = optimizer.request_counts.astype(float)
+        self._add_rows(
+            np.concatenate([student_ids, pair_students]),
+            np.concatenate([self.unassigned_offset + student_ids, pair_ids]),
+            np.ones(n_students + n_pairs),
+            requested,
+            requested
+        )
+
+        # Encourage even section sizes: SectionDeviation[sec] >= |SectionSize[sec] - average size of the course's sections|
+        sections = pd.DataFrame({"section": section_ids, "course": section_courses})
+        same_course = sections.merge(sections, on="course", suffixes=("", "_other"))
+        row = same_course["section"].to_numpy()
+        other = same_course["section_other"].to_numpy()
+        course_sizes = np.bincount(section_courses)
+        coef = (row == other) - 1 / course_sizes[same_course["course"].to_numpy()]
+        for sign in (1, -1):
+            self._add_rows(
+                np.concatenate([section_ids, row]),
+                np.concatenate([self.deviation_offset + section_ids, self.size_offset + other]),
+                np.concatenate([np.ones(n_sections), -sign * coef]),
+                np.zeros(n_sections),
+                np.full(n_sections, np.inf)
+            )
+
+        # Min/max unassigned: UnassignedCourses[s] - MinUnassigned >= 0 and MaxUnassigned - UnassignedCourses[s] >= 0
+        for sign, index in ((1, self.min_index), (-1, self.max_index)):
+            self._add_rows(
+                np.concatenate([student_ids, student_ids]),
+                np.concatenate([self.unassigned_offset + student_ids, np.full(n_students, index)]),
+                np.concatenate([np.full(n_students, sign), np.full(n_students, -sign)]),
+                np.zeros(n_students),
+                np.full(n_students, np.inf)
+            )
+
+        self.A = coo_matrix(
+            (np.concatenate(self._vals), (np.concatenate(self._rows), np.concatenate(self._cols))),
+            shape=(self.n_rows, self.n_vars)
+        ).tocsr()
+        self.row_lb = np.concatenate(self._lb)
+        self.row_ub = np.concatenate(self._ub)
+
+    # time_limit in seconds (None: no limit), mip_gap: relative gap to stop at (None: HiGHS default)
+    def solve(self, time_limit=10, mip_gap=None):
+        options = {}
+        if time_limit is not None:
+            options["time_limit"] = time_limit
+        if mip_gap is not None:
+            options["mip_rel_gap"] = mip_gap
+        result = milp(
+            self.c,
+            constraints=LinearConstraint(self.A, self.row_lb, self.row_ub),
+            integrality=self.integrality,
+            bounds=Bounds(self.lb, self.ub),
+            options=options
+        )
+        # Like CBC, HiGHS returns the best feasible solution found so far when it stops early.
+        # If it stops before finding any, result.x is None and the caller decides what to fall back to.
+        if result.x is not None:
+            # Snap integer columns to exact integers
+            integer = self.integrality == 1
+            result.x[integer] = np.round(result.x[integer])
+        return result
+
+    # Value of the (maximized) objective, None if the solve found no solution
+    def objective_value(self, result):
+        return -result.fun if result.x is not None else None
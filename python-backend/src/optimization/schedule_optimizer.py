@@ -1,98 +1,400 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
 from pyomo.environ import *
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from encoding import decode, drop_unused_categories
+from instrumentation import DISABLED
+from optimization.heuristic_search import HeuristicSearch
+from optimization.matrix_backend import MatrixModel
+from optimization.schedule_solution import ScheduleSolution
 
 class ScheduleOptimizer:
-    
+    BACKENDS = {"pyomo", "scipy"}
+    # MILP solvers for the pyomo backend: Pyomo solver name, then the solver's option names for the
+    # time limit, thread count and relative MIP gap (None if it has no such option)
+    SOLVERS = {
+        "cbc": ("cbc", "seconds", "threads", "ratioGap"),
+        "highs": ("appsi_highs", "time_limit", "threads", "mip_rel_gap"),
+        "glpk": ("glpk", "tmlim", None, "mipgap"),
+    }
+    # Objective weights for section size deviation (alpha) and unassigned spread (beta)
+    ALPHA = .1
+    BETA = .1
+    # Share of the time limit the heuristic start may take; the solver gets what is left
+    HEURISTIC_TIME_SHARE = .1
+
     # -- Initialize the optimizer with necessary data structures
-    def __init__(self):
+    # backend: "pyomo" builds a Pyomo model solved by CBC, "scipy" assembles the same
+    # formulation as sparse matrices and solves it with scipy.optimize.milp (HiGHS)
+    # decompose: solve each independent group of students and courses as its own model, in parallel
+    # on up to max_workers processes (default: one per CPU)
+    # heuristic_start: start the solver from a fast greedy/local-search schedule (see HeuristicSearch).
+    # Off by default: it often lets CBC stop sooner, but on some inputs CBC proves optimality faster cold.
+    # solver: MILP solver for the pyomo backend (see SOLVERS), fallback: solver to use if it isn't installed
+    # time_limit: seconds before the solver returns its best schedule so far (None: no limit)
+    # threads: solver threads (None: solver default), mip_gap: stop once within this relative gap of optimal
+    # metrics: an instrumentation.Metrics to record phase timings, model size and solver stats in
+    def __init__(self, backend="pyomo", decompose=False, max_workers=None, heuristic_start=False,
+                 solver="cbc", fallback=None, time_limit=10, threads=None, mip_gap=None, metrics=None):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown optimizer backend '{backend}', expected one of: {', '.join(sorted(self.BACKENDS))}")
+        for name in (solver, fallback):
+            if name is not None and name not in self.SOLVERS:
+                raise ValueError(f"Unknown MILP solver '{name}', expected one of: {', '.join(sorted(self.SOLVERS))}")
+        self.backend = backend
+        self.solver = solver
+        self.fallback = fallback
+        self.time_limit = time_limit
+        self.threads = threads
+        self.mip_gap = mip_gap
+        self.decompose = decompose
+        self.max_workers = max_workers
+        self.heuristic_start = heuristic_start
+        self.metrics = metrics if metrics is not None else DISABLED
+        # How the last solve ended: "optimal", "time_limit", "infeasible" or "other" (see solve_outcome)
+        self.outcome = None
         self.model = None
-        self.section_to_times = None
-        self.course_to_sections = None
-        self.section_periods = None
-        self.student_requests = None
+        # Variables, constraints and nonzero coefficients of the Pyomo model, counted as it is built
+        self.model_size = None
+        self.matrix_model = None
+        self.matrix_result = None
+        # Snapshot of the solved assignment, read by every getter
+        self.solution = None
+        # Integer encoding shared by the lookups and the model: names of the student, course,
+        # (course, section) and (day, period) slot codes, and codes of names passed in
+        self.students = None
+        self.courses = None
+        self.sections = None
+        self.slots = None
+        self.student_index = None
+        self.section_index = None
+        # Per row of the students, schedules and periods DataFrames: student, course and section codes
+        self.request_students = None
+        self.request_courses = None
+        self.section_courses = None
+        self.period_courses = None
+        self.section_capacity = None
+        self.meeting_sections = None
+        self.meeting_slots = None
+        # Lookups on codes, as arrays per code: requested courses per student (and their count),
+        # sections per course and slots per section
+        self.student_courses = None
+        self.request_counts = None
+        self.course_sections = None
+        self.section_slots = None
+        # Candidate (student, section) pairs sorted by student then section, and their ids
+        self.pair_students = None
+        self.pair_sections = None
+        self.pairs = None
         self.students_df = None
         self.schedules_df = None
         self.periods_df = None
 
-    def run_solver(self, students_df, schedules_df, periods_df):
+    # previous_assignments: optional DataFrame (Student Name, Course Name, Section) from an earlier run,
+    # e.g. get_assigned_courses(). Its still-feasible part is used as a warm start (incremental mode).
+    def run_solver(self, students_df, schedules_df, periods_df, previous_assignments=None):
         # Store dataframes for later use
         self.students_df = students_df
         self.schedules_df = schedules_df
         self.periods_df = periods_df
 
+        metrics = self.metrics
+
         # Build helper structures
-        self.build_lookups(periods_df, schedules_df)
+        with metrics.phase("build_lookups"):
+            self.build_lookups(periods_df, schedules_df)
+        metrics.record(
+            "data", requests=len(students_df), students=len(self.students), sections=len(self.sections),
+            candidate_pairs=len(self.pairs)
+        )
+        if self.decompose:
+            with metrics.phase("solve_components"):
+                self.solve_components(previous_assignments)
+            return
+        start = None
+        # Seconds of the time limit used before the solver starts
+        elapsed = 0
+        if previous_assignments is not None:
+            with metrics.phase("warm_start"):
+                start = self.build_warm_start(previous_assignments)
+        if self.heuristic_start:
+            # Complete the previous assignments (if any) to a good feasible schedule, so the solver
+            # starts with an incumbent instead of searching for a first one until its time limit
+            with metrics.phase("heuristic"):
+                started = time.perf_counter()
+                budget = self.time_limit * self.HEURISTIC_TIME_SHARE if self.time_limit is not None else None
+                start = HeuristicSearch(time_limit=budget).solve(self, start or ())
+                elapsed = time.perf_counter() - started
 
         # Initialize and solve the model
-        self.model = self.initialize_model()
-        self.solve_model()
+        if self.backend == "scipy":
+            # scipy.optimize.milp takes no initial solution, the start is only used as a fallback below
+            with metrics.phase("initialize_model"):
+                self.matrix_model = MatrixModel(self)
+            metrics.record(
+                "model", variables=self.matrix_model.n_vars, constraints=self.matrix_model.n_rows,
+                nonzeros=int(self.matrix_model.A.nnz)
+            )
+            with metrics.phase("solve_model"):
+                self.matrix_result = self.matrix_model.solve(time_limit=self.remaining_time(elapsed), mip_gap=self.mip_gap)
+            result = self.matrix_result
+            # scipy.optimize.milp status: 0 optimal, 1 iteration or time limit, 2 infeasible
+            self.outcome = {0: "optimal", 1: "time_limit", 2: "infeasible"}.get(result.status, "other")
+            metrics.record(
+                "solver", name="highs", status=result.message, success=bool(result.success),
+                objective=self.matrix_model.objective_value(result), gap=result.get("mip_gap"),
+                nodes=result.get("mip_node_count"), seconds=metrics.phases.get("solve_model")
+            )
+            if result.x is not None:
+                self.solution = ScheduleSolution(self, result.x[:self.matrix_model.n_pairs])
+            elif start is not None:
+                # Stopped before finding a solution: keep the start, as solve_model does
+                self.set_assignments(start)
+            else:
+                raise RuntimeError(f"MILP solver found no feasible solution: {result.message}")
+        else:
+            with metrics.phase("initialize_model"):
+                self.model = self.initialize_model()
+                if start is not None:
+                    self.set_assignments(start)
+            metrics.record("model", **self.model_size)
+            with metrics.phase("solve_model"):
+                self.solve_model(warmstart=start is not None, elapsed=elapsed)
+
+        # Never return a worse schedule than the start, even if the solver stopped early
+        if start is not None:
+            warm_solution = ScheduleSolution(self, self._pair_vector(start))
+            if self.solution_objective(warm_solution) > self.solution_objective(self.solution):
+                self.set_assignments(start)
+
+    # Label the connected components of the student-course request graph. Students only interact
+    # through shared sections (capacity, even section sizes), so each component is an independent
+    # problem; time slots don't couple students since conflicts are per student.
+    # Returns (student labels, course labels); -1 for students and courses without candidate sections.
+    def find_components(self):
+        n_students = len(self.students)
+        n_courses = len(self.courses)
+        pair_courses = self.section_courses[self.pair_sections]
+        graph = coo_matrix(
+            (np.ones(len(pair_courses)), (self.pair_students, n_students + pair_courses)),
+            shape=(n_students + n_courses, n_students + n_courses)
+        )
+        _, labels = connected_components(graph, directed=False)
+        has_pairs = np.zeros(n_students + n_courses, dtype=bool)
+        has_pairs[self.pair_students] = True
+        has_pairs[n_students + pair_courses] = True
+        labels = np.where(has_pairs, labels, -1)
+        return labels[:n_students], labels[n_students:]
+
+    # Solve every component as its own model and merge the assignments into this optimizer's solution.
+    # MinUnassigned/MaxUnassigned (fairness) and the time limit apply per component.
+    def solve_components(self, previous_assignments=None):
+        student_labels, course_labels = self.find_components()
+        # Component label of every row (-1: not in any component)
+        def row_labels(labels, codes):
+            return np.where(codes >= 0, labels[codes], -1)
+        request_labels = row_labels(student_labels, self.request_students)
+        # Requests for courses without sections can't be assigned and would tie students to nothing
+        request_labels[row_labels(course_labels, self.request_courses) < 0] = -1
+        schedule_labels = row_labels(course_labels, self.section_courses)
+        period_labels = row_labels(course_labels, self.period_courses)
+
+        student_groups = self.students_df[request_labels >= 0].groupby(request_labels[request_labels >= 0], sort=False)
+        schedule_groups = self.schedules_df[schedule_labels >= 0].groupby(schedule_labels[schedule_labels >= 0], sort=False)
+        period_groups = self.periods_df[period_labels >= 0].groupby(period_labels[period_labels >= 0], sort=False)
+        components = []
+        for label, component_students in student_groups:
+            component_schedules = schedule_groups.get_group(label)
+            component_periods = period_groups.get_group(label) if label in period_groups.groups else self.periods_df.iloc[:0]
+            component_previous = None
+            if previous_assignments is not None:
+                component_previous = previous_assignments[
+                    previous_assignments["Student Name"].isin(component_students["Student Name"])
+                ]
+            # Sent to worker processes: only pickle the names the component uses
+            components.append((
+                self.solver_settings(),
+                *(drop_unused_categories(df) for df in (component_students, component_schedules, component_periods)),
+                component_previous
+            ))
+        # Largest components first so the slowest solves start early
+        components.sort(key=lambda component: len(component[1]), reverse=True)
+        self.metrics.record("data", components=len(components))
+
+        max_workers = min(self.max_workers or os.cpu_count() or 1, len(components))
+        if max_workers <= 1:
+            results = [solve_component(*component) for component in components]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            ) as pool:
+                results = list(pool.map(solve_component, *zip(*components)))
+        assignments = [assignment for component_assignments, _ in results for assignment in component_assignments]
+        self.outcome = combined_outcome([outcome for _, outcome in results])
+        self.set_assignments(assignments)
+
+    # Constructor arguments that configure how each (sub)problem is solved
+    def solver_settings(self):
+        return {
+            "backend": self.backend,
+            "heuristic_start": self.heuristic_start,
+            "solver": self.solver,
+            "fallback": self.fallback,
+            "time_limit": self.time_limit,
+            "threads": self.threads,
+            "mip_gap": self.mip_gap,
+        }
+
+    # Keep the previous assignments that still fit the current data: the student still requests the
+    # course, the section still exists, and it has a free seat and no time conflict with the student's
+    # other kept sections. Returns a list of (student, course, section) tuples.
+    def build_warm_start(self, previous_assignments):
+        remaining_seats = self.section_capacity.copy()
+        taken_courses = set()
+        occupied_slots = {}
+        start = []
+        names = previous_assignments["Student Name"].tolist()
+        keys = list(zip(previous_assignments["Course Name"].tolist(), previous_assignments["Section"].tolist()))
+        students = [self.student_index.get(s, -1) for s in names]
+        sections = [self.section_index.get(key, -1) for key in keys]
+        candidate = (self.pair_ids(students, sections) >= 0).tolist()
+        for s, (c, sec), student, section, is_candidate in zip(names, keys, students, sections, candidate):
+            if not is_candidate:
+                continue
+            course = self.section_courses[section]
+            times = self.section_slots[section].tolist()
+            occupied = occupied_slots.setdefault(student, set())
+            if (student, course) in taken_courses or remaining_seats[section] <= 0 or not occupied.isdisjoint(times):
+                continue
+            remaining_seats[section] -= 1
+            taken_courses.add((student, course))
+            occupied.update(times)
+            start.append((s, c, sec))
+        return start
     
     # Build all the lookups
     def build_lookups(self, periods_df, schedules_df):
-        # Build section to times mapping
-        def build_section_to_times(periods_df):
-            section_to_times = {}
-            for _, row in periods_df.iterrows():
-                key = (row["Course Name"], row["Section"])
-                section_to_times.setdefault(key, set()).add((row["Day of Week"], row["Period Number"]))
-            return section_to_times
-
-        # Build course to sections mapping
-        def build_course_to_sections(schedules_df):
-            course_to_sections = schedules_df.groupby("Course Name")["Section"].apply(set).to_dict()
-            course_to_sections = {c: {(c, s) for s in sections} for c, sections in course_to_sections.items()}
-            return course_to_sections
-
-        # Build section periods set
-        def build_section_periods(periods_df):
-            return {(row['Course Name'], row['Section'], row['Day of Week'], row['Period Number']) for _, row in periods_df.iterrows()}
-
-        # Build student requests mapping
-        def build_student_requests(students_df):
-            return students_df.groupby("Student Name")["Course Name"].apply(set).to_dict()
-
-        self.section_to_times = build_section_to_times(periods_df)
-        self.course_to_sections = build_course_to_sections(schedules_df)
-        self.section_periods = build_section_periods(periods_df)
-        self.student_requests = build_student_requests(self.students_df)
-
-    # Model initialization and solving
-    def initialize_model(self):
         students_df = self.students_df
-        schedules_df = self.schedules_df
-        periods_df = self.periods_df
-        course_to_sections = self.course_to_sections
-        section_periods = self.section_periods
-        student_requests = self.student_requests
-
-        model = ConcreteModel()
 
-        # Sets
-        model.Students = Set(initialize=students_df["Student Name"].unique())
-        model.Courses = Set(initialize=schedules_df["Course Name"].unique())
-        model.Sections = Set(initialize=[(row["Course Name"], row["Section"]) for _, row in schedules_df.iterrows()])
+        # Shared integer encoding: students and courses are coded in order of first appearance (courses
+        # in schedules_df first, then courses that are only requested), a section's code is its row
+        # position in schedules_df and a slot's code is its (day, period)'s order of first appearance.
+        # The lookups and the model only use codes, names are looked up to decode results or to code
+        # names passed in. Categorical columns (see encoding.encode_tables) are coded without hashing every row.
+        request_students, students = pd.factorize(students_df["Student Name"])
+        section_courses, courses = pd.factorize(schedules_df["Course Name"])
+        request_courses = courses.get_indexer(students_df["Course Name"])
+        requested_only = (request_courses < 0) & students_df["Course Name"].notna().to_numpy()
+        extra_codes, extra_courses = pd.factorize(students_df["Course Name"][requested_only])
+        request_courses[requested_only] = len(courses) + extra_codes
+        section_keys = pd.MultiIndex.from_arrays([schedules_df["Course Name"], schedules_df["Section"]])
+        period_sections = section_keys.get_indexer(
+            pd.MultiIndex.from_arrays([periods_df["Course Name"], periods_df["Section"]])
+        )
 
-        section_to_course = {(row["Course Name"], row["Section"]): row["Course Name"] for _, row in schedules_df.iterrows()}
-        model.SectionToCourse = Param(model.Sections, initialize=section_to_course)
+        self.students = students.tolist()
+        self.courses = courses.tolist() + extra_courses.tolist()
+        self.sections = list(zip(schedules_df["Course Name"].tolist(), schedules_df["Section"].tolist()))
+        self.student_index = {s: i for i, s in enumerate(self.students)}
+        self.section_index = {sec: i for i, sec in enumerate(self.sections)}
+        self.request_students = request_students
+        self.request_courses = request_courses
+        self.section_courses = section_courses
+        self.period_courses = courses.get_indexer(periods_df["Course Name"])
+        self.section_capacity = schedules_df["Capacity"].to_numpy()
+
+        # Meetings as (section code, slot code) pairs, where a slot is a (day, period)
+        slot_codes, slots = pd.factorize(pd.MultiIndex.from_arrays([periods_df["Day of Week"], periods_df["Period Number"]]))
+        self.slots = slots.tolist()
+        meetings = pd.DataFrame({"section": period_sections, "slot": slot_codes})
+        meetings = meetings[meetings["section"] >= 0].drop_duplicates()
+        self.meeting_sections = meetings["section"].to_numpy()
+        self.meeting_slots = meetings["slot"].to_numpy()
+
+        # Requested courses per student, each once and in code order
+        requests = pd.DataFrame({"student": request_students, "course": request_courses})
+        requests = requests[(requests["student"] >= 0) & (requests["course"] >= 0)].drop_duplicates()
+        requests = requests.sort_values(["student", "course"], kind="stable")
+        self.student_courses = group_codes(requests["student"], requests["course"], len(self.students))
+        self.request_counts = np.bincount(requests["student"], minlength=len(self.students))
+        self.course_sections = group_codes(section_courses, np.arange(len(section_courses)), len(self.courses))
+        self.section_slots = group_codes(self.meeting_sections, self.meeting_slots, len(self.sections))
+
+        # Build the sparse (student, section) candidate pairs: only sections of requested courses
+        sections = pd.DataFrame({"course": section_courses, "section": np.arange(len(section_courses))})
+        pairs = requests.merge(sections, on="course").sort_values(["student", "section"], kind="stable")
+        self.pair_students = pairs["student"].to_numpy()
+        self.pair_sections = pairs["section"].to_numpy()
+        self.pairs = range(len(pairs))
+
+    # Ids of the candidate pairs for arrays of student and section codes (-1 where not a candidate).
+    # Pairs are sorted by (student, section), so this is a binary search.
+    def pair_ids(self, students, sections):
+        n_sections = len(self.sections)
+        students = np.asarray(students, dtype=np.int64)
+        sections = np.asarray(sections, dtype=np.int64)
+        if not len(self.pair_students):
+            return np.full(len(students), -1)
+        keys = self.pair_students.astype(np.int64) * n_sections + self.pair_sections
+        query = students * n_sections + sections
+        ids = np.searchsorted(keys, query).clip(max=len(keys) - 1)
+        found = (students >= 0) & (sections >= 0) & (keys[ids] == query)
+        return np.where(found, ids, -1)
+
+    # Model initialization and solving. Students, courses, sections and slots are indexed by their codes,
+    # assignment variables by candidate pair id.
+    def initialize_model(self):
+        course_sections = self.course_sections
+        student_courses = self.student_courses
+        n_pairs = len(self.pairs)
+        pair_ids = np.arange(n_pairs)
+        # Candidate pair ids per section, and each student's (contiguous) range of pair ids
+        section_pairs = group_codes(self.pair_sections, pair_ids, len(self.sections))
+        student_offsets = np.concatenate([[0], np.cumsum(np.bincount(self.pair_students, minlength=len(self.students)))]).tolist()
 
-        section_to_capacity = {(row["Course Name"], row["Section"]): row["Capacity"] for _, row in schedules_df.iterrows()}
-        model.SectionCapacity = Param(model.Sections, initialize=section_to_capacity)
+        model = ConcreteModel()
 
-        model.SectionPeriods = Set(dimen=4, initialize=section_periods)
-        model.StudentCourseRequests = Param(model.Students, within=Any, initialize=lambda model, s: student_requests.get(s, set()))
+        # Sets
+        model.Students = Set(initialize=range(len(self.students)))
+        model.Courses = Set(initialize=range(len(self.courses)))
+        model.Sections = Set(initialize=range(len(self.sections)))
+
+        model.SectionToCourse = Param(model.Sections, initialize=dict(enumerate(self.section_courses.tolist())))
+        model.SectionCapacity = Param(model.Sections, initialize=dict(enumerate(self.section_capacity.tolist())))
+
+        # Meetings as (section, slot)
+        model.SectionPeriods = Set(dimen=2, initialize=list(zip(self.meeting_sections.tolist(), self.meeting_slots.tolist())))
+        model.StudentCourseRequests = Param(model.Students, within=Any, initialize=lambda model, s: student_courses[s].tolist())
+
+        # Sparse assignment index: one id per candidate (student, section) pair, i.e. only sections of
+        # requested courses (see pair_students and pair_sections)
+        model.StudentSections = Set(initialize=self.pairs)
+        # Requested (student, course) pairs
+        model.StudentCourses = Set(
+            dimen=2,
+            initialize=[(s, c) for s, courses in enumerate(student_courses) for c in courses.tolist()]
+        )
 
         # Section size variable
         model.SectionSize = Var(model.Sections, domain=NonNegativeIntegers)
         # Number of unassigned courses per student
         model.UnassignedCourses = Var(model.Students, domain=NonNegativeIntegers)
-        # x[s, (c, sec)] = 1 if student s is assigned to (Course Name, Section)
-        model.x = Var(model.Students, model.Sections, domain=Binary)
+        # x[pair] = 1 if the pair's student is assigned to its section
+        model.x = Var(model.StudentSections, domain=Binary)
 
         # Encourage even section sizes
         model.SectionDeviation = Var(model.Sections, domain=NonNegativeReals)
         model.DeviationConstraints = ConstraintList()
         for c in model.Courses:
-            sections = list(course_to_sections.get(c, set()))
+            sections = course_sections[c].tolist()
             if not sections:
                 continue
             avg = sum(model.SectionSize[sec] for sec in sections) / len(sections)
@@ -102,56 +404,51 @@ class ScheduleOptimizer:
 
         # --- Constraints ---
         # Each student can be assigned to at most one section of each requested course
+        n_courses = len(self.courses)
+        course_pairs = shared_groups(self.pair_students * n_courses + self.section_courses[self.pair_sections], pair_ids)
+        course_pairs = {divmod(key, n_courses): pairs for key, pairs in course_pairs.items()}
         def course_assignment_rule(model, s, c):
-            sections = course_to_sections.get(c, set())
-            valid_sections = [sec for sec in sections if sec in model.Sections]
-            if not valid_sections:
+            pairs = course_pairs.get((s, c))
+            if pairs is None:
                 return Constraint.Skip
-            return sum(model.x[s, sec] for sec in valid_sections) <= 1
-        model.AssignOneSectionPerCourse = Constraint(model.Students, model.Courses, rule=course_assignment_rule)
-
-        # A student can only be assigned to requested courses
-        def only_requested_courses(model, s, c, sec_num):
-            course = model.SectionToCourse[(c, sec_num)]
-            if course not in student_requests.get(s, set()):
-                return model.x[s, (c, sec_num)] == 0
-            return Constraint.Skip
-        model.OnlyRequestedCourses = Constraint(model.Students, model.Sections, rule=only_requested_courses)
+            return sum(model.x[pair] for pair in pairs) <= 1
+        model.AssignOneSectionPerCourse = Constraint(model.StudentCourses, rule=course_assignment_rule)
 
         # Capacity constraint: number of students in a class cannot exceed capacity
-        def capacity_rule(model, c, sec_num):
-            return sum(model.x[s, (c, sec_num)] for s in model.Students) <= model.SectionCapacity[(c, sec_num)]
+        def capacity_rule(model, sec):
+            pairs = section_pairs[sec].tolist()
+            if not pairs:
+                return Constraint.Skip
+            return sum(model.x[pair] for pair in pairs) <= model.SectionCapacity[sec]
         model.CapacityConstraint = Constraint(model.Sections, rule=capacity_rule)
 
         # No time conflicts for any student (can't take two classes at same time)
-        def no_time_conflicts(model, s, d, p):
-            overlapping_sections = [sec for sec in model.Sections if (sec[0], sec[1], d, p) in model.SectionPeriods]
-            if not overlapping_sections:
-                return Constraint.Skip
-            return sum(model.x[s, sec] for sec in overlapping_sections) <= 1
-        model.NoTimeConflicts = Constraint(
-            model.Students,
-            periods_df["Day of Week"].unique(),
-            periods_df["Period Number"].unique(),
-            rule=no_time_conflicts
+        # Only (student, slot) pairs met by more than one of the student's candidate sections can conflict
+        n_slots = len(self.slots)
+        meetings = pd.DataFrame({"section": self.meeting_sections, "slot": self.meeting_slots})
+        pair_slots = pd.DataFrame({"pair": pair_ids, "student": self.pair_students, "section": self.pair_sections}).merge(meetings, on="section")
+        slot_pairs = shared_groups(
+            pair_slots["student"].to_numpy().astype(np.int64) * n_slots + pair_slots["slot"].to_numpy(),
+            pair_slots["pair"].to_numpy()
         )
+        slot_pairs = {divmod(key, n_slots): pairs for key, pairs in slot_pairs.items()}
+        model.StudentSlots = Set(dimen=2, initialize=list(slot_pairs))
+
+        def no_time_conflicts(model, s, t):
+            return sum(model.x[pair] for pair in slot_pairs[(s, t)]) <= 1
+        model.NoTimeConflicts = Constraint(model.StudentSlots, rule=no_time_conflicts)
 
         # Section size constraint: total number of students in a section must equal the SectionSize variable
-        def section_size_rule(model, c, sec_num):
-            return model.SectionSize[(c, sec_num)] == sum(model.x[s, (c, sec_num)] for s in model.Students)
+        def section_size_rule(model, sec):
+            return model.SectionSize[sec] == sum(model.x[pair] for pair in section_pairs[sec].tolist())
         model.SectionSizeConstraint = Constraint(model.Sections, rule=section_size_rule)
 
 
         # Constraint: Link UnassignedCourses to assignments
+        request_counts = self.request_counts.tolist()
         def unassigned_courses_rule(model, s):
-            requested = student_requests.get(s, set())
-            assigned = sum(
-                model.x[s, sec]
-                for c in requested
-                for sec in course_to_sections.get(c, set())
-                if sec in model.Sections
-            )
-            return model.UnassignedCourses[s] == len(requested) - assigned
+            assigned = sum(model.x[pair] for pair in range(student_offsets[s], student_offsets[s + 1]))
+            return model.UnassignedCourses[s] == request_counts[s] - assigned
         model.UnassignedCoursesConstraint = Constraint(model.Students, rule=unassigned_courses_rule)
 
         # Variables for min and max unassigned
@@ -167,79 +464,164 @@ class ScheduleOptimizer:
             return model.MaxUnassigned >= model.UnassignedCourses[s]
         model.MaxUnassignedConstraint = Constraint(model.Students, rule=max_unassigned_rule)
 
+        # Model size from the groups the constraints were built from, as walking the built model for
+        # it would take a tenth of the build time. Coefficients count once per variable in a constraint.
+        n_students = len(self.students)
+        n_sections = len(self.sections)
+        course_section_counts = np.array([len(sections) for sections in course_sections], dtype=np.int64)
+        self.model_size = {
+            "variables": n_pairs + 2 * n_sections + n_students + 2,
+            "constraints": int(
+                2 * course_section_counts.sum() + len(course_pairs)
+                + np.count_nonzero(np.bincount(self.pair_sections, minlength=n_sections))
+                + len(slot_pairs) + n_sections + 3 * n_students
+            ),
+            "nonzeros": int(
+                # Deviation: SectionDeviation and every section size of the course, except with one
+                # section, whose size cancels out of its own average and leaves only SectionDeviation
+                np.where(course_section_counts == 1, 2, 2 * course_section_counts * (course_section_counts + 1)).sum()
+                + sum(len(pairs) for pairs in course_pairs.values())
+                + n_pairs
+                + sum(len(pairs) for pairs in slot_pairs.values())
+                # Section sizes and unassigned courses: their variable and their pairs
+                + n_pairs + n_sections + n_pairs + n_students
+                + 4 * n_students
+            ),
+        }
+
         # --- Objective ---
         # Maximize number of assigned student-course pairs
-        alpha = .1
-        beta = .1
         model.obj = Objective(
-            expr=sum(model.x[s, sec] for s in model.Students for sec in model.Sections)
-                - alpha * sum(model.SectionDeviation[sec] for sec in model.Sections)
-                - beta * (model.MaxUnassigned - model.MinUnassigned),
+            expr=sum(model.x[idx] for idx in model.StudentSections)
+                - self.ALPHA * sum(model.SectionDeviation[sec] for sec in model.Sections)
+                - self.BETA * (model.MaxUnassigned - model.MinUnassigned),
             sense=maximize
         )
 
         return model
 
-    def solve_model(self):
-        solver = SolverFactory('cbc')
-        # Set a time limit of 10 seconds (CBC uses 'seconds' option)
-        solver.options['seconds'] = 10
-        result = solver.solve(self.model, tee=False)
+    # warmstart: pass the current variable values (see set_assignments) to CBC as a MIP start
+    # elapsed: seconds of the time limit already used, e.g. by the heuristic start
+    def solve_model(self, warmstart=False, elapsed=0):
+        name, solver, (time_option, threads_option, gap_option) = self.create_solver()
+        if name == "highs":
+            # HiGHS keeps one thread pool per process and fails if a solve asks for a different size
+            import highspy
+            highspy.Highs.resetGlobalScheduler(True)
+        time_limit = self.remaining_time(elapsed)
+        if time_limit is not None:
+            solver.options[time_option] = time_limit
+        if self.threads is not None and threads_option is not None:
+            solver.options[threads_option] = self.threads
+        if self.mip_gap is not None:
+            solver.options[gap_option] = self.mip_gap
+        result = solver.solve(
+            self.model, tee=False, load_solutions=False, warmstart=warmstart and solver.warm_start_capable()
+        )
+        self.outcome = solve_outcome(result.solver.termination_condition, time_limit)
+        if self.metrics.enabled:
+            self.metrics.record("solver", name=name, **solver_stats(result))
         # Note: If the solver stops early, it will return the best feasible solution found so far.
+        # If it stops before finding any, there is either no solution or (CBC) the LP relaxation, so
+        # check the values: keep the warm start (still in self.solution) or fail like the scipy backend.
+        if len(result.solution) > 0:
+            self.model.solutions.load_from(result)
+        x = self.model.x.extract_values()
+        x = [x[pair] for pair in self.pairs]
+        if not self.is_feasible(x):
+            if not warmstart:
+                raise RuntimeError(f"MILP solver found no feasible solution: {result.solver.termination_condition}")
+            self.set_assignments(self.solution.assignments())
+            return result
+        self.solution = ScheduleSolution(self, x)
         return result
 
+    # Seconds of the time limit left for the solver after `elapsed` seconds (None: no limit).
+    # The solver always gets a tenth of a second (or the whole limit, if shorter) to work with.
+    def remaining_time(self, elapsed):
+        if self.time_limit is None:
+            return None
+        return max(self.time_limit - elapsed, min(self.time_limit, .1))
+
+    # The configured solver name, solver and its time limit, threads and gap option names,
+    # or the fallback solver if the configured one isn't installed
+    def create_solver(self):
+        for name in (self.solver, self.fallback):
+            if name is None:
+                continue
+            solver_name, *option_names = self.SOLVERS[name]
+            solver = SolverFactory(solver_name)
+            if solver.available(exception_flag=False):
+                return name, solver, option_names
+        tried = " or ".join(f"'{name}'" for name in (self.solver, self.fallback) if name is not None)
+        raise RuntimeError(f"MILP solver {tried} is not available")
+
+    # Whether x (a value per candidate pair) is an integral schedule within section capacities,
+    # with at most one section per requested course and no time conflicts
+    def is_feasible(self, x):
+        x = np.asarray([np.nan if v is None else v for v in x], dtype=float)
+        if not np.all(np.abs(x - np.round(x)) < 1e-6):
+            return False
+        solution = ScheduleSolution(self, x)
+        if np.any(solution.section_sizes > self.section_capacity):
+            return False
+        assigned = pd.DataFrame({"student": solution.pair_students, "section": solution.pair_sections})
+        if assigned.assign(course=self.section_courses[solution.pair_sections]).duplicated(["student", "course"]).any():
+            return False
+        meetings = pd.DataFrame({"section": self.meeting_sections, "slot": self.meeting_slots})
+        return not assigned.merge(meetings, on="section").duplicated(["student", "slot"]).any()
+
     # --- Output assigned students ---
+    # Names are decoded here, as Categoricals over the optimizer's names
     def get_assigned_courses(self):
-        assigned = [
-            (s, sec[0], sec[1])
-            for s in self.model.Students
-            for sec in self.model.Sections
-            if value(self.model.x[s, sec]) == 1
-        ]
-        return pd.DataFrame(assigned, columns=["Student Name", "Course Name", "Section"])
+        sections = self.solution.pair_sections
+        return pd.DataFrame({
+            "Student Name": decode(self.solution.pair_students, self.students),
+            "Course Name": decode(self.section_courses[sections], self.courses),
+            "Section": [self.sections[sec][1] for sec in sections.tolist()],
+        })
 
     # --- Output unassigned requested courses per student ---
     def get_unassigned_courses(self):
-        unassigned = []
-        model = self.model
-        for s in model.Students:
-            requested_courses = self.student_requests.get(s, set())
-            for c in requested_courses:
-                assigned_sections = [sec for sec in self.course_to_sections.get(c, set()) if value(model.x[s, sec]) == 1]
-                if not assigned_sections:
-                    sections = self.course_to_sections.get(c, set())
-                    could_take_if_no_capacity = False
-                    for sec in sections:
-                        times = self.section_to_times.get(sec, set())
-                        has_conflict = False
-                        for d, p in times:
-                            for other_sec in model.Sections:
-                                if other_sec == sec:
-                                    continue
-                                if (other_sec[0], other_sec[1], d, p) in model.SectionPeriods:
-                                    if value(model.x[s, other_sec]) == 1:
-                                        has_conflict = True
-                                        break
-                            if has_conflict:
-                                break
-                        if not has_conflict:
-                            could_take_if_no_capacity = True
-                            break
-                    has_capacity = any(value(model.SectionSize[sec]) < model.SectionCapacity[sec] for sec in sections)
-                    if not has_capacity:
-                        reason = "Capacity"
-                    elif not could_take_if_no_capacity:
-                        reason = "Time Conflict"
-                    else:
-                        reason = "Unknown"
-                    unassigned.append((s, c, reason))
-        return pd.DataFrame(unassigned, columns=["Student Name", "Unassigned Course Name", "Reason"])
+        # Per student, read the assigned courses and occupied slots from the solution snapshot
+        open_sections = (self.solution.section_sizes < self.section_capacity).tolist()
+        section_courses = self.section_courses.tolist()
+        unassigned_students = []
+        unassigned_courses = []
+        reasons = []
+        section_slots = [slots.tolist() for slots in self.section_slots]
+        for s, requested in enumerate(self.student_courses):
+            assigned_sections = self.solution.student_section_codes(s).tolist()
+            assigned_courses = {section_courses[sec] for sec in assigned_sections}
+            occupied = {t for sec in assigned_sections for t in section_slots[sec]}
+            for c in requested.tolist():
+                if c in assigned_courses:
+                    continue
+                sections = self.course_sections[c].tolist()
+                has_capacity = any(open_sections[sec] for sec in sections)
+                could_take_if_no_capacity = any(occupied.isdisjoint(section_slots[sec]) for sec in sections)
+                if not has_capacity:
+                    reason = "Capacity"
+                elif not could_take_if_no_capacity:
+                    reason = "Time Conflict"
+                else:
+                    reason = "Unknown"
+                unassigned_students.append(s)
+                unassigned_courses.append(c)
+                reasons.append(reason)
+        return pd.DataFrame({
+            "Student Name": decode(np.array(unassigned_students, dtype=int), self.students),
+            "Unassigned Course Name": decode(np.array(unassigned_courses, dtype=int), self.courses),
+            "Reason": reasons,
+        })
 
     # --- Output class rosters for a given course and section ---
     def get_class_roster(self, course, section):
-        # Get all assignments and filter by course and section
-        assignments = self.get_assignments()
-        assigned_students = [s for s, c, sec in assignments if c == course and str(sec) == str(section)]
+        code = self.section_index.get((course, section))
+        if code is None:
+            # Sections may be passed as strings (e.g. from a query parameter)
+            code = next((i for i, (c, sec) in enumerate(self.sections) if c == course and str(sec) == str(section)), None)
+        assigned_students = self.solution.roster(code) if code is not None else []
         if not assigned_students:
             return pd.DataFrame(columns=["Student Name"])
         return pd.DataFrame(assigned_students, columns=["Student Name"])
@@ -247,24 +629,25 @@ class ScheduleOptimizer:
     # --- Output class rosters for all sections ---
     def get_all_class_rosters(self):
         rosters = {}
-        for sec in self.model.Sections:
-            course, section = sec
-            df = self.get_class_roster(course, section)
-            if not df.empty:
-                rosters[sec] = df
+        for i in np.flatnonzero(self.solution.section_sizes).tolist():
+            rosters[self.sections[i]] = pd.DataFrame(self.solution.roster(i), columns=["Student Name"])
         return rosters
     
     # --- Output an individual student schedule ---
     def get_student_schedule(self, student):
-        model = self.model
         days = list(self.periods_df["Day of Week"].unique())
         periods = sorted(self.periods_df["Period Number"].unique())
+        return self._student_schedule(student, days, periods)
+
+    # Build a student's period x day grid of "Course.Section" labels
+    def _student_schedule(self, student, days, periods):
         schedule = {p: {d: "" for d in days} for p in periods}
-        for sec in model.Sections:
-            if value(model.x[student, sec]) == 1:
-                times = self.section_to_times.get(sec, set())
-                for d, p in times:
-                    schedule[p][d] = f"{sec[0]}.{sec[1]}"
+        code = self.student_index.get(student)
+        for sec in self.solution.student_section_codes(code).tolist() if code is not None else []:
+            course, section = self.sections[sec]
+            for t in self.section_slots[sec].tolist():
+                d, p = self.slots[t]
+                schedule[p][d] = f"{course}.{section}"
         df = pd.DataFrame(
             [[schedule[p][d] for d in days] for p in periods],
             index=periods,
@@ -275,24 +658,142 @@ class ScheduleOptimizer:
 
     # --- Output all student schedules ---
     def get_all_student_schedules(self):
-        schedules = {}
-        for s in self.model.Students:
-            schedules[s] = self.get_student_schedule(s)
-        return schedules
+        days = list(self.periods_df["Day of Week"].unique())
+        periods = sorted(self.periods_df["Period Number"].unique())
+        return {s: self._student_schedule(s, days, periods) for s in self.students}
     
     # Returns a list of (student, course, section) tuples where assigned
     def get_assignments(self): 
-        return [
-            (s, sec[0], sec[1])
-            for s in self.model.Students
-            for sec in self.model.Sections
-            if value(self.model.x[s, sec]) == 1
-        ]
-
-     # Set all assignments to 0, then set those in the list to 1
+        return self.solution.assignments()
+
+    # 0/1 vector over self.pairs for a list of (student, course, section) tuples
+    def _pair_vector(self, assignments):
+        x = np.zeros(len(self.pairs))
+        ids = self.pair_ids(
+            [self.student_index[s] for s, _, _ in assignments],
+            [self.section_index[(c, sec)] for _, c, sec in assignments]
+        )
+        if (ids < 0).any():
+            raise KeyError("assignment to a section of a course the student did not request")
+        x[ids] = 1
+        return x
+
+    # Section sizes, section size deviations and unassigned courses per student implied by a solution
+    def _solution_terms(self, solution):
+        sizes = solution.section_sizes
+        course_totals = np.bincount(self.section_courses, weights=sizes, minlength=len(self.courses))
+        # Courses that are only requested have no sections (and no deviation)
+        course_sections = np.maximum(np.bincount(self.section_courses, minlength=len(self.courses)), 1)
+        deviation = np.abs(sizes - (course_totals / course_sections)[self.section_courses])
+        unassigned = self.request_counts - np.bincount(solution.pair_students, minlength=len(self.students))
+        return sizes, deviation, unassigned
+
+    # Objective value of a solution, as the model computes it
+    def solution_objective(self, solution):
+        _, deviation, unassigned = self._solution_terms(solution)
+        return len(solution) - self.ALPHA * deviation.sum() - self.BETA * (unassigned.max() - unassigned.min())
+
+    # Set all assignments to 0, then set those in the list to 1.
+    # The remaining model variables are set to match, so the values also form a complete MIP start.
     def set_assignments(self, assignments):
-        for s in self.model.Students:
-            for sec in self.model.Sections:
-                self.model.x[s, sec].value = 0
-        for s, c, sec in assignments:
-            self.model.x[s, (c, sec)].value = 1
\ No newline at end of file
+        x = self._pair_vector(assignments)
+        self.solution = ScheduleSolution(self, x)
+        sizes, deviation, unassigned = self._solution_terms(self.solution)
+        # A decomposed run has no single model to write the values into
+        if self.backend == "scipy":
+            if self.matrix_result is None or self.matrix_result.x is None:
+                return
+            m = self.matrix_model
+            values = self.matrix_result.x
+            values[:m.n_pairs] = x
+            values[m.size_offset:m.size_offset + len(self.sections)] = sizes
+            values[m.unassigned_offset:m.unassigned_offset + len(self.students)] = unassigned
+            values[m.deviation_offset:m.deviation_offset + len(self.sections)] = deviation
+            values[m.min_index] = unassigned.min()
+            values[m.max_index] = unassigned.max()
+            return
+        model = self.model
+        if model is None:
+            return
+        for pair, assigned in zip(self.pairs, x.tolist()):
+            model.x[pair].value = assigned
+        for sec, (size, dev) in enumerate(zip(sizes.tolist(), deviation.tolist())):
+            model.SectionSize[sec].value = size
+            model.SectionDeviation[sec].value = dev
+        for s, n in enumerate(unassigned.tolist()):
+            model.UnassignedCourses[s].value = n
+        model.MinUnassigned.value = min(unassigned.tolist())
+        model.MaxUnassigned.value = max(unassigned.tolist())
+
+# Solve one independent component (see ScheduleOptimizer.solve_components), possibly in a worker process.
+# Returns its (student, course, section) assignments and how its solve ended.
+def solve_component(settings, students_df, schedules_df, periods_df, previous_assignments=None):
+    optimizer = ScheduleOptimizer(**settings)
+    optimizer.run_solver(students_df, schedules_df, periods_df, previous_assignments=previous_assignments)
+    return optimizer.get_assignments(), optimizer.outcome
+
+# Outcome of a Pyomo solve from its termination condition and the time limit it was given.
+# Pyomo's CBC plugin reports a stop on the time limit as maxIterations (CBC prints "Stopped on
+# iterations"), or as intermediateNonInteger if there was no integer solution yet; iteration limits
+# are never set here.
+def solve_outcome(termination_condition, time_limit=None):
+    if termination_condition == TerminationCondition.optimal:
+        return "optimal"
+    if termination_condition in (TerminationCondition.maxTimeLimit, TerminationCondition.maxIterations):
+        return "time_limit"
+    if termination_condition == TerminationCondition.intermediateNonInteger and time_limit is not None:
+        return "time_limit"
+    if termination_condition in (TerminationCondition.infeasible, TerminationCondition.infeasibleOrUnbounded):
+        return "infeasible"
+    return "other"
+
+# Outcome of a decomposed solve: optimal if every component was, else the worst component's
+def combined_outcome(outcomes):
+    for outcome in ("infeasible", "time_limit", "other"):
+        if outcome in outcomes:
+            return outcome
+    return "optimal"
+
+# Status, bounds, relative gap, branch and bound nodes and time from a Pyomo solver result
+# (None where the solver doesn't report them)
+def solver_stats(result):
+    problem = result.problem[0] if len(result.problem) else None
+    lower = getattr(problem, "lower_bound", None)
+    upper = getattr(problem, "upper_bound", None)
+    gap = None
+    if isinstance(lower, (int, float)) and isinstance(upper, (int, float)) and np.isfinite([lower, upper]).all():
+        # CBC reports the bound of a maximization with a flipped sign, so compare magnitudes
+        gap = abs(abs(upper) - abs(lower)) / max(abs(lower), abs(upper), 1e-10)
+    try:
+        nodes = result.solver.statistics.branch_and_bound.number_of_created_subproblems
+    except AttributeError:
+        nodes = None
+    seconds = getattr(result.solver, "wallclock_time", None)
+    return {
+        "status": str(result.solver.termination_condition),
+        "lower_bound": lower,
+        "upper_bound": upper,
+        "gap": gap,
+        "nodes": nodes,
+        "seconds": seconds if isinstance(seconds, (int, float)) else getattr(result.solver, "time", None),
+    }
+
+# For codes 0..n-1 of keys, an array of the values paired with each (views into one array), in the order given
+def group_codes(keys, values, n):
+    keys = np.asarray(keys)
+    order = np.argsort(keys, kind="stable")
+    return np.split(np.asarray(values)[order], np.cumsum(np.bincount(keys, minlength=n))[:-1])
+
+# Values grouped by an integer key, keeping only keys shared by more than one value: {key: list of values},
+# in key order
+def shared_groups(keys, values):
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    values = values[order]
+    starts = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]]))
+    ends = np.append(starts[1:], len(keys))
+    shared = ends - starts > 1
+    return {
+        key: values[start:end].tolist()
+        for key, start, end in zip(keys[starts[shared]].tolist(), starts[shared].tolist(), ends[shared].tolist())
+    }
@@ -0,0 +1,61 @@
+import numpy as np
+
+# Read-only snapshot of a solved assignment, built once after solving.
+# Assigned candidate pairs are stored as integer codes and grouped twice, CSR style:
+# by student (student -> sections) and by section (section -> roster), so every lookup is a slice.
+class ScheduleSolution:
+    __slots__ = (
+        "students", "sections",
+        "pair_students", "pair_sections", "section_sizes",
+        "_student_offsets", "_section_offsets", "_section_order",
+    )
+
+    # x: value of the assignment variable for each of optimizer.pairs, in the same order
+    def __init__(self, optimizer, x):
+        assigned = np.flatnonzero(np.round(np.asarray(x, dtype=float)) == 1)
+        n_students = len(optimizer.students)
+        n_sections = len(optimizer.sections)
+        # Candidate pairs are sorted by (student, section), so the assigned pairs already are too
+        pair_students = optimizer.pair_students[assigned]
+        pair_sections = optimizer.pair_sections[assigned]
+        section_sizes = np.bincount(pair_sections, minlength=n_sections)
+        # Stable sort keeps each roster in student order
+        section_order = np.argsort(pair_sections, kind="stable")
+
+        set_slot = object.__setattr__
+        set_slot(self, "students", optimizer.students)
+        set_slot(self, "sections", optimizer.sections)
+        set_slot(self, "pair_students", pair_students)
+        set_slot(self, "pair_sections", pair_sections)
+        set_slot(self, "section_sizes", section_sizes)
+        set_slot(self, "_student_offsets", np.concatenate([[0], np.cumsum(np.bincount(pair_students, minlength=n_students))]))
+        set_slot(self, "_section_offsets", np.concatenate([[0], np.cumsum(section_sizes)]))
+        set_slot(self, "_section_order", section_order)
+        for name in ("pair_students", "pair_sections", "section_sizes", "_student_offsets", "_section_offsets", "_section_order"):
+            getattr(self, name).flags.writeable = False
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ScheduleSolution is immutable")
+
+    def __len__(self):
+        return len(self.pair_students)
+
+    # Student names assigned to a section code, in student order
+    def roster(self, section):
+        rows = self._section_order[self._section_offsets[section]:self._section_offsets[section + 1]]
+        return [self.students[s] for s in self.pair_students[rows].tolist()]
+
+    # Section codes assigned to a student code, in section order
+    def student_section_codes(self, student):
+        return self.pair_sections[self._student_offsets[student]:self._student_offsets[student + 1]]
+
+    # (course, section) tuples assigned to a student code, in section order
+    def student_sections(self, student):
+        return [self.sections[sec] for sec in self.student_section_codes(student).tolist()]
+
+    # Every assignment as a (student, course, section) tuple, ordered by student then section
+    def assignments(self):
+        return [
+            (self.students[s],) + self.sections[sec]
+            for s, sec in zip(self.pair_students.tolist(), self.pair_sections.tolist())
+        ]
@@ -0,0 +1,53 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# Content hash of an uploaded dataset, updated with the normalized students, schedules and periods
+# DataFrames (or chunks of them) in upload order. Row order is part of the hash since it decides
+# the order the optimizer encodes students and sections.
+class DatasetHash:
+
+    def __init__(self):
+        self._digest = hashlib.sha256()
+
+    def update(self, df):
+        self._digest.update(repr((len(df), list(df.columns), [str(dtype) for dtype in df.dtypes])).encode())
+        self._digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+
+    def hexdigest(self):
+        return self._digest.hexdigest()
+
+# Cache key for the result of solving a dataset with the given solver settings
+def result_key(data_hash, solver_settings):
+    return f"{data_hash}:{json.dumps(solver_settings, sort_keys=True)}"
+
+# Bounded LRU cache of optimization results, shared by every user of the process so identical
+# datasets (e.g. the same demo data uploaded by different accounts) are only solved once.
+# Values are (assigned, unassigned) DataFrames and must not be modified.
+class ResultCache:
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        # Results are added from job callbacks, which run on the optimizer pool's thread
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
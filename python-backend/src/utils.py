@@ -1,3 +1,10 @@
+from functools import lru_cache
+
+import pandas as pd
+
+# Distinct strings remembered by smart_title across uploads (course names, days and recent student names)
+SMART_TITLE_CACHE_SIZE = 100000
+
 def smart_title(s):
     """
     Capitalize each word except 'of' (unless it's the first word).
@@ -5,7 +12,10 @@ def smart_title(s):
     """
     if not isinstance(s, str):
         return s
+    return _smart_title(s)
 
+@lru_cache(maxsize=SMART_TITLE_CACHE_SIZE)
+def _smart_title(s):
     def cap_word(w, i):
         # Keep all-uppercase words (like 'AP')
         if w.isupper():
@@ -13,6 +23,8 @@ def smart_title(s):
         # Don't lowercase 'of' unless it's not the first word
         if i != 0 and w.lower() == 'of':
             return 'of'
+        if '/' not in w and '(' not in w:
+            return w.capitalize()
         # Capitalize after slashes or parentheses
         parts = []
         start = 0
@@ -41,5 +53,13 @@ def normalize_dataframe(df, value_columns=None):
     if value_columns:
         for col in value_columns:
             if col in df.columns:
-                df[col] = df[col].apply(smart_title)
-    return df
\ No newline at end of file
+                df[col] = smart_title_column(df[col])
+    return df
+
+def smart_title_column(series):
+    """
+    smart_title every value of a Series, calling it once per distinct value rather than once per row.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    titled = pd.Index(uniques).map(smart_title)
+    return pd.Series(titled.take(codes), index=series.index, name=series.name)
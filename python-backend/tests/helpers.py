@@ -0,0 +1,11 @@
+import os
+import pandas as pd
+
+# Students, Schedules and Periods DataFrames of a data set in tests/data (BasicData, TwelfthGrade, ...).
+# Shared by the test modules: from helpers import get_data
+def get_data(DataType):
+    data_dir = os.path.join(os.path.dirname(__file__), "data", DataType)
+    students_df = pd.read_csv(os.path.join(data_dir, "Students.csv"))
+    schedules_df = pd.read_csv(os.path.join(data_dir, "Schedules.csv"))
+    periods_df = pd.read_csv(os.path.join(data_dir, "Periods.csv"))
+    return students_df, schedules_df, periods_df
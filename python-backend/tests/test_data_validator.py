@@ -194,3 +194,17 @@ def test_multiple_issues(validator, students_df, schedules_df, periods_df):
     valid, errors = validator.validate(students_broken, schedules_broken, periods_broken)
     assert not valid
     assert any("missing columns" in e for e in errors)
+
+@pytest.mark.parametrize("break_data", [
+    lambda st, sc, pr: (st, sc, pr),
+    # Errors from every table in the same stage, and an invalid day that must not be reported with them
+    lambda st, sc, pr: (st.drop(columns=["Course Name"]), sc.assign(Capacity=None), pr.assign(**{"Day of Week": "Funday"})),
+    lambda st, sc, pr: (st, sc, pr.assign(**{"Day of Week": "Funday"})),
+    lambda st, sc, pr: (pd.concat([st, st.iloc[[0]]]), pd.concat([sc, sc.iloc[[0]]]), pd.concat([pr, pr.iloc[[0]]])),
+    lambda st, sc, pr: (st.assign(**{"Course Name": "Nonexistent Course"}), sc, pr.assign(Section=999)),
+    lambda st, sc, pr: (st, sc.assign(Capacity=0), pr.assign(**{"Period Number": 99})),
+])
+def test_parallel_same_errors(break_data, students_df, schedules_df, periods_df):
+    data = break_data(students_df, schedules_df, periods_df)
+    expected = ScheduleDataValidator().validate(*data)
+    assert ScheduleDataValidator(parallel=True, max_workers=4).validate(*data) == expected
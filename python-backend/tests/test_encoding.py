@@ -0,0 +1,36 @@
+import pandas as pd
+from encoding import decode, encode_tables
+from optimization.heuristic_optimizer import HeuristicScheduleOptimizer
+from helpers import get_data
+
+def test_encode_tables_keeps_values():
+    tables = get_data("TwelfthGrade")
+    encoded = encode_tables(*tables)
+    for df, encoded_df in zip(tables, encoded):
+        assert list(encoded_df.columns) == list(df.columns)
+        for col in df.columns:
+            assert encoded_df[col].tolist() == df[col].tolist()
+    students_df, schedules_df, periods_df = encoded
+    # A course has the same code in every table
+    assert list(students_df["Course Name"].cat.categories) == list(schedules_df["Course Name"].cat.categories)
+    assert list(periods_df["Course Name"].cat.categories) == list(schedules_df["Course Name"].cat.categories)
+    assert schedules_df["Capacity"].dtype == "int32"
+
+def test_decode():
+    assert decode([1, 0, 1], ["a", "b"]).tolist() == ["b", "a", "b"]
+
+def test_same_schedule_for_encoded_tables():
+    tables = get_data("TwelfthGrade")
+    plain = HeuristicScheduleOptimizer()
+    plain.run_solver(*tables)
+    encoded = HeuristicScheduleOptimizer()
+    encoded.run_solver(*encode_tables(*tables))
+    assert encoded.get_assignments() == plain.get_assignments()
+    pd.testing.assert_frame_equal(
+        encoded.get_unassigned_courses().astype(object), plain.get_unassigned_courses().astype(object)
+    )
+    student = plain.students[0]
+    # Period numbers are int32 in encoded tables
+    pd.testing.assert_frame_equal(
+        encoded.get_student_schedule(student), plain.get_student_schedule(student), check_index_type=False
+    )
@@ -0,0 +1,46 @@
+from optimization.heuristic_optimizer import HeuristicScheduleOptimizer
+from optimization.schedule_optimizer import ScheduleOptimizer
+from helpers import get_data
+
+def assert_feasible(optimizer, schedules_df, periods_df):
+    assigned_df = optimizer.get_assigned_courses()
+    # At most one section per requested course
+    assert not assigned_df.duplicated(["Student Name", "Course Name"]).any()
+    # Within capacity
+    sizes = assigned_df.groupby(["Course Name", "Section"]).size().rename("Size").reset_index()
+    sizes = sizes.merge(schedules_df, on=["Course Name", "Section"])
+    assert (sizes["Size"] <= sizes["Capacity"]).all()
+    # No time conflicts
+    meetings = assigned_df.merge(periods_df, on=["Course Name", "Section"])
+    assert not meetings.duplicated(["Student Name", "Day of Week", "Period Number"]).any()
+
+def test_heuristic_basic_data():
+    students_df, schedules_df, periods_df = get_data("BasicData")
+    optimizer = HeuristicScheduleOptimizer()
+    optimizer.run_solver(students_df, schedules_df, periods_df)
+    assert_feasible(optimizer, schedules_df, periods_df)
+
+    # Every request is either assigned or reported as unassigned
+    assigned_df = optimizer.get_assigned_courses()
+    unassigned_df = optimizer.get_unassigned_courses()
+    assert len(assigned_df) + len(unassigned_df) == len(students_df.drop_duplicates())
+    assert len(assigned_df) <= 44
+
+def test_heuristic_close_to_cbc():
+    students_df, schedules_df, periods_df = get_data("TwelfthGrade")
+    heuristic = HeuristicScheduleOptimizer()
+    heuristic.run_solver(students_df, schedules_df, periods_df)
+    assert_feasible(heuristic, schedules_df, periods_df)
+
+    cbc = ScheduleOptimizer()
+    cbc.run_solver(students_df, schedules_df, periods_df)
+    assert heuristic.solution_objective(heuristic.solution) >= 0.9 * cbc.solution_objective(cbc.solution)
+
+def test_heuristic_keeps_previous_assignments():
+    students_df, schedules_df, periods_df = get_data("BasicData")
+    first = HeuristicScheduleOptimizer()
+    first.run_solver(students_df, schedules_df, periods_df)
+
+    second = HeuristicScheduleOptimizer()
+    second.run_solver(students_df, schedules_df, periods_df, previous_assignments=first.get_assigned_courses())
+    assert len(second.get_assigned_courses()) >= len(first.get_assigned_courses())
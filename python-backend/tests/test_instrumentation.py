@@ -0,0 +1,89 @@
+import json
+import logging
+import pandas as pd
+from pyomo.environ import Constraint
+from pyomo.repn import generate_standard_repn
+from instrumentation import Metrics
+from optimization.schedule_optimizer import ScheduleOptimizer
+from helpers import get_data
+
+def test_phases_add_up():
+    metrics = Metrics(job_id="job")
+    for _ in range(3):
+        with metrics.phase("read"):
+            pass
+    metrics.record("rows", Students=10)
+    metrics.record("rows", Periods=4)
+    data = metrics.as_dict()
+    assert list(data["phases"]) == ["read"]
+    assert data["phases"]["read"] >= 0
+    assert data["rows"] == {"Students": 10, "Periods": 4}
+
+def test_disabled_records_nothing(caplog):
+    metrics = Metrics(enabled=False, job_id="job")
+    with metrics.phase("read"):
+        pass
+    metrics.record("rows", Students=10)
+    with caplog.at_level(logging.INFO, logger="schedulemaker.metrics"):
+        metrics.log("upload")
+    assert metrics.as_dict() == {"phases": {}}
+    assert not caplog.records
+
+def test_log_is_one_json_line(caplog):
+    metrics = Metrics(job_id="job")
+    with metrics.phase("solve"):
+        pass
+    with caplog.at_level(logging.INFO, logger="schedulemaker.metrics"):
+        metrics.log("optimize_job")
+    logged = json.loads(caplog.records[0].getMessage())
+    assert logged["event"] == "optimize_job"
+    assert logged["job_id"] == "job"
+    assert "solve" in logged["phases"]
+
+def test_optimizer_records_model_and_solver():
+    for backend in ("pyomo", "scipy"):
+        metrics = Metrics()
+        optimizer = ScheduleOptimizer(backend=backend, heuristic_start=True, metrics=metrics)
+        optimizer.run_solver(*get_data("BasicData"))
+        data = metrics.as_dict()
+        assert {"build_lookups", "heuristic", "initialize_model", "solve_model"} <= set(data["phases"])
+        assert data["data"]["candidate_pairs"] == len(optimizer.pairs)
+        assert data["model"]["variables"] > len(optimizer.pairs)
+        assert data["model"]["nonzeros"] >= data["model"]["constraints"]
+        assert data["solver"]["status"]
+
+def test_model_size_counted_while_building():
+    optimizer = ScheduleOptimizer()
+    optimizer.run_solver(*get_data("TwelfthGrade"))
+    model = optimizer.model
+    assert optimizer.model_size["variables"] == model.nvariables()
+    assert optimizer.model_size["constraints"] == model.nconstraints()
+    # The scipy backend has the same variables
+    matrix = ScheduleOptimizer(backend="scipy")
+    matrix.run_solver(*get_data("TwelfthGrade"))
+    assert matrix.matrix_model.n_vars == optimizer.model_size["variables"]
+
+# Art and Math have one section, Chem three: a single section's size cancels out of its deviation constraints
+def test_model_size_single_section_courses():
+    students_df = pd.DataFrame(
+        [["A", "Math"], ["A", "Art"], ["B", "Math"], ["B", "Chem"], ["C", "Art"]], columns=["Student Name", "Course Name"]
+    )
+    schedules_df = pd.DataFrame(
+        [["Math", 1, 2], ["Art", 1, 5], ["Chem", 1, 3], ["Chem", 2, 3], ["Chem", 3, 3]],
+        columns=["Course Name", "Section", "Capacity"]
+    )
+    periods_df = pd.DataFrame(
+        [["Math", 1, "Monday", 1], ["Art", 1, "Monday", 1], ["Chem", 1, "Monday", 3], ["Chem", 2, "Monday", 1],
+         ["Chem", 3, "Tuesday", 1]],
+        columns=["Course Name", "Section", "Day of Week", "Period Number"]
+    )
+    optimizer = ScheduleOptimizer()
+    optimizer.run_solver(students_df, schedules_df, periods_df)
+    model = optimizer.model
+    nonzeros = sum(
+        len(generate_standard_repn(constraint.body).linear_vars)
+        for constraint in model.component_data_objects(Constraint, active=True)
+    )
+    assert optimizer.model_size == {
+        "variables": model.nvariables(), "constraints": model.nconstraints(), "nonzeros": nonzeros
+    }
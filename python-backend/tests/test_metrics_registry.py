@@ -0,0 +1,78 @@
+import threading
+import pytest
+from metrics_registry import Registry
+
+def test_counter():
+    registry = Registry()
+    solves = registry.counter("solves_total", "Solves by outcome", ("outcome",))
+    solves.inc(outcome="optimal")
+    solves.inc(2, outcome="optimal")
+    solves.inc(outcome="time_limit")
+    assert solves.totals() == {("optimal",): 3, ("time_limit",): 1}
+    assert registry.render() == (
+        "# HELP solves_total Solves by outcome\n"
+        "# TYPE solves_total counter\n"
+        'solves_total{outcome="optimal"} 3\n'
+        'solves_total{outcome="time_limit"} 1\n'
+    )
+    with pytest.raises(ValueError):
+        solves.inc(-1, outcome="optimal")
+
+def test_labels_must_match():
+    registry = Registry()
+    solves = registry.counter("solves_total", "Solves by outcome", ("outcome",))
+    with pytest.raises(ValueError):
+        solves.inc()
+    with pytest.raises(ValueError):
+        solves.inc(outcome="optimal", route="/optimize")
+    with pytest.raises(ValueError):
+        registry.counter("solves_total", "Registered twice")
+
+def test_gauge():
+    registry = Registry()
+    running = registry.gauge("running", "Jobs running")
+    running.inc()
+    running.inc()
+    running.dec()
+    registry.gauge("queued", "Jobs queued", function=lambda: 4)
+    lines = registry.render().splitlines()
+    assert "running 1" in lines
+    assert "queued 4" in lines
+
+def test_histogram():
+    registry = Registry()
+    seconds = registry.histogram("request_seconds", "Request time", ("route",), buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        seconds.observe(value, route='/class_roster')
+    lines = registry.render().splitlines()
+    assert lines[2:] == [
+        'request_seconds_bucket{route="/class_roster",le="0.1"} 2',
+        'request_seconds_bucket{route="/class_roster",le="1"} 3',
+        'request_seconds_bucket{route="/class_roster",le="+Inf"} 4',
+        'request_seconds_sum{route="/class_roster"} 3.65',
+        'request_seconds_count{route="/class_roster"} 4',
+    ]
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    errors = registry.counter("errors_total", "Errors", ("message",))
+    errors.inc(message='bad "value"\n')
+    assert 'errors_total{message="bad \\"value\\"\\n"} 1' in registry.render().splitlines()
+
+def test_concurrent_updates():
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests", ("route",))
+    seconds = registry.histogram("request_seconds", "Request time", ("route",))
+
+    def handle_requests():
+        for _ in range(10000):
+            requests.inc(route="/upload")
+            seconds.observe(0.01, route="/upload")
+
+    threads = [threading.Thread(target=handle_requests) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert requests.totals() == {("/upload",): 80000}
+    assert 'request_seconds_count{route="/upload"} 80000' in registry.render().splitlines()
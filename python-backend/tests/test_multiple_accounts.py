@@ -1,12 +1,13 @@
 import pytest
 from flask import Flask
-from app import app as flask_app, generate_access_token
+from app import app as flask_app, generate_access_token, result_cache
 from models import db, Users
 import json
 import os
 import base64
 from datetime import datetime, timezone, timedelta
 import jwt
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -66,6 +67,19 @@ def auth_headers_twelfth(client):
         token, _ = generate_access_token(user.id)
         return {'Authorization': f'Bearer {token}'}
 
+def wait_for_optimization(client, headers, optimize_response, timeout=120):
+    assert optimize_response.status_code == 202
+    job_id = optimize_response.get_json()['job_id']
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        response = client.get(f'/optimize/{job_id}', headers=headers)
+        assert response.status_code == 200
+        json_data = response.get_json()
+        if json_data['status'] in ('Complete', 'Failed'):
+            return json_data
+        time.sleep(0.5)
+    raise AssertionError(f"Optimization job {job_id} did not finish within {timeout} seconds")
+
 def test_multiple_accounts_alternating_calls(client, auth_headers_basic, auth_headers_twelfth):
     # Paths for both datasets
     basic_dir = os.path.join(os.path.dirname(__file__), "data", "BasicData")
@@ -109,19 +123,19 @@ def test_multiple_accounts_alternating_calls(client, auth_headers_basic, auth_he
         json_data = upload_response_twelfth.get_json()
         assert json_data['status'] == 'Success'
 
-    # Optimize BasicData
+    # Optimize BasicData and TwelfthGradeData concurrently
     optimize_response_basic = client.post(
         '/optimize',
         headers=auth_headers_basic
     )
-    assert optimize_response_basic.status_code == 200
-
-    # Optimize TwelfthGradeData
     optimize_response_twelfth = client.post(
         '/optimize',
         headers=auth_headers_twelfth
     )
-    assert optimize_response_twelfth.status_code == 200
+    job_basic = wait_for_optimization(client, auth_headers_basic, optimize_response_basic)
+    assert job_basic['status'] == 'Complete'
+    job_twelfth = wait_for_optimization(client, auth_headers_twelfth, optimize_response_twelfth)
+    assert job_twelfth['status'] == 'Complete'
 
     # Get unassigned courses for BasicData
     response_basic = client.get(
@@ -153,3 +167,54 @@ def test_multiple_accounts_alternating_calls(client, auth_headers_basic, auth_he
     assert 'D' not in student_names_twelfth
     reasons_twelfth = {course['Reason'] for course in json_twelfth}
     assert 'Time Conflict' in reasons_twelfth
+
+def test_identical_uploads_share_cached_result(client, auth_headers_basic, auth_headers_twelfth):
+    basic_dir = os.path.join(os.path.dirname(__file__), "data", "BasicData")
+
+    # Both accounts upload the same BasicData
+    for headers in (auth_headers_basic, auth_headers_twelfth):
+        with open(os.path.join(basic_dir, 'Students.csv'), 'rb') as students_file, \
+             open(os.path.join(basic_dir, 'Schedules.csv'), 'rb') as schedules_file, \
+             open(os.path.join(basic_dir, 'Periods.csv'), 'rb') as periods_file:
+            data = {
+                'students': (students_file, 'Students.csv'),
+                'schedules': (schedules_file, 'Schedules.csv'),
+                'periods': (periods_file, 'Periods.csv')
+            }
+            upload_response = client.post(
+                '/upload',
+                data=data,
+                content_type='multipart/form-data',
+                headers=headers
+            )
+            assert upload_response.status_code == 200
+
+    # Solve a time limit no other test uses, so the first run isn't already cached
+    settings = {'time_limit': 7}
+    optimize_response = client.post(
+        '/optimize',
+        json=settings,
+        headers=auth_headers_basic
+    )
+    job = wait_for_optimization(client, auth_headers_basic, optimize_response)
+    assert job['status'] == 'Complete'
+    assert job['progress'] == 'Done'
+
+    # The result is cached once the worker has returned it to the web process
+    deadline = time.time() + 10
+    while len(result_cache) == 0 and time.time() < deadline:
+        time.sleep(0.1)
+
+    optimize_response = client.post(
+        '/optimize',
+        json=settings,
+        headers=auth_headers_twelfth
+    )
+    job_cached = wait_for_optimization(client, auth_headers_twelfth, optimize_response)
+    assert job_cached['status'] == 'Complete'
+    assert job_cached['progress'] == 'Done (cached result)'
+    assert job_cached['result'] == job['result']
+
+    response_basic = client.get('/assigned_courses', headers=auth_headers_basic)
+    response_twelfth = client.get('/assigned_courses', headers=auth_headers_twelfth)
+    assert response_basic.get_json() == response_twelfth.get_json()
@@ -1,12 +1,20 @@
 import pytest
 from flask import Flask
+import app as app_module
 from app import app as flask_app, generate_access_token
-from models import db, Users
+from models import db, Users, Students, OptimizationJobs, AssignedCourses, UnassignedCourses
+from result_cache import result_key
+from utils import normalize_dataframe
+import pandas as pd
 import json
 import os
+import threading
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
 import base64
 from datetime import datetime, timezone, timedelta
 import jwt
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -45,6 +53,19 @@ def auth_headers(client):
         token, _ = generate_access_token(user.id)
         return {'Authorization': f'Bearer {token}'}
 
+def wait_for_optimization(client, headers, optimize_response, timeout=120):
+    assert optimize_response.status_code == 202
+    job_id = optimize_response.get_json()['job_id']
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        response = client.get(f'/optimize/{job_id}', headers=headers)
+        assert response.status_code == 200
+        json_data = response.get_json()
+        if json_data['status'] in ('Complete', 'Failed'):
+            return json_data
+        time.sleep(0.5)
+    raise AssertionError(f"Optimization job {job_id} did not finish within {timeout} seconds")
+
 def test_straight_path(client, auth_headers):
     base_dir = os.path.join(os.path.dirname(__file__), "data", "BasicData")
     with open(os.path.join(base_dir, 'Students.csv'), 'rb') as students_file, \
@@ -70,7 +91,17 @@ def test_straight_path(client, auth_headers):
         '/optimize',
         headers=auth_headers
     )
-    assert optimize_response.status_code == 200
+    job = wait_for_optimization(client, auth_headers, optimize_response)
+    assert job['status'] == 'Complete'
+
+    # Per-job metrics: phase timings, model size and solver stats
+    response = client.get(f"/optimize/{job['job_id']}/metrics", headers=auth_headers)
+    assert response.status_code == 200
+    metrics = response.get_json()['metrics']
+    if metrics is not None:
+        assert {'load_data', 'solve', 'store_results'} <= set(metrics['phases'])
+        assert metrics['model']['variables'] > 0
+        assert metrics['solver']['status']
 
     response = client.get(
         '/unassigned_courses',
@@ -87,6 +118,43 @@ def test_straight_path(client, auth_headers):
     reasons = {course['Reason'] for course in json_data}
     assert reasons == {'Time Conflict'}
 
+    # Re-optimizing incrementally starts from the stored assignments and is at least as good
+    optimize_response = client.post(
+        '/optimize',
+        json={'incremental': True},
+        headers=auth_headers
+    )
+    job = wait_for_optimization(client, auth_headers, optimize_response)
+    assert job['status'] == 'Complete'
+    assert job['result']['unassigned_courses'] == 4
+
+    # Solver settings are validated before a job is queued
+    response = client.post(
+        '/optimize',
+        json={'solver': 'gurobi'},
+        headers=auth_headers
+    )
+    assert response.status_code == 400
+    assert response.get_json()['status'] == 'Error'
+    # A time limit that isn't finite would bypass the server's cap
+    for time_limit in ('nan', float('nan'), 'inf', float('inf')):
+        response = client.post(
+            '/optimize',
+            json={'time_limit': time_limit},
+            headers=auth_headers
+        )
+        assert response.status_code == 400
+        assert response.get_json()['status'] == 'Error'
+
+    optimize_response = client.post(
+        '/optimize',
+        json={'solver': 'cbc', 'fallback': 'highs', 'time_limit': 5, 'threads': 2, 'mip_gap': 0.01},
+        headers=auth_headers
+    )
+    job = wait_for_optimization(client, auth_headers, optimize_response)
+    assert job['status'] == 'Complete'
+    assert job['result']['unassigned_courses'] == 4
+
 def test_mixed_case(client, auth_headers):
     base_dir = os.path.join(os.path.dirname(__file__), "data", "MixedCaseData")
     with open(os.path.join(base_dir, 'Students.csv'), 'rb') as students_file, \
@@ -112,9 +180,8 @@ def test_mixed_case(client, auth_headers):
         '/optimize',
         headers=auth_headers
     )
-    assert response.status_code == 200
-    json_data = response.get_json()
-    assert json_data['status'] == 'Success'
+    json_data = wait_for_optimization(client, auth_headers, response)
+    assert json_data['status'] == 'Complete'
     assert json_data['message'] == 'Optimization complete, assignments stored'
 
     response = client.get(
@@ -160,4 +227,233 @@ def test_bad_data(client, auth_headers):
     json_data = response.get_json()
     assert json_data['status'] == 'Error'
     assert isinstance(json_data['errors'], list)
-    assert len(json_data['errors']) == 8
\ No newline at end of file
+    assert len(json_data['errors']) == 8
+
+def test_unknown_optimization_job(client, auth_headers):
+    response = client.get(
+        '/optimize/00000000-0000-0000-0000-000000000000',
+        headers=auth_headers
+    )
+    assert response.status_code == 404
+    response = client.get(
+        '/optimize/00000000-0000-0000-0000-000000000000/metrics',
+        headers=auth_headers
+    )
+    assert response.status_code == 404
+
+def test_metrics_endpoint(client, auth_headers):
+    client.get('/optimize/00000000-0000-0000-0000-000000000000', headers=auth_headers)
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain')
+    lines = response.get_data(as_text=True).splitlines()
+    # Requests are labelled by route pattern, not path
+    assert any(
+        line.startswith('http_request_duration_seconds_count{method="GET",route="/optimize/<job_id>",status="404"}')
+        for line in lines
+    )
+    assert '# TYPE optimizer_solves_total counter' in lines
+    assert '# TYPE optimizer_jobs_in_flight gauge' in lines
+
+def upload_files(client, headers, data_type):
+    base_dir = os.path.join(os.path.dirname(__file__), "data", data_type)
+    with open(os.path.join(base_dir, 'Students.csv'), 'rb') as students_file, \
+         open(os.path.join(base_dir, 'Schedules.csv'), 'rb') as schedules_file, \
+         open(os.path.join(base_dir, 'Periods.csv'), 'rb') as periods_file:
+        data = {
+            'students': (students_file, 'Students.csv'),
+            'schedules': (schedules_file, 'Schedules.csv'),
+            'periods': (periods_file, 'Periods.csv')
+        }
+        response = client.post('/upload', data=data, content_type='multipart/form-data', headers=headers)
+    assert response.status_code == 200
+
+# A re-upload while a job is loading data must not get the job's results cached under the old data's hash
+def test_upload_during_optimization_job(client, auth_headers, monkeypatch):
+    upload_files(client, auth_headers, "BasicData")
+    with flask_app.app_context():
+        user = Users.query.filter_by(email='test-user-rest@test.com').first()
+        user_id, data_hash = user.id, user.data_hash
+        job_id = '00000000-0000-0000-0000-000000000001'
+        db.session.add(OptimizationJobs(id=job_id, user_id=user_id, status='Queued'))
+        db.session.commit()
+
+    # Upload other data after the job has read the hash, before it reads the tables
+    load = app_module.get_user_uploaded_data
+    def upload_then_load(*args):
+        # From another thread, as another request would
+        upload = threading.Thread(target=upload_files, args=(flask_app.test_client(), auth_headers, "TwelfthGrade"))
+        upload.start()
+        upload.join()
+        return load(*args)
+    monkeypatch.setattr(app_module, 'get_user_uploaded_data', upload_then_load)
+
+    settings = app_module.parse_solver_settings({})
+    cache_key, assigned, unassigned, outcome, _ = app_module.run_optimization_job(job_id, user_id, solver_settings=settings)
+    assert cache_key == result_key(data_hash, settings)
+    # The results aren't stored over the new data
+    assert outcome == 'stale'
+    # The job solved the data the hash belongs to
+    requests = normalize_dataframe(
+        pd.read_csv(os.path.join(os.path.dirname(__file__), "data", "BasicData", "Students.csv")),
+        value_columns=['Student Name', 'Course Name']
+    )
+    unassigned = unassigned.rename(columns={'Unassigned Course Name': 'Course Name'})
+    solved = pd.concat([assigned[['Student Name', 'Course Name']], unassigned[['Student Name', 'Course Name']]])
+    assert sorted(map(tuple, solved.astype(str).values)) == sorted(map(tuple, requests.astype(str).values))
+
+# Stands in for the optimizer pool: runs the submitted jobs in this process when run() is called
+class DeferredPool:
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.jobs.append((future, fn, args))
+        return future
+
+    def run(self):
+        for future, fn, args in self.jobs:
+            future.set_result(fn(*args))
+
+# A job whose data was uploaded again before it finished doesn't store its results over the new data
+def test_upload_before_optimization_job_finishes(client, auth_headers, monkeypatch):
+    upload_files(client, auth_headers, "BasicData")
+    pool = DeferredPool()
+    monkeypatch.setattr(app_module, 'get_optimizer_pool', lambda: pool)
+    # Incremental runs skip the result cache
+    optimize_response = client.post('/optimize', json={'incremental': True}, headers=auth_headers)
+    assert optimize_response.status_code == 202
+
+    # Upload other data once the job has read the data it solves
+    load = app_module.get_user_uploaded_data
+    def load_then_upload(*args):
+        tables = load(*args)
+        # From another thread, as another request would
+        upload = threading.Thread(target=upload_files, args=(flask_app.test_client(), auth_headers, "TwelfthGrade"))
+        upload.start()
+        upload.join()
+        return tables
+    monkeypatch.setattr(app_module, 'get_user_uploaded_data', load_then_upload)
+    pool.run()
+
+    job = wait_for_optimization(client, auth_headers, optimize_response)
+    assert job['status'] == 'Failed'
+    assert 'uploaded again' in job['message']
+    response = client.get('/assigned_courses', headers=auth_headers)
+    assert response.status_code == 400
+
+# A cached result isn't stored if the data was uploaded again after the request looked it up;
+# the new data is solved instead
+def test_upload_during_cached_optimization(client, auth_headers, monkeypatch):
+    upload_files(client, auth_headers, "BasicData")
+    with flask_app.app_context():
+        data_hash = Users.query.filter_by(email='test-user-rest@test.com').first().data_hash
+    settings = app_module.parse_solver_settings({})
+    assigned = pd.DataFrame({'Student Name': ['S0'], 'Course Name': ['Math'], 'Section': [1]})
+    unassigned = pd.DataFrame({'Student Name': ['S0'], 'Unassigned Course Name': ['Art'], 'Reason': ['Capacity']})
+    app_module.result_cache.put(result_key(data_hash, settings), (assigned, unassigned))
+
+    get = app_module.result_cache.get
+    def upload_then_get(key):
+        # From another thread, as another request would
+        upload = threading.Thread(target=upload_files, args=(flask_app.test_client(), auth_headers, "TwelfthGrade"))
+        upload.start()
+        upload.join()
+        return get(key)
+    monkeypatch.setattr(app_module.result_cache, 'get', upload_then_get)
+    pool = DeferredPool()
+    monkeypatch.setattr(app_module, 'get_optimizer_pool', lambda: pool)
+
+    response = client.post('/optimize', headers=auth_headers)
+    assert response.status_code == 202
+    assert response.get_json()['message'] == "Optimization queued"
+    response = client.get('/assigned_courses', headers=auth_headers)
+    assert response.status_code == 400
+
+# A student's schedule lists each assigned course once, however many courses they requested
+def test_student_schedule(client, auth_headers):
+    upload_files(client, auth_headers, "BasicData")
+    requests = normalize_dataframe(
+        pd.read_csv(os.path.join(os.path.dirname(__file__), "data", "BasicData", "Students.csv")),
+        value_columns=['Student Name', 'Course Name']
+    )
+    student, other_student = requests['Student Name'].unique()[:2]
+    courses = sorted(requests.loc[requests['Student Name'] == student, 'Course Name'])
+    assert len(courses) > 1
+    assigned = pd.DataFrame({'Student Name': student, 'Course Name': courses, 'Section': 1})
+    unassigned = pd.DataFrame({'Student Name': [other_student], 'Unassigned Course Name': ['Art'], 'Reason': ['Capacity']})
+    with flask_app.app_context():
+        user = Users.query.filter_by(email='test-user-rest@test.com').first()
+        assert app_module.store_optimization_results(user.id, assigned, unassigned, user.data_hash)
+
+    response = client.get('/student_schedule', query_string={'student': student.upper()}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.get_json() == [{"Course Name": course, "Section": 1} for course in courses]
+    # A known student without assignments has an empty schedule, an unknown one is not found
+    response = client.get('/student_schedule', query_string={'student': other_student}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.get_json() == []
+    response = client.get('/student_schedule', query_string={'student': 'Nobody'}, headers=auth_headers)
+    assert response.status_code == 404
+
+# Overlapping jobs of one user replace the stored results one after the other, never adding up
+def test_concurrent_result_stores(client, auth_headers):
+    with flask_app.app_context():
+        user = Users.query.filter_by(email='test-user-rest@test.com').first()
+        user_id, data_hash = user.id, user.data_hash
+    assigned = pd.DataFrame({'Student Name': [f'S{i}' for i in range(2000)], 'Course Name': 'Math', 'Section': 1})
+    unassigned = pd.DataFrame({'Student Name': ['S0'], 'Unassigned Course Name': ['Art'], 'Reason': ['Capacity']})
+    barrier = threading.Barrier(4)
+
+    def store():
+        with flask_app.app_context():
+            barrier.wait()
+            app_module.store_optimization_results(user_id, assigned, unassigned, data_hash)
+
+    threads = [threading.Thread(target=store) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with flask_app.app_context():
+        assert AssignedCourses.query.filter_by(user_id=user_id).count() == 2000
+        assert UnassignedCourses.query.filter_by(user_id=user_id).count() == 1
+
+# Overlapping uploads of one user replace the data one after the other
+def test_concurrent_uploads(client, auth_headers):
+    threads = [
+        threading.Thread(target=upload_files, args=(flask_app.test_client(), auth_headers, "BasicData"))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    requests = pd.read_csv(os.path.join(os.path.dirname(__file__), "data", "BasicData", "Students.csv"))
+    with flask_app.app_context():
+        user_id = Users.query.filter_by(email='test-user-rest@test.com').first().id
+        assert Students.query.filter_by(user_id=user_id).count() == len(requests)
+
+# A job that couldn't be submitted fails instead of staying queued, isn't counted as in flight,
+# and the broken pool is replaced for the next job
+def test_failed_submit(client, auth_headers, monkeypatch):
+    upload_files(client, auth_headers, "BasicData")
+
+    class BrokenPool:
+        def submit(self, *args):
+            raise BrokenProcessPool("A child process terminated abruptly")
+
+        def shutdown(self, wait=True):
+            pass
+
+    monkeypatch.setattr(app_module, 'optimizer_pool', BrokenPool())
+    in_flight = app_module.jobs_in_flight.totals().get((), 0)
+    # Incremental runs skip the result cache
+    response = client.post('/optimize', json={'incremental': True}, headers=auth_headers)
+    assert response.status_code == 503
+    job = client.get(f"/optimize/{response.get_json()['job_id']}", headers=auth_headers).get_json()
+    assert job['status'] == 'Failed'
+    assert 'terminated abruptly' in job['message']
+    assert app_module.jobs_in_flight.totals().get((), 0) == in_flight
+    assert app_module.optimizer_pool is None
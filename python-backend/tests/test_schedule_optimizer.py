@@ -1,20 +1,10 @@
-import os
 import pandas as pd
-from optimization.schedule_optimizer import ScheduleOptimizer
-
-def get_data(DataType):
-    # Path to your test data
-    data_dir = os.path.join(os.path.dirname(__file__), "data", DataType)
-    students_csv = os.path.join(data_dir, "Students.csv")
-    schedules_csv = os.path.join(data_dir, "Schedules.csv")
-    periods_csv = os.path.join(data_dir, "Periods.csv")
-
-    # Load data
-    students_df = pd.read_csv(students_csv)
-    schedules_df = pd.read_csv(schedules_csv)
-    periods_df = pd.read_csv(periods_csv)
-
-    return students_df, schedules_df, periods_df
+import pytest
+from instrumentation import Metrics
+from pyomo.opt import TerminationCondition
+from optimization.heuristic_search import HeuristicSearch
+from optimization.schedule_optimizer import ScheduleOptimizer, solve_outcome
+from helpers import get_data
 
 def generate_basic_data_model():
     students_df, schedules_df, periods_df = get_data("BasicData")
@@ -142,4 +132,165 @@ def test_all_courses_accounted_for_basic():
     assert_all_courses_accounted_for("BasicData")
 
 def test_all_courses_accounted_for_twelfth():
-    assert_all_courses_accounted_for("TwelfthGrade")
\ No newline at end of file
+    assert_all_courses_accounted_for("TwelfthGrade")
+
+def test_scipy_backend_basic_data():
+    students_df, schedules_df, periods_df = get_data("BasicData")
+    optimizer = ScheduleOptimizer(backend="scipy")
+    optimizer.run_solver(students_df, schedules_df, periods_df)
+
+    assert len(optimizer.get_assigned_courses()) == 44
+    unassigned_df = optimizer.get_unassigned_courses()
+    assert len(unassigned_df) == 4
+    assert set(['G', 'H', 'I', 'J']).issubset(set(unassigned_df['Student Name'].values))
+
+def test_scipy_backend_twelfth_grade():
+    students_df, schedules_df, periods_df = get_data("TwelfthGrade")
+    optimizer = ScheduleOptimizer(backend="scipy")
+    optimizer.run_solver(students_df, schedules_df, periods_df)
+
+    unassigned_df = optimizer.get_unassigned_courses()
+    assert len(unassigned_df) == 6
+    assert "Jonathan Wenger" in unassigned_df['Student Name'].values
+
+def test_scipy_backend_no_solution_in_time_limit():
+    students_df, schedules_df, periods_df = get_data("TwelfthGrade")
+    # HiGHS stops before finding a solution: the heuristic start is kept
+    optimizer = ScheduleOptimizer(backend="scipy", time_limit=1e-9, heuristic_start=True)
+    optimizer.run_solver(students_df, schedules_df, periods_df)
+
+    assert optimizer.matrix_result.x is None
+    assert optimizer.outcome == "time_limit"
+    assert len(optimizer.get_assigned_courses()) > 0
+    assert optimizer.is_feasible(optimizer._pair_vector(optimizer.get_assignments()))
+
+    # Without a start there is nothing to fall back to
+    with pytest.raises(RuntimeError):
+        ScheduleOptimizer(backend="scipy", time_limit=1e-9).run_solver(
+            students_df, schedules_df, periods_df
+        )
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        ScheduleOptimizer(backend="gurobi")
+
+def test_solution_snapshot():
+    optimizer = generate_basic_data_model()
+    assert len(optimizer.solution) == 44
+    with pytest.raises(AttributeError):
+        optimizer.solution.section_sizes = None
+
+    # Replacing the assignments rebuilds the snapshot the getters read from
+    assignments = optimizer.get_assignments()
+    optimizer.set_assignments(assignments[:10])
+    assert len(optimizer.get_assigned_courses()) == 10
+    assert sum(len(roster) for roster in optimizer.get_all_class_rosters().values()) == 10
+
+def test_incremental_warm_start():
+    students_df, schedules_df, periods_df = get_data("BasicData")
+    previous = generate_basic_data_model().get_assigned_courses()
+
+    # A previous assignment to a section that no longer exists is dropped from the warm start
+    stale = pd.DataFrame([["A", "Low History", 99]], columns=["Student Name", "Course Name", "Section"])
+    optimizer = ScheduleOptimizer()
+    optimizer.run_solver(students_df, schedules_df, periods_df, previous_assignments=pd.concat([stale, previous]))
+
+    assert len(optimizer.get_assigned_courses()) == 44
+    assert len(optimizer.get_unassigned_courses()) == 4
+
+def test_decomposed_solve():
+    students_df, schedules_df, periods_df = get_data("TwelfthGrade")
+    optimizer = ScheduleOptimizer(decompose=True, max_workers=2)
+    optimizer.run_solver(students_df, schedules_df, periods_df)
+
+    student_labels, _ = optimizer.find_components()
+    assert student_labels.max() >= 0
+    unassigned_df = optimizer.get_unassigned_courses()
+    assert len(unassigned_df) == 6
+    assert "Jonathan Wenger" in unassigned_df['Student Name'].values
+
+# Two groups of students that share no courses, e.g. two campuses. In each, student A has to take
+# the second Math section (the first clashes with Art), leaving the first to student B.
+def two_campus_data():
+    students, schedules, periods = [], [], []
+    for campus in ("North", "South"):
+        students += [[f"{campus} A", f"{campus} Math"], [f"{campus} A", f"{campus} Art"], [f"{campus} B", f"{campus} Math"]]
+        schedules += [[f"{campus} Math", 1, 1], [f"{campus} Math", 2, 1], [f"{campus} Art", 1, 5]]
+        periods += [[f"{campus} Math", 1, "Monday", 1], [f"{campus} Math", 2, "Monday", 2], [f"{campus} Art", 1, "Monday", 1]]
+    return (
+        pd.DataFrame(students, columns=["Student Name", "Course Name"]),
+        pd.DataFrame(schedules, columns=["Course Name", "Section", "Capacity"]),
+        pd.DataFrame(periods, columns=["Course Name", "Section", "Day of Week", "Period Number"]),
+    )
+
+def test_decomposed_solve_matches_monolithic():
+    students_df, schedules_df, periods_df = two_campus_data()
+    monolithic = ScheduleOptimizer()
+    monolithic.run_solver(students_df, schedules_df, periods_df)
+    student_labels, course_labels = monolithic.find_components()
+    assert len(set(student_labels.tolist())) == 2
+    assert len(set(course_labels.tolist())) == 2
+
+    # Each campus is solved in its own worker process
+    metrics = Metrics()
+    decomposed = ScheduleOptimizer(decompose=True, max_workers=2, metrics=metrics)
+    decomposed.run_solver(students_df, schedules_df, periods_df)
+    assert metrics.values["data"]["components"] == 2
+    assert decomposed.outcome == "optimal"
+
+    assert sorted(decomposed.get_assignments()) == sorted(monolithic.get_assignments())
+    assert ("South A", "South Math", 2) in decomposed.get_assignments()
+    assert decomposed.solution_objective(decomposed.solution) == pytest.approx(
+        monolithic.solution_objective(monolithic.solution)
+    )
+
+def test_heuristic_start():
+    students_df, schedules_df, periods_df = get_data("BasicData")
+    cold = ScheduleOptimizer()
+    cold.run_solver(students_df, schedules_df, periods_df)
+    started = ScheduleOptimizer(heuristic_start=True)
+    started.run_solver(students_df, schedules_df, periods_df)
+
+    assert len(started.get_assigned_courses()) == len(cold.get_assigned_courses())
+    assert started.solution_objective(started.solution) >= cold.solution_objective(cold.solution) - 1e-6
+    x = started.model.x.extract_values()
+    assert started.is_feasible([x[pair] for pair in started.pairs])
+
+# A heuristic start out of time keeps its greedy schedule, and its time comes off the solver's limit
+def test_heuristic_start_time_limit():
+    students_df, schedules_df, periods_df = get_data("TwelfthGrade")
+    optimizer = ScheduleOptimizer(time_limit=10)
+    optimizer.students_df = students_df
+    optimizer.build_lookups(periods_df, schedules_df)
+    start = HeuristicSearch(time_limit=0).solve(optimizer)
+    assert len(start) > 0
+    assert optimizer.is_feasible(optimizer._pair_vector(start))
+    assert optimizer.remaining_time(4) == 6
+    assert optimizer.remaining_time(20) == .1
+    assert ScheduleOptimizer(time_limit=None).remaining_time(4) is None
+
+def test_unknown_solver():
+    with pytest.raises(ValueError):
+        ScheduleOptimizer(solver="gurobi")
+
+def test_solver_settings():
+    students_df, schedules_df, periods_df = get_data("BasicData")
+    optimizer = ScheduleOptimizer(solver="cbc", fallback="highs", time_limit=5, threads=2, mip_gap=0.01)
+    optimizer.run_solver(students_df, schedules_df, periods_df)
+
+    assert len(optimizer.get_unassigned_courses()) == 4
+
+def test_solve_outcome_time_limit():
+    # CBC stops on its time limit long before it could prove optimality (keeping the heuristic start)
+    students_df, schedules_df, periods_df = get_data("TwelfthGrade")
+    optimizer = ScheduleOptimizer(solver="cbc", time_limit=0.001, heuristic_start=True)
+    optimizer.run_solver(students_df, schedules_df, periods_df)
+    assert optimizer.outcome == "time_limit"
+
+    assert solve_outcome(TerminationCondition.optimal) == "optimal"
+    assert solve_outcome(TerminationCondition.maxTimeLimit) == "time_limit"
+    # How Pyomo's CBC plugin reports a time limit stop, with and without an integer solution
+    assert solve_outcome(TerminationCondition.maxIterations, 10) == "time_limit"
+    assert solve_outcome(TerminationCondition.intermediateNonInteger, 10) == "time_limit"
+    assert solve_outcome(TerminationCondition.intermediateNonInteger) == "other"
+    assert solve_outcome(TerminationCondition.infeasible) == "infeasible"
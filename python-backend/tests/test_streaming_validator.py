@@ -0,0 +1,74 @@
+import io
+import pandas as pd
+import pytest
+from data_validation.schedule_data_validator import ScheduleDataValidator
+from data_validation.streaming_validator import StreamingScheduleDataValidator
+from helpers import get_data
+
+# Validate the CSVs for the DataFrames chunk by chunk, as /upload does
+def validate_in_chunks(students_df, schedules_df, periods_df, chunk_rows, parallel=False):
+    validator = StreamingScheduleDataValidator(parallel=parallel, max_workers=4)
+    for name, df in (("Students", students_df), ("Schedules", schedules_df), ("Periods", periods_df)):
+        for chunk in pd.read_csv(io.StringIO(df.to_csv(index=False)), chunksize=chunk_rows):
+            validator.add_chunk(name, chunk)
+    return validator.finish()
+
+def break_students(students_df, schedules_df, periods_df):
+    students_df = students_df.copy()
+    students_df.loc[0, "Course Name"] = "Nonexistent Course"
+    return students_df, schedules_df, periods_df
+
+def break_schedules(students_df, schedules_df, periods_df):
+    schedules_df = schedules_df.copy()
+    schedules_df.loc[0, "Capacity"] = -1
+    return students_df, schedules_df, periods_df
+
+def break_periods(students_df, schedules_df, periods_df):
+    periods_df = periods_df.copy()
+    periods_df.loc[0, "Day of Week"] = "Funday"
+    periods_df.loc[1, "Section"] = None
+    return students_df, schedules_df, periods_df
+
+def duplicate_rows(students_df, schedules_df, periods_df):
+    dup = students_df.iloc[[0]].copy()
+    dup["Student Name"] = dup["Student Name"].str.swapcase()
+    students_df = pd.concat([students_df, dup, students_df.iloc[[1]]], ignore_index=True)
+    periods_df = pd.concat([periods_df, periods_df.iloc[[0]]], ignore_index=True)
+    return students_df, schedules_df, periods_df
+
+def missing_column(students_df, schedules_df, periods_df):
+    return students_df, schedules_df.drop(columns=["Capacity"]), periods_df
+
+MUTATIONS = [lambda *data: data, break_students, break_schedules, break_periods, duplicate_rows, missing_column]
+
+@pytest.mark.parametrize("DataType", ["BasicData", "TwelfthGrade"])
+@pytest.mark.parametrize("mutate", MUTATIONS)
+@pytest.mark.parametrize("chunk_rows", [1, 7, 100000])
+def test_same_errors_as_whole_file_validation(DataType, mutate, chunk_rows):
+    students_df, schedules_df, periods_df = mutate(*get_data(DataType))
+    expected = ScheduleDataValidator().validate(
+        *(pd.read_csv(io.StringIO(df.to_csv(index=False))) for df in (students_df, schedules_df, periods_df))
+    )
+    valid, errors = validate_in_chunks(students_df, schedules_df, periods_df, chunk_rows)
+    assert (valid, errors) == expected
+
+@pytest.mark.parametrize("mutate", MUTATIONS)
+def test_parallel_same_errors(mutate):
+    data = mutate(*get_data("TwelfthGrade"))
+    assert validate_in_chunks(*data, 7, parallel=True) == validate_in_chunks(*data, 7)
+
+def test_empty_file():
+    students_df, schedules_df, periods_df = get_data("BasicData")
+    valid, errors = validate_in_chunks(students_df.iloc[0:0], schedules_df, periods_df, 7)
+    assert not valid
+    assert errors == ["Students data is empty."]
+
+def test_has_errors_while_streaming():
+    students_df, schedules_df, periods_df = get_data("BasicData")
+    validator = StreamingScheduleDataValidator()
+    validator.add_chunk("Students", students_df)
+    assert not validator.has_errors()
+    schedules_df = schedules_df.copy()
+    schedules_df.loc[0, "Course Name"] = None
+    validator.add_chunk("Schedules", schedules_df)
+    assert validator.has_errors()
@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+from utils import normalize_dataframe, smart_title
+
+def test_smart_title():
+    assert smart_title("  history of  art ") == "History of Art"
+    assert smart_title("of mice and men") == "Of Mice And Men"
+    assert smart_title("AP biology (honors)/lab") == "AP Biology (Honors)/Lab"
+    assert smart_title(3) == 3
+
+def test_normalize_dataframe_same_as_per_value():
+    df = pd.DataFrame({
+        "student name": ["ann lee", "ANN LEE", None, "ann lee", "bo of x"],
+        "course name": ["math", "math", "AP bio", np.nan, "math"],
+        "section": [1, 2, 3, 4, 5],
+    }, index=[4, 3, 2, 1, 0])
+    normalized = normalize_dataframe(df, value_columns=["Student Name", "Course Name", "Section"])
+    assert list(normalized.columns) == ["Student Name", "Course Name", "Section"]
+    for col in normalized.columns:
+        expected = df[col.lower()].apply(smart_title).rename(col)
+        pd.testing.assert_series_equal(normalized[col], expected)